@@ -1,6 +1,7 @@
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+from data_pipeline.embedding_pipeline import EmbeddingPipeline
 from mcp.tools.vector_search import VectorSearch
 
 
@@ -9,32 +10,52 @@ class DataRetrieverAgent:
     AI agent responsible for semantic retrieval from a Vector DB.
     """
 
-    def __init__(self, vector_store_path: Path, embedding_fn):
+    def __init__(self, vector_store_path: Path, embedding_fn=None, mmap: bool = True, lazy: bool = True,
+                 cache_size: int = 1024, pipeline: Optional[EmbeddingPipeline] = None):
         """
         Args:
             vector_store_path: Path to FAISS vector store
-            embedding_fn: Callable that converts text -> embedding vector
+            embedding_fn: Optional callable that converts text -> embedding vector;
+                when omitted, queries are embedded with ``pipeline``
+            pipeline: Embedding pipeline for queries (default: the hash encoder,
+                matching ``Load_Spec_Data``'s default)
+            mmap: Memory-map the index read-only (pages shared between processes)
+            lazy: Defer loading the store until the first retrieval
+            cache_size: Recent query results kept in an LRU cache (0 disables it)
         """
-        self.embedding_fn = embedding_fn
-        self.vector_search = VectorSearch.from_path(vector_store_path)
+        self.pipeline = pipeline or EmbeddingPipeline()
+        self._embed_batched = embedding_fn is None
+        self.embedding_fn = embedding_fn or self.pipeline.embed_one
+        self.vector_search = VectorSearch.from_path(vector_store_path, mmap=mmap, lazy=lazy, cache_size=cache_size)
 
-    def retrieve(self, user_query: str, k: int = 5) -> List[Dict[str, Any]]:
+    def retrieve(self, user_query: str, k: int = 5,
+                 filters: Optional[Dict[str, Any]] = None, hybrid: bool = False) -> List[Dict[str, Any]]:
         """
-        Convert user query to embedding and retrieve top-k results.
+        Convert user query to embedding and retrieve top-k results,
+        optionally restricted to documents matching metadata ``filters``.
+
+        ``hybrid`` fuses keyword (BM25) and vector results; queries that are
+        only codes such as "FM-04" are then answered without an embedding.
         """
+        if hybrid:
+            return self.vector_search.hybrid_search(user_query, k=k, filters=filters, embed_fn=self.embedding_fn)
         query_embedding = self.embedding_fn(user_query)
-        return self.vector_search.search(query_embedding, k=k)
-if __name__ == "__main__":
-    from typing import List
-
-    def dummy_embedding_function(text: str) -> List[float]:
-        # Replace with Llama / sentence-transformer later
-        return [0.1] * 128
+        return self.vector_search.search(query_embedding, k=k, filters=filters)
 
-    agent = DataRetrieverAgent(
-        vector_store_path=Path("vector_db/faiss_store"),
-        embedding_fn=dummy_embedding_function,
-    )
+    def retrieve_many(self, user_queries: List[str], k: int = 5,
+                      filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve top-k results for several sub-queries with one batched search.
+        """
+        if self._embed_batched:
+            # one batched encoder call for all sub-queries
+            embeddings = self.pipeline.embed(user_queries)
+        else:
+            embeddings = [self.embedding_fn(q) for q in user_queries]
+        return self.vector_search.search_batch(embeddings, k=k, filters=filters)
+if __name__ == "__main__":
+    # queries are embedded with the same pipeline (hash encoder) as Load_Spec_Data
+    agent = DataRetrieverAgent(vector_store_path=Path("vector_db/faiss_store"))
 
     query = "Find information about engine failure modes"
     results = agent.retrieve(query, k=5)
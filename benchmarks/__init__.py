@@ -0,0 +1,6 @@
+"""Ingestion benchmarks that run without a Neo4j server.
+
+- ``benchmarks.fleet``: synthetic fleets in the ``synthetic_engine_data.csv`` schema.
+- ``benchmarks.fake_sink``: ``FakeIngestor``, an in-process stand-in for ``Neo4jIngestor``.
+- ``benchmarks.run``: stage timings written to JSON (``python -m benchmarks.run``).
+"""
@@ -0,0 +1,113 @@
+"""In-process stand-in for ``Neo4jIngestor``.
+
+``FakeIngestor`` implements the methods ``ingest_csv`` and ``ingest_csv_stream``
+call on an ingestor and records what it receives. Pass one as
+``ingestor=FakeIngestor()`` to measure the client side of ingestion without a
+server: parsing, row building, windowing, batching and optional serialization.
+"""
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from data_pipeline.reading_buckets import DEFAULT_BUCKET_SECONDS, pack_buckets
+from data_pipeline.watermarks import Watermarks
+
+
+class SinkStats:
+    """Rows, batches and time spent inside the sink for one kind of batch."""
+
+    __slots__ = ("rows", "batches", "seconds", "max_batch")
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self.max_batch = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"rows": self.rows, "batches": self.batches, "seconds": round(self.seconds, 6),
+                "max_batch": self.max_batch}
+
+
+class FakeIngestor:
+    """Accept ``Neo4jIngestor`` batch calls and record counts and timings.
+
+    ``serialize=True`` JSON-encodes every batch, a rough stand-in for the
+    driver packing parameters. ``latency`` (seconds) is slept per batch to
+    model a round trip. ``layout="buckets"`` packs readings exactly as the
+    real ingestor does. ``watermarks`` is returned by ``read_watermarks``, for
+    benchmarking incremental runs.
+    """
+
+    def __init__(self, layout: str = "rows", bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+                 serialize: bool = False, latency: float = 0.0,
+                 watermarks: Optional[Watermarks] = None, keep_rows: bool = False):
+        self.layout = layout
+        self.bucket_seconds = bucket_seconds
+        self.serialize = serialize
+        self.latency = latency
+        self.watermarks = watermarks or Watermarks()
+        self.keep_rows = keep_rows
+        self.stats: Dict[str, SinkStats] = {k: SinkStats() for k in ("engines", "readings", "failures", "windows")}
+        self.received: Dict[str, List[Dict[str, Any]]] = {k: [] for k in self.stats}
+        self.rows_written = 0
+        self.closed = False
+        self._t_start = time.perf_counter()
+
+    # lifecycle methods mirroring Neo4jIngestor
+    def ensure_constraints(self):
+        pass
+
+    def read_watermarks(self) -> Watermarks:
+        return self.watermarks
+
+    def start_writer(self, workers=4, queue_size=8, max_retries=5, on_commit=None):
+        return self
+
+    def flush(self):
+        return self
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self._t_start
+        return self.rows_written / elapsed if elapsed > 0 else 0.0
+
+    def _record(self, kind: str, rows, payload=None, started: Optional[float] = None):
+        t0 = started if started is not None else time.perf_counter()
+        if self.serialize:
+            json.dumps(payload if payload is not None else rows, default=str)
+        if self.latency:
+            time.sleep(self.latency)
+        stats = self.stats[kind]
+        stats.rows += len(rows)
+        stats.batches += 1
+        stats.max_batch = max(stats.max_batch, len(rows))
+        stats.seconds += time.perf_counter() - t0
+        self.rows_written += len(rows)
+        if self.keep_rows:
+            self.received[kind].extend(rows)
+
+    def ingest_engines_batch(self, engines):
+        if engines:
+            self._record("engines", engines)
+
+    def ingest_readings_batch(self, rows):
+        t0 = time.perf_counter()
+        payload = pack_buckets(rows, self.bucket_seconds) if self.layout == "buckets" else None
+        self._record("readings", rows, payload, started=t0)
+
+    def ingest_failures_batch(self, fails):
+        if fails:
+            self._record("failures", fails)
+
+    def ingest_windows_batch(self, windows):
+        if windows:
+            self._record("windows", windows)
+
+    def summary(self) -> Dict[str, Any]:
+        return {kind: stats.as_dict() for kind, stats in self.stats.items()}
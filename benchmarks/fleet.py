@@ -0,0 +1,93 @@
+"""Synthetic engine fleets in the ``data_sources/synthetic_engine_data.csv`` schema.
+
+Columns: ``time, unit_id, sensor_1..sensor_6, failure, rul, event_in_horizon``.
+Like the shipped CSV:
+
+- Rows are grouped by engine and time-ordered, one reading per ``freq``.
+- ``unit_<i>`` starts ``i - 1`` days after ``start``.
+- An engine fails at most once. ``rul`` counts down to the failure row and
+  stays 0 afterwards.
+- Sensors are noise around per-engine offsets that drift in the rows before a
+  failure.
+
+``write_fleet_csv`` writes a few engines at a time, so fleets far larger than
+memory (100M+ rows) can be produced.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline.csv_stream import SENSOR_COLS
+
+FLEET_COLUMNS = ["time", "unit_id", *SENSOR_COLS, "failure", "rul", "event_in_horizon"]
+
+# rough per-sensor levels of the shipped CSV
+_SENSOR_MEANS = np.array([0.18, 0.02, -0.01, 0.53, 0.22, 0.18])
+_DEGRADE_ROWS = 200
+
+
+def generate_fleet(engines: int, rows_per_engine: int, failure_rate: float = 1 / 3000,
+                   seed: int = 0, start: str = "2025-01-01", freq: str = "min",
+                   horizon: int = 30, first_engine: int = 1) -> pd.DataFrame:
+    """Return ``engines * rows_per_engine`` readings sorted by engine, then time.
+
+    ``failure_rate`` is per reading: an engine fails (once, at a uniform
+    random row) with probability ``min(1, failure_rate * rows_per_engine)``.
+    ``event_in_horizon`` is 1 for the ``horizon`` rows before a failure.
+    Engines are named ``unit_<first_engine>``, ``unit_<first_engine + 1>``, ...
+    """
+    rng = np.random.default_rng(seed)
+    shape = (engines, rows_per_engine)
+    row = np.broadcast_to(np.arange(rows_per_engine), shape)
+
+    fails = rng.random(engines) < min(1.0, failure_rate * rows_per_engine)
+    fail_row = np.where(fails, rng.integers(0, rows_per_engine, engines), -1)
+    failed_at = fail_row[:, None]
+    failure = (row == failed_at).astype(np.int8)
+    to_failure = failed_at - row
+    rul = np.where(fails[:, None], np.maximum(to_failure, 0), rows_per_engine - row).astype(np.float64)
+    event = (fails[:, None] & (to_failure > 0) & (to_failure <= horizon)).astype(np.int8)
+
+    # degradation ramp over the rows leading up to a failure
+    ramp = np.where(fails[:, None] & (to_failure >= 0) & (to_failure < _DEGRADE_ROWS),
+                    1.0 - to_failure / _DEGRADE_ROWS, 0.0)
+    step = pd.Timedelta(freq if freq[:1].isdigit() else f"1{freq}").to_timedelta64()
+    numbers = np.arange(first_engine, first_engine + engines)
+    starts = np.datetime64(pd.Timestamp(start)) + (numbers - 1) * np.timedelta64(1, "D")
+    data = {"time": (starts[:, None] + np.arange(rows_per_engine) * step).ravel().astype("datetime64[ns]"),
+            "unit_id": np.repeat(np.array([f"unit_{i}" for i in numbers], dtype=object), rows_per_engine)}
+    for j, c in enumerate(SENSOR_COLS):
+        level = rng.normal(_SENSOR_MEANS[j], 0.3, engines)[:, None]
+        noise = rng.normal(0.0, 0.8, shape)
+        data[c] = (level + noise + 2.5 * ramp).ravel()
+    data["failure"] = failure.ravel()
+    data["rul"] = rul.ravel()
+    data["event_in_horizon"] = event.ravel()
+    return pd.DataFrame(data, columns=FLEET_COLUMNS)
+
+
+def write_fleet_csv(path, engines: int, rows_per_engine: int, failure_rate: float = 1 / 3000,
+                    seed: int = 0, engines_per_chunk: Optional[int] = None, **kwargs) -> int:
+    """Write a fleet CSV ``engines_per_chunk`` engines at a time; returns the row count.
+
+    By default chunks hold about one million rows, so memory stays flat for any
+    fleet size. Each chunk draws from its own seed, so output for a given
+    ``(seed, engines_per_chunk)`` is reproducible.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if engines_per_chunk is None:
+        engines_per_chunk = max(1, 1_000_000 // max(rows_per_engine, 1))
+    total = 0
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        for i, first in enumerate(range(0, engines, engines_per_chunk)):
+            count = min(engines_per_chunk, engines - first)
+            chunk = generate_fleet(count, rows_per_engine, failure_rate=failure_rate,
+                                   seed=seed + i, first_engine=first + 1, **kwargs)
+            chunk.to_csv(fh, index=False, header=(i == 0))
+            total += len(chunk)
+    return total
@@ -0,0 +1,234 @@
+"""Ingestion throughput benchmarks on synthetic fleets, written to JSON.
+
+For each size it generates a fleet CSV (``benchmarks.fleet``, reused across
+runs from ``--workdir``) and times these stages:
+
+- ``csv_parse``: text to DataFrame with parsed ``time``;
+- ``row_dicts``: ``reading_rows`` UNWIND dicts, built batch by batch;
+- ``windowing``: FeatureWindow computation;
+- ``ingest``: end-to-end ``ingest_csv`` into a ``FakeIngestor``, with windows.
+  The sink's own counts and timings are stored alongside.
+
+Sizes up to ``--in-memory-limit`` rows run the in-memory path (``mode:
+memory``). Larger ones run the bounded-memory streaming path (``mode:
+stream``), so 100M-row fleets fit on a laptop. Compare two runs with
+``--compare``. Stages whose rows/s dropped by more than ``--tolerance`` are
+flagged.
+
+    python -m benchmarks.run --sizes 10000 100000 1000000
+    python -m benchmarks.run --sizes 100000000 --out big.json --compare benchmarks/results/baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.fake_sink import FakeIngestor  # noqa: E402
+from benchmarks.fleet import write_fleet_csv  # noqa: E402
+from data_pipeline.csv_stream import CSV_DTYPES, UnitWindowState, reading_rows  # noqa: E402
+from data_pipeline.Load_Engn_Data import ingest_csv  # noqa: E402
+from data_pipeline.parallel_windows import iter_unit_windows  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+STAGES = ("csv_parse", "row_dicts", "windowing", "ingest")
+
+
+def _result(stage: str, mode: str, rows: int, engines: int, seconds: float, **extra) -> Dict[str, Any]:
+    return {"stage": stage, "mode": mode, "rows": rows, "engines": engines,
+            "seconds": round(seconds, 6), "rows_per_s": round(rows / seconds, 1) if seconds > 0 else None,
+            **extra}
+
+
+def _quiet():
+    """Silence the ingest functions' progress output while timing them."""
+    stack = contextlib.ExitStack()
+    stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+    stack.enter_context(contextlib.redirect_stderr(io.StringIO()))
+    return stack
+
+
+def bench_memory(csv_path: Path, rows: int, engines: int, batch_size: int,
+                 window_size: int, stride: int) -> List[Dict[str, Any]]:
+    out = []
+    t0 = time.perf_counter()
+    df = pd.read_csv(csv_path, parse_dates=["time"])
+    out.append(_result("csv_parse", "memory", rows, engines, time.perf_counter() - t0))
+
+    df = df.sort_values(["unit_id", "time"]).reset_index(drop=True)
+    t0 = time.perf_counter()
+    for start in range(0, len(df), batch_size):
+        chunk = df.iloc[start:start + batch_size]
+        reading_rows(chunk, chunk.index)
+    out.append(_result("row_dicts", "memory", rows, engines, time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    n_windows = sum(len(w) for _, w in iter_unit_windows(df, window_size=window_size, stride=stride))
+    out.append(_result("windowing", "memory", rows, engines, time.perf_counter() - t0, windows=n_windows))
+    del df
+
+    sink = FakeIngestor()
+    t0 = time.perf_counter()
+    with _quiet():
+        ingest_csv(str(csv_path), None, None, None, batch_size=batch_size, make_windows=True,
+                   window_size=window_size, stride=stride, incremental=False, use_cache=False,
+                   ingestor=sink)
+    out.append(_result("ingest", "memory", rows, engines, time.perf_counter() - t0, sink=sink.summary()))
+    return out
+
+
+def bench_stream(csv_path: Path, rows: int, engines: int, batch_size: int, chunk_size: int,
+                 window_size: int, stride: int) -> List[Dict[str, Any]]:
+    """One chunked pass, timing parse, row dicts and windowing separately."""
+    seconds = dict.fromkeys(("csv_parse", "row_dicts", "windowing"), 0.0)
+    states: Dict[Any, UnitWindowState] = {}
+    n_windows, seq = 0, 0
+    reader = pd.read_csv(csv_path, dtype=CSV_DTYPES, parse_dates=["time"], chunksize=chunk_size)
+    while True:
+        t0 = time.perf_counter()
+        chunk = next(reader, None)
+        seconds["csv_parse"] += time.perf_counter() - t0
+        if chunk is None:
+            break
+        t0 = time.perf_counter()
+        for start in range(0, len(chunk), batch_size):
+            part = chunk.iloc[start:start + batch_size]
+            reading_rows(part, range(seq + start, seq + start + len(part)))
+        seq += len(chunk)
+        seconds["row_dicts"] += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        cols = [c for c in chunk.columns if c.startswith("sensor_")]
+        for unit, grp in chunk.groupby("unit_id", sort=False):
+            state = states.get(unit)
+            if state is None:
+                state = states[unit] = UnitWindowState(unit, window_size, stride, cols)
+            n_windows += len(state.feed(grp[cols].to_numpy(dtype=np.float64),
+                                        grp["failure"].to_numpy(dtype=np.int64),
+                                        grp["time"].to_numpy(dtype="datetime64[ns]")))
+        seconds["windowing"] += time.perf_counter() - t0
+    out = [_result(stage, "stream", rows, engines, secs) for stage, secs in seconds.items()]
+    out[-1]["windows"] = n_windows
+
+    sink = FakeIngestor()
+    t0 = time.perf_counter()
+    with _quiet():
+        ingest_csv(str(csv_path), None, None, None, batch_size=batch_size, make_windows=True,
+                   window_size=window_size, stride=stride, incremental=False, stream=True,
+                   chunk_size=chunk_size, ingestor=sink)
+    out.append(_result("ingest", "stream", rows, engines, time.perf_counter() - t0, sink=sink.summary()))
+    return out
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(sizes, rows_per_engine=2000, failure_rate=1 / 3000, batch_size=500, chunk_size=100_000,
+        window_size=200, stride=50, in_memory_limit=5_000_000, workdir=None, seed=0,
+        log=print) -> Dict[str, Any]:
+    """Run every stage for each fleet size and return the JSON-ready report."""
+    workdir = Path(workdir) if workdir is not None else RESULTS_DIR.parent / ".fleets"
+    results = []
+    for rows in sizes:
+        engines = max(1, rows // rows_per_engine)
+        per_engine = max(1, rows // engines)
+        csv_path = workdir / f"fleet_{engines}x{per_engine}_s{seed}.csv"
+        if not csv_path.exists():
+            t0 = time.perf_counter()
+            write_fleet_csv(csv_path, engines, per_engine, failure_rate=failure_rate, seed=seed)
+            log(f"generated {csv_path.name} in {time.perf_counter() - t0:.1f}s")
+        n = engines * per_engine
+        if n <= in_memory_limit:
+            batch = bench_memory(csv_path, n, engines, batch_size, window_size, stride)
+        else:
+            batch = bench_stream(csv_path, n, engines, batch_size, chunk_size, window_size, stride)
+        for r in batch:
+            log(f"{r['stage']:10s} {r['mode']:6s} rows={r['rows']:>12,} {r['seconds']:9.3f}s "
+                f"{r['rows_per_s'] or 0:>14,.0f} rows/s")
+        results.extend(batch)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {"rows_per_engine": rows_per_engine, "failure_rate": failure_rate,
+                       "batch_size": batch_size, "chunk_size": chunk_size, "window_size": window_size,
+                       "stride": stride, "in_memory_limit": in_memory_limit, "seed": seed},
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.1) -> List[Dict[str, Any]]:
+    """Per (stage, mode, rows) rows/s ratio of ``current`` to ``baseline``; ``regression`` flags slowdowns."""
+    base = {(r["stage"], r["mode"], r["rows"]): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        b = base.get((r["stage"], r["mode"], r["rows"]))
+        if not b or not b.get("rows_per_s") or not r.get("rows_per_s"):
+            continue
+        ratio = r["rows_per_s"] / b["rows_per_s"]
+        rows.append({"stage": r["stage"], "mode": r["mode"], "rows": r["rows"], "ratio": round(ratio, 3),
+                     "regression": ratio < 1.0 - tolerance})
+    return rows
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                   help="Fleet sizes in rows (10k .. 100M)")
+    p.add_argument("--rows-per-engine", type=int, default=2000)
+    p.add_argument("--failure-rate", type=float, default=1 / 3000, help="Failure probability per reading")
+    p.add_argument("--batch", type=int, default=500)
+    p.add_argument("--chunk-size", type=int, default=100_000)
+    p.add_argument("--window-size", type=int, default=200)
+    p.add_argument("--stride", type=int, default=50)
+    p.add_argument("--in-memory-limit", type=int, default=5_000_000,
+                   help="Largest size benchmarked on the in-memory path; larger sizes stream")
+    p.add_argument("--workdir", help="Where generated fleet CSVs are kept (default: benchmarks/.fleets)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", help="Result JSON (default: benchmarks/results/bench-<timestamp>.json)")
+    p.add_argument("--compare", metavar="BASELINE_JSON", help="Print rows/s ratios against an earlier run")
+    p.add_argument("--tolerance", type=float, default=0.1, help="Slowdown fraction reported as a regression")
+    args = p.parse_args()
+
+    report = run(args.sizes, rows_per_engine=args.rows_per_engine, failure_rate=args.failure_rate,
+                 batch_size=args.batch, chunk_size=args.chunk_size, window_size=args.window_size,
+                 stride=args.stride, in_memory_limit=args.in_memory_limit, workdir=args.workdir,
+                 seed=args.seed)
+    out = Path(args.out) if args.out else \
+        RESULTS_DIR / f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Wrote {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        regressions = 0
+        for c in compare(report, baseline, args.tolerance):
+            flag = "  REGRESSION" if c["regression"] else ""
+            regressions += c["regression"]
+            print(f"{c['stage']:10s} {c['mode']:6s} rows={c['rows']:>12,} {c['ratio']:6.2f}x{flag}")
+        sys.exit(1 if regressions else 0)
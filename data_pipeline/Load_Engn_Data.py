@@ -15,13 +15,28 @@ What it does:
 """
 
 import argparse
-import pandas as pd
+import sys
+from pathlib import Path
 import math
+import time
 from typing import Optional
 from neo4j import GraphDatabase, exceptions as neo4j_exceptions
 from tqdm import tqdm
-import json
-import uuid
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # allow `python data_pipeline/Load_Engn_Data.py`
+from data_pipeline.bulk_export import export_bulk_import
+from data_pipeline.columnar_cache import load_sensor_frame
+from data_pipeline.csv_stream import failure_rows, iter_csv_batches, reading_rows
+from data_pipeline.ndjson_export import SUFFIXES as NDJSON_SUFFIXES, NDJSONExportWriter
+from data_pipeline.neo4j_writer import ParallelNeo4jWriter, _write_tx
+from data_pipeline.parallel_windows import iter_unit_windows, unit_slices
+from data_pipeline.reading_buckets import (CREATE_BUCKET_CONSTRAINT, CYpher_UNWIND_BUCKETS,
+                                           DEFAULT_BUCKET_SECONDS, pack_buckets)
+from data_pipeline.watermarks import CYpher_READ_WATERMARKS, Watermarks
+from data_pipeline.windowing import first_window_start, windows_from_frame
+
+DEFAULT_DRY_RUN_DIR = "data_pipeline/dry_run"
 
 # ----------------------------
 # Helper functions / Cypher
@@ -35,20 +50,49 @@ CREATE_FEATUREWINDOW_CONSTRAINT = """
 CREATE CONSTRAINT IF NOT EXISTS FOR (fw:FeatureWindow) REQUIRE fw.window_id IS UNIQUE
 """
 
+CREATE_READING_CONSTRAINT = """
+CREATE CONSTRAINT IF NOT EXISTS FOR (rd:SensorReading) REQUIRE rd.reading_id IS UNIQUE
+"""
+
+CREATE_FAILURE_CONSTRAINT = """
+CREATE CONSTRAINT IF NOT EXISTS FOR (fe:FailureEvent) REQUIRE fe.event_id IS UNIQUE
+"""
+
+# range indexes for time filters and the threshold features used by the FM rules
+# in docs/specifications/engine_specification.md
+FEATUREWINDOW_INDEXED_PROPERTIES = [
+    "start_ts", "end_ts",
+    "sensor_1_min", "sensor_2_min", "sensor_3_max", "sensor_4_max", "sensor_5_min", "sensor_6_max",
+    "failure_count",
+]
+
+CREATE_FEATUREWINDOW_INDEXES = [
+    f"CREATE INDEX fw_{prop} IF NOT EXISTS FOR (fw:FeatureWindow) ON (fw.{prop})"
+    for prop in FEATUREWINDOW_INDEXED_PROPERTIES
+]
+
+CYpher_UNWIND_ENGINES = """
+UNWIND $engines AS e
+MERGE (eng:Engine {id: e.id})
+SET eng.created = coalesce(eng.created, datetime())
+"""
+
 CYpher_UNWIND_READINGS = """
 UNWIND $rows AS r
 MERGE (eng:Engine {id: r.unit_id})
-CREATE (rd:SensorReading {
-    ts: r.ts,
-    seq: r.seq,
-    sensor_1: r.sensor_1,
-    sensor_2: r.sensor_2,
-    sensor_3: r.sensor_3,
-    sensor_4: r.sensor_4,
-    sensor_5: r.sensor_5,
-    sensor_6: r.sensor_6
-})
-CREATE (eng)-[:HAS_READING]->(rd)
+MERGE (rd:SensorReading {reading_id: r.reading_id})
+ON CREATE SET rd.ts = r.ts,
+              rd.seq = r.seq,
+              rd.sensor_1 = r.sensor_1,
+              rd.sensor_2 = r.sensor_2,
+              rd.sensor_3 = r.sensor_3,
+              rd.sensor_4 = r.sensor_4,
+              rd.sensor_5 = r.sensor_5,
+              rd.sensor_6 = r.sensor_6
+MERGE (eng)-[:HAS_READING]->(rd)
+WITH eng, max(r.ts) AS last_ts
+SET eng.last_ingested_ts = CASE WHEN eng.last_ingested_ts IS NULL OR last_ts > eng.last_ingested_ts
+                                THEN last_ts ELSE eng.last_ingested_ts END
 """
 
 CYpher_UNWIND_FAILURES = """
@@ -63,9 +107,12 @@ CYpher_UNWIND_WINDOWS = """
 UNWIND $windows AS w
 MATCH (eng:Engine {id: w.unit_id})
 MERGE (fw:FeatureWindow {window_id: w.window_id})
-ON CREATE SET fw.start_ts = w.start_ts, fw.end_ts = w.end_ts,
-              fw.features_json = w.features, fw.created_at = datetime()
+ON CREATE SET fw += w.features, fw.start_ts = w.start_ts, fw.end_ts = w.end_ts,
+              fw.created_at = datetime()
 MERGE (eng)-[:HAS_WINDOW]->(fw)
+WITH eng, max(w.end_ts) AS last_end
+SET eng.last_window_end_ts = CASE WHEN eng.last_window_end_ts IS NULL OR last_end > eng.last_window_end_ts
+                                  THEN last_end ELSE eng.last_window_end_ts END
 """
 
 # ----------------------------
@@ -73,7 +120,16 @@ MERGE (eng)-[:HAS_WINDOW]->(fw)
 # ----------------------------
 
 class Neo4jIngestor:
-    def __init__(self, uri, user, password, database=None):
+    """
+    layout: "rows" stores one SensorReading node per CSV row; "buckets" packs
+    readings into one ReadingBucket node per engine per `bucket_seconds`
+    (see data_pipeline/reading_buckets.py).
+    """
+
+    def __init__(self, uri, user, password, database=None, layout="rows",
+                 bucket_seconds=DEFAULT_BUCKET_SECONDS):
+        if layout not in ("rows", "buckets"):
+            raise ValueError(f"Unknown reading layout: {layout!r} (expected 'rows' or 'buckets')")
         # create driver and verify connectivity early to provide clearer errors
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
         try:
@@ -83,36 +139,96 @@ class Neo4jIngestor:
             # wrap and re-raise with actionable message
             raise RuntimeError(f"Unable to connect to Neo4j at {uri}: {exc}") from exc
         self.database = database
+        self.layout = layout
+        self.bucket_seconds = bucket_seconds
+        self._session = None
+        self.writer: Optional[ParallelNeo4jWriter] = None
 
     def close(self):
+        if self.writer is not None:
+            self.flush()
+        if self._session is not None:
+            self._session.close()
+            self._session = None
         self.driver.close()
 
     def run(self, query, parameters=None):
-        with self.driver.session(database=self.database) as sess:
-            return sess.run(query, parameters or {})
+        # one long-lived session for synchronous calls; each call is a managed
+        # write transaction so the driver retries transient errors
+        if self._session is None:
+            self._session = self.driver.session(database=self.database)
+        return self._session.execute_write(_write_tx, query, parameters or {})
+
+    def start_writer(self, workers=4, queue_size=8, max_retries=5, on_commit=None):
+        """Route the ingest_*_batch calls through a ParallelNeo4jWriter until flush()."""
+        self.writer = ParallelNeo4jWriter(self.driver, database=self.database, workers=workers,
+                                          queue_size=queue_size, max_retries=max_retries,
+                                          on_commit=on_commit)
+        return self.writer
+
+    def flush(self):
+        """Wait for all batches queued on the parallel writer to commit."""
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.close()
+        return writer
+
+    def _write(self, query, param_name, rows, key="unit_id"):
+        if self.writer is not None:
+            self.writer.submit(query, param_name, rows, key=key)
+        else:
+            self.run(query, {param_name: rows})
+
+    def read_watermarks(self):
+        """Per-engine ingestion watermarks committed by earlier runs (see data_pipeline/watermarks.py)."""
+        if self.writer is not None:
+            self.flush()
+        if self._session is None:
+            self._session = self.driver.session(database=self.database)
+        records = self._session.execute_read(lambda tx: tx.run(CYpher_READ_WATERMARKS).data())
+        return Watermarks.from_records(records)
 
     def ensure_constraints(self):
         self.run(CREATE_ENGINE_CONSTRAINT)
         self.run(CREATE_FEATUREWINDOW_CONSTRAINT)
+        self.run(CREATE_READING_CONSTRAINT)
+        self.run(CREATE_FAILURE_CONSTRAINT)
+        if self.layout == "buckets":
+            self.run(CREATE_BUCKET_CONSTRAINT)
+        for stmt in CREATE_FEATUREWINDOW_INDEXES:
+            self.run(stmt)
+
+    def ingest_engines_batch(self, engines):
+        # engines: list of dicts with key id (unit_id)
+        if not engines:
+            return
+        self._write(CYpher_UNWIND_ENGINES, "engines", engines, key="id")
 
     def ingest_readings_batch(self, rows):
         """
         rows: list of dicts with keys:
-          unit_id, ts (ISO string), seq (int), sensor_1..sensor_6 (floats)
+          unit_id, reading_id, ts (ISO string), seq (int), sensor_1..sensor_6 (floats)
         """
         # chunk sized queries if necessary (Neo4j has max parameter sizes)
-        self.run(CYpher_UNWIND_READINGS, {"rows": rows})
+        if self.layout == "buckets":
+            self._write(CYpher_UNWIND_BUCKETS, "buckets", pack_buckets(rows, self.bucket_seconds))
+        else:
+            self._write(CYpher_UNWIND_READINGS, "rows", rows)
 
     def ingest_failures_batch(self, fails):
         # fails: list of dicts with keys unit_id, ts, event_id, severity, type
         if not fails:
             return
-        self.run(CYpher_UNWIND_FAILURES, {"fails": fails})
+        self._write(CYpher_UNWIND_FAILURES, "fails", fails)
 
     def ingest_windows_batch(self, windows):
         # windows: list of dicts unit_id, window_id, start_ts, end_ts, features (map)
         if not windows:
             return
+        if self.writer is not None:
+            # the writer reports failures with a sample row when it is flushed
+            self.writer.submit(CYpher_UNWIND_WINDOWS, "windows", windows)
+            return
         try:
             self.run(CYpher_UNWIND_WINDOWS, {"windows": windows})
         except Exception as exc:
@@ -125,7 +241,7 @@ class Neo4jIngestor:
 # Feature windowing utilities
 # ----------------------------
 
-def make_windows_for_unit(df_unit, unit_id, window_size=200, stride=50, features_cols=None):
+def make_windows_for_unit(df_unit, unit_id, window_size=200, stride=50, features_cols=None, start_row=0):
     """
     df_unit: pandas DataFrame for a single unit sorted by time ascending
     returns list of window dicts:
@@ -134,35 +250,19 @@ def make_windows_for_unit(df_unit, unit_id, window_size=200, stride=50, features
        "window_id": <uuid or deterministic id>,
        "start_ts": <ISO str>,
        "end_ts": <ISO str>,
-       "features": { "sensor_1_mean":..., "sensor_1_std":..., ... }
+       "features": { "sensor_1_mean":..., "sensor_1_std":..., ..., "failure_count": n }
     }
+
+    The feature map is stored as typed FeatureWindow properties
+    (fw.sensor_1_mean, ..., fw.failure_count) so filters run server-side.
+    Statistics for all windows and sensor columns are computed in one array
+    pass by ``data_pipeline.windowing``; ``window_id`` is
+    ``"<unit_id>__<start>__<end>"`` with unit-relative row offsets.
+    `start_row` (a multiple of `stride`) skips windows starting before it.
     """
-    if features_cols is None:
-        features_cols = [c for c in df_unit.columns if c.startswith("sensor_")]
-    windows = []
-    n = len(df_unit)
-    for start in range(0, n - window_size + 1, stride):
-        end = start + window_size
-        win = df_unit.iloc[start:end]
-        feats = {}
-        for c in features_cols:
-            arr = win[c].values.astype(float)
-            feats[f"{c}_mean"] = float(arr.mean()) if arr.size else None
-            feats[f"{c}_std"] = float(arr.std(ddof=0)) if arr.size else None
-            feats[f"{c}_min"] = float(arr.min()) if arr.size else None
-            feats[f"{c}_max"] = float(arr.max()) if arr.size else None
-        # optionally include failure count or event_in_horizon summarization
-        feats["failure_count"] = int(win["failure"].sum()) if "failure" in win.columns else 0
-        window_id = f"{unit_id}__{start}__{end}"
-        # Neo4j properties must be primitives or arrays; serialize feature map as JSON string
-        windows.append({
-            "unit_id": unit_id,
-            "window_id": window_id,
-            "start_ts": win["time"].iloc[0].isoformat(),
-            "end_ts": win["time"].iloc[-1].isoformat(),
-            "features": json.dumps(feats)
-        })
-    return windows
+    return windows_from_frame(df_unit, unit_id, window_size=window_size,
+                              stride=stride, features_cols=features_cols,
+                              start_row=start_row)
 
 # ----------------------------
 # Main ingestion flow
@@ -170,9 +270,33 @@ def make_windows_for_unit(df_unit, unit_id, window_size=200, stride=50, features
 
 def ingest_csv(csv_path, neo4j_uri, neo4j_user, neo4j_pass,
                batch_size=500, make_windows=False, window_size=200, stride=50,
-               dry_run=False):
+               dry_run=False, stream=False, chunk_size=100_000, workers=4, queue_size=8,
+               layout="rows", bucket_seconds=DEFAULT_BUCKET_SECONDS, incremental=True,
+               use_cache=True, window_workers=1, ingestor=None,
+               export_dir=DEFAULT_DRY_RUN_DIR, export_compression=None):
+    """
+    Load `csv_path` into memory, sort it by unit_id/time and ingest engines,
+    readings, failures and (with `make_windows`) FeatureWindows.
+
+    `ingestor` replaces the Neo4jIngestor built from the connection settings,
+    e.g. benchmarks.fake_sink.FakeIngestor to measure throughput without a server.
+    With `dry_run` every batch is appended to NDJSON files in `export_dir`
+    instead (see data_pipeline/ndjson_export.py).
+    """
+    if stream:
+        return ingest_csv_stream(csv_path, neo4j_uri, neo4j_user, neo4j_pass,
+                                 batch_size=batch_size, make_windows=make_windows,
+                                 window_size=window_size, stride=stride,
+                                 dry_run=dry_run, chunk_size=chunk_size,
+                                 workers=workers, queue_size=queue_size,
+                                 layout=layout, bucket_seconds=bucket_seconds,
+                                 incremental=incremental, ingestor=ingestor,
+                                 export_dir=export_dir, export_compression=export_compression)
     print("Loading CSV:", csv_path)
-    df = pd.read_csv(csv_path, parse_dates=["time"])
+    t_start = time.perf_counter()
+    # reads the columnar cache instead of the CSV text when one was built for this file;
+    # only a float64 cache, so the values written match the CSV (and the --stream path) exactly
+    df = load_sensor_frame(csv_path, use_cache=use_cache, sensor_dtype="float64")
     # ensure expected columns
     expected = set(["unit_id", "time", "failure"])
     if not expected.issubset(set(df.columns)):
@@ -181,85 +305,38 @@ def ingest_csv(csv_path, neo4j_uri, neo4j_user, neo4j_pass,
     # sort by unit_id and time
     df = df.sort_values(["unit_id", "time"]).reset_index(drop=True)
 
-    ingestor: Optional[Neo4jIngestor] = None
-    if not dry_run:
-        ingestor = Neo4jIngestor(neo4j_uri, neo4j_user, neo4j_pass)
-        print("Ensuring constraints...")
-        ingestor.ensure_constraints()
-        # narrow type for linters (Pylance) — ingestor is guaranteed non-None in non-dry-run
-        assert ingestor is not None
-    else:
-        print("Running in dry-run mode: no Neo4j operations will be performed.")
+    ingestor = _open_ingestor(ingestor, dry_run, export_dir, export_compression,
+                              neo4j_uri, neo4j_user, neo4j_pass, layout, bucket_seconds)
+    print("Ensuring constraints...")
+    ingestor.ensure_constraints()
+    watermarks = _load_watermarks(ingestor, incremental)
+    ingestor.start_writer(workers=workers, queue_size=queue_size)
 
     # Ingest Engines (idempotent)
     units = df["unit_id"].unique().tolist()
     print(f"Found {len(units)} unique units. MERGE Engine nodes...")
-    if dry_run:
-        # write a preview of engine merges to a file instead of running DB commands
-        import json as _json
-        engines_preview = [{"id": u} for u in units]
-        with open("data_pipeline/engines_preview.json", "w", encoding="utf-8") as _f:
-            _json.dump(engines_preview, _f, indent=2)
-        print(f"[dry-run] Wrote {len(engines_preview)} engine previews to data_pipeline/engines_preview.json")
-    else:
-        for u in units:
-            ingestor.run("MERGE (e:Engine {id:$id}) SET e.created = coalesce(e.created, datetime())", {"id": u})
+    ingestor.ingest_engines_batch([{"id": u} for u in units])
 
-    # Ingest readings in batches
+    # Ingest readings in batches (skipping rows already committed by an earlier run)
     print("Ingesting sensor readings in batches (UNWIND)...")
-    total = len(df)
+    df_new = df[watermarks.new_rows_mask(df)]
+    if len(df_new) < len(df):
+        print(f"Skipping {len(df) - len(df_new)} readings at or before their engine's watermark")
+    total = len(df_new)
     batches = math.ceil(total / batch_size)
-    iterator = df.reset_index().to_dict(orient="records")
-    preview_rows = []
     for i in tqdm(range(batches), desc="batches"):
         start = i * batch_size
         end = min((i+1) * batch_size, total)
-        chunk = iterator[start:end]
-        rows = []
-        for r in chunk:
-            rows.append({
-                "unit_id": r["unit_id"],
-                "ts": r["time"].isoformat(),
-                "seq": int(r["index"]),
-                "sensor_1": float(r.get("sensor_1", float("nan"))),
-                "sensor_2": float(r.get("sensor_2", float("nan"))),
-                "sensor_3": float(r.get("sensor_3", float("nan"))),
-                "sensor_4": float(r.get("sensor_4", float("nan"))),
-                "sensor_5": float(r.get("sensor_5", float("nan"))),
-                "sensor_6": float(r.get("sensor_6", float("nan")))
-            })
-        if dry_run:
-            # collect a small sample for preview and skip DB writes
-            if len(preview_rows) < 10:
-                preview_rows.extend(rows[:10 - len(preview_rows)])
-        else:
-            # ingestor is non-None here because dry_run is False; help static analysis
-            assert ingestor is not None
-            ingestor.ingest_readings_batch(rows)
+        chunk = df_new.iloc[start:end]
+        ingestor.ingest_readings_batch(reading_rows(chunk, chunk.index))
 
     # Ingest failures as separate nodes (optional but helpful)
     print("Creating FailureEvent nodes (if any)...")
     fails_df = df[df["failure"] == 1]
     if not fails_df.empty:
-        fails = []
-        for _, r in fails_df.iterrows():
-            eid = str(uuid.uuid4())
-            fails.append({
-                "unit_id": r["unit_id"],
-                "ts": r["time"].isoformat(),
-                "event_id": eid,
-                "severity": int(1),
-                "type": "component_failure"
-            })
+        fails = failure_rows(fails_df)
         # We may chunk but often failures are few
-        if dry_run:
-            import json as _json
-            with open("data_pipeline/fails_preview.json", "w", encoding="utf-8") as _f:
-                _json.dump(fails, _f, indent=2, default=str)
-            print(f"[dry-run] Wrote {len(fails)} failures to data_pipeline/fails_preview.json")
-        else:
-            assert ingestor is not None
-            ingestor.ingest_failures_batch(fails)
+        ingestor.ingest_failures_batch(fails)
     else:
         print("No failures found in CSV (no FailureEvent nodes created).")
 
@@ -267,43 +344,108 @@ def ingest_csv(csv_path, neo4j_uri, neo4j_user, neo4j_pass,
     if make_windows:
         print("Computing aggregated FeatureWindow nodes per unit...")
         windows_all = []
-        for unit in units:
-            df_unit = df[df["unit_id"] == unit].reset_index(drop=True)
-            wins = make_windows_for_unit(df_unit, unit, window_size=window_size, stride=stride)
+        # df is sorted by unit_id, time: each engine is one contiguous row range
+        slices = unit_slices(df)
+        start_rows = {}
+        for unit, lo, hi in slices:
+            # only recompute windows that include a row after the windows watermark
+            cutoff = watermarks.window_cutoff(unit)
+            if cutoff is not None:
+                n_done = int((df["time"].iloc[lo:hi] <= cutoff).sum())
+                start_rows[unit] = first_window_start(n_done, window_size, stride)
+        for unit, wins in iter_unit_windows(df, window_size=window_size, stride=stride,
+                                            start_rows=start_rows, workers=window_workers,
+                                            slices=slices):
             windows_all.extend(wins)
             # chunk windows to avoid big parameter lists
             if len(windows_all) >= batch_size:
-                # ingest or preview batch
-                if dry_run:
-                    import json as _json
-                    with open("data_pipeline/windows_preview_partial.json", "w", encoding="utf-8") as _f:
-                        _json.dump(windows_all, _f, indent=2, default=str)
-                    windows_all = []
-                else:
-                    assert ingestor is not None
-                    ingestor.ingest_windows_batch(windows_all)
-                    windows_all = []
+                ingestor.ingest_windows_batch(windows_all)
+                windows_all = []
         # ingest remaining
         if windows_all:
-            if dry_run:
-                import json as _json
-                with open("data_pipeline/windows_preview.json", "w", encoding="utf-8") as _f:
-                    _json.dump(windows_all, _f, indent=2, default=str)
-                print(f"[dry-run] Wrote {len(windows_all)} windows to data_pipeline/windows_preview.json")
-            else:
-                assert ingestor is not None
-                ingestor.ingest_windows_batch(windows_all)
+            ingestor.ingest_windows_batch(windows_all)
         print("FeatureWindow ingestion complete.")
 
+    writer = ingestor.flush()
+    _report_rate(writer.rows_written, time.perf_counter() - t_start)
+    _close_ingestor(ingestor)
+
+
+def ingest_csv_stream(csv_path, neo4j_uri, neo4j_user, neo4j_pass,
+                      batch_size=500, make_windows=False, window_size=200, stride=50,
+                      dry_run=False, chunk_size=100_000, workers=4, queue_size=8,
+                      layout="rows", bucket_seconds=DEFAULT_BUCKET_SECONDS, incremental=True,
+                      ingestor=None, export_dir=DEFAULT_DRY_RUN_DIR, export_compression=None):
+    """
+    Bounded-memory variant of ingest_csv: reads the CSV in chunks of
+    `chunk_size` rows and ships UNWIND batches as they are produced
+    (see data_pipeline/csv_stream.py). Rows of each unit must be in time order.
+    `ingestor`, `dry_run` and `export_dir` work as in ingest_csv.
+    """
+    print(f"Streaming CSV: {csv_path} (chunk_size={chunk_size})")
+    t_start = time.perf_counter()
+    ingestor = _open_ingestor(ingestor, dry_run, export_dir, export_compression,
+                              neo4j_uri, neo4j_user, neo4j_pass, layout, bucket_seconds)
+    print("Ensuring constraints...")
+    ingestor.ensure_constraints()
+    watermarks = _load_watermarks(ingestor, incremental)
+    ingestor.start_writer(workers=workers, queue_size=queue_size)
+
+    counts = {"engines": 0, "readings": 0, "failures": 0, "windows": 0}
+    batches = iter_csv_batches(csv_path, batch_size=batch_size, chunk_size=chunk_size,
+                               make_windows=make_windows, window_size=window_size, stride=stride,
+                               watermarks=watermarks)
+    for kind, rows in tqdm(batches, desc="batches"):
+        counts[kind] += len(rows)
+        if kind == "engines":
+            ingestor.ingest_engines_batch(rows)
+        elif kind == "readings":
+            ingestor.ingest_readings_batch(rows)
+        elif kind == "failures":
+            ingestor.ingest_failures_batch(rows)
+        else:
+            ingestor.ingest_windows_batch(rows)
+    print("Processed: " + ", ".join(f"{n} {k}" for k, n in counts.items()))
+    ingestor.flush()
+    _report_rate(sum(counts.values()), time.perf_counter() - t_start)
+    _close_ingestor(ingestor)
+
+
+def _open_ingestor(ingestor, dry_run, export_dir, export_compression,
+                   neo4j_uri, neo4j_user, neo4j_pass, layout, bucket_seconds):
+    if ingestor is not None:
+        return ingestor
     if dry_run:
-        import json as _json
-        with open("data_pipeline/ingest_preview.json", "w", encoding="utf-8") as _f:
-            _json.dump(preview_rows, _f, indent=2, default=str)
-        print(f"[dry-run] Wrote sample {len(preview_rows)} readings to data_pipeline/ingest_preview.json")
-        print("Done (dry-run). No DB connection was used.")
-    else:
-        print("Done. Closing connection.")
+        # nothing is sampled or dropped: the export holds every batch a real run would send
+        print(f"Running in dry-run mode: no Neo4j operations; appending every batch to {export_dir}/")
+        return NDJSONExportWriter(export_dir, compression=export_compression)
+    return Neo4jIngestor(neo4j_uri, neo4j_user, neo4j_pass,
+                         layout=layout, bucket_seconds=bucket_seconds)
+
+
+def _close_ingestor(ingestor):
+    if isinstance(ingestor, NDJSONExportWriter):
         ingestor.close()
+        print("Done (dry-run). Wrote NDJSON export: " + ", ".join(
+            f"{n} {k} -> {ingestor.paths[k]}" for k, n in ingestor.counts.items()))
+        return
+    print("Done. Closing connection.")
+    ingestor.close()
+
+
+def _load_watermarks(ingestor, incremental):
+    if not incremental:
+        print("Full run: ignoring ingestion watermarks.")
+        return Watermarks()
+    watermarks = ingestor.read_watermarks()
+    if watermarks:
+        print(f"Incremental run: {watermarks.summary()}")
+    return watermarks
+
+
+def _report_rate(rows, seconds, verb="Wrote"):
+    rate = rows / seconds if seconds > 0 else 0.0
+    print(f"{verb} {rows} rows in {seconds:.1f}s ({rate:,.0f} rows/s)")
 
 
 # ----------------------------
@@ -319,12 +461,45 @@ def parse_args():
     p.add_argument("--make-windows", action="store_true", help="Compute & ingest aggregated feature windows")
     p.add_argument("--window-size", type=int, default=200, help="Window size (timesteps) for FeatureWindow")
     p.add_argument("--stride", type=int, default=50, help="Stride for sliding windows")
-    p.add_argument("--dry-run", action="store_true", help="Run without writing to Neo4j; write preview files instead")
+    p.add_argument("--dry-run", action="store_true",
+                   help=f"Run without writing to Neo4j; append every batch to NDJSON files in --export DIR "
+                        f"(default {DEFAULT_DRY_RUN_DIR})")
+    p.add_argument("--stream", action="store_true", help="Read the CSV in chunks with bounded memory (rows of each unit must be time-ordered)")
+    p.add_argument("--chunk-size", type=int, default=100_000, help="Rows per CSV chunk in --stream mode")
+    p.add_argument("--layout", choices=("rows", "buckets"), default="rows",
+                   help="Reading storage: one SensorReading node per row, or one ReadingBucket node per engine per time bucket")
+    p.add_argument("--bucket-seconds", type=int, default=DEFAULT_BUCKET_SECONDS, help="Bucket length for --layout buckets")
+    p.add_argument("--full", action="store_true",
+                   help="Ignore per-engine watermarks and re-send every row (default: skip rows committed by earlier runs)")
+    p.add_argument("--export", metavar="DIR",
+                   help="Directory for the --dry-run NDJSON files (implies --dry-run)")
+    p.add_argument("--export-compression", choices=[c for c in NDJSON_SUFFIXES if c], default=None,
+                   help="Compress the --dry-run NDJSON files with gzip or zstd")
+    p.add_argument("--bulk-export", metavar="DIR", help="Write neo4j-admin import CSVs to DIR instead of writing to Neo4j")
+    p.add_argument("--no-cache", action="store_true",
+                   help="Parse the CSV even if a fresh float64 columnar cache exists (see data_pipeline/columnar_cache.py)")
+    p.add_argument("--window-workers", type=int, default=1,
+                   help="Processes computing FeatureWindows (engines are split across them via shared memory)")
+    p.add_argument("--workers", type=int, default=4, help="Writer threads, each with its own Neo4j session")
+    p.add_argument("--queue-size", type=int, default=8, help="Max queued batches per writer thread before the reader blocks")
     return p.parse_args()
 
 if __name__ == "__main__":
     args = parse_args()
+    if args.bulk_export:
+        writer = export_bulk_import(args.csv, args.bulk_export, batch_size=max(args.batch, 5000),
+                                    chunk_size=args.chunk_size, make_windows=args.make_windows,
+                                    window_size=args.window_size, stride=args.stride)
+        print("Wrote bulk-import files: " + ", ".join(f"{n} {k}" for k, n in writer.counts.items()))
+        print("Load them with (database must be stopped/new):")
+        print(writer.import_command())
+        sys.exit(0)
     ingest_csv(args.csv, args.neo4j, args.user, args.password,
                batch_size=args.batch, make_windows=args.make_windows,
                window_size=args.window_size, stride=args.stride,
-               dry_run=args.dry_run)
+               dry_run=args.dry_run or bool(args.export), stream=args.stream, chunk_size=args.chunk_size,
+               workers=args.workers, queue_size=args.queue_size,
+               layout=args.layout, bucket_seconds=args.bucket_seconds,
+               incremental=not args.full, use_cache=not args.no_cache,
+               window_workers=args.window_workers,
+               export_dir=args.export or DEFAULT_DRY_RUN_DIR, export_compression=args.export_compression)
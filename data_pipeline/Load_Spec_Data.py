@@ -1,9 +1,17 @@
 """Load engine specification data and store embeddings into the vector DB.
 
 This script reads `data_sources/engine_spec_data.doc`, splits it into
-failure-mode documents, builds embeddings for each document (using the
-project embedding pipeline or a deterministic hash-based fallback), and
-stores them in the project's `EmbeddingsStore` abstraction.
+failure-mode documents, builds embeddings for each document with the
+project embedding pipeline (``--encoder``; the default is the deterministic
+hash fallback), and stores them in the project's `EmbeddingsStore`
+abstraction. Computed vectors are cached on disk by content hash and model
+(``--embedding-cache``), so unchanged text is never embedded twice.
+
+Runs are incremental. Each section is stored under a stable document id
+(``<spec file name>:<FM id>``) with a hash of its content. A re-run embeds
+and upserts only the sections whose hash changed and deletes the sections
+that disappeared, so an edit to the spec updates the saved store in place
+instead of rebuilding it. ``--rebuild`` starts from an empty store.
 
 Usage:
     python Load_Spec_Data.py
@@ -16,9 +24,20 @@ import json
 import logging
 import re
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 
-from data_pipeline.embedding_pipeline import build_embeddings
+from data_pipeline.embedding_pipeline import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CACHE_PATH,
+    ENCODERS,
+    EmbeddingCache,
+    EmbeddingPipeline,
+    HashEncoder,
+    get_encoder,
+    hash_embeddings,
+)
 from vector_db.embeddings_store.store import EmbeddingsStore
 
 LOG = logging.getLogger(__name__)
@@ -59,79 +78,181 @@ def deterministic_embedding(text: str, dim: int = 128) -> List[float]:
     """Simple deterministic embedding using repeated sha256 digests.
 
     Produces a fixed-length vector of floats in [0, 1]. This is a
-    fallback when a real embedding model is unavailable.
+    fallback when a real embedding model is unavailable (the pipeline's
+    ``HashEncoder`` computes the same vectors in batches).
     """
-    vec: List[float] = []
-    i = 0
-    while len(vec) < dim:
-        m = hashlib.sha256()
-        m.update(text.encode("utf-8"))
-        m.update(i.to_bytes(2, "little", signed=False))
-        digest = m.digest()
-        vec.extend([b / 255.0 for b in digest])
-        i += 1
-    return vec[:dim]
-
-
-def get_embeddings_for_docs(docs: Iterable[Dict[str, str]]) -> List[List[float]]:
+    return hash_embeddings([text], dim)[0].tolist()
+
+
+def get_embeddings_for_docs(docs: Iterable[Dict[str, str]], pipeline: Optional[EmbeddingPipeline] = None) -> np.ndarray:
+    """(N, dim) embeddings of the documents' text; the default pipeline is the uncached hash encoder."""
     texts = [d["text"] for d in docs]
-    LOG.info("Building embeddings for %d documents", len(texts))
-    embeddings = build_embeddings(texts)
-    # If the placeholder pipeline returned nothing or length mismatch,
-    # fall back to deterministic embeddings.
-    if not embeddings or len(embeddings) != len(texts):
-        LOG.warning("Embedding pipeline produced no valid embeddings; using deterministic fallback")
-        embeddings = [deterministic_embedding(t) for t in texts]
+    pipeline = pipeline or EmbeddingPipeline(HashEncoder())
+    LOG.info("Building embeddings for %d documents with %s", len(texts), pipeline.model_id)
+    embeddings = pipeline.embed(texts)
+    if pipeline.cache is not None:
+        LOG.info("Embedding cache: %d hits, %d encoded", pipeline.hits, pipeline.encoded)
     return embeddings
 
 
-def store_spec_embeddings(spec_path: Path, store: Any) -> int:
+def content_hash(doc: Dict[str, str]) -> str:
+    return hashlib.sha256(f"{doc['title']}\n{doc['text']}".encode("utf-8")).hexdigest()
+
+
+def store_spec_embeddings(spec_path: Path, store: Any, pipeline: Optional[EmbeddingPipeline] = None) -> int:
+    """Bring ``store`` up to date with the spec; returns the number of spec documents.
+
+    Only new or changed sections are embedded and upserted; sections no
+    longer in the spec are deleted.
+    """
     text = load_spec_text(spec_path)
     docs = split_failure_modes(text)
-    embeddings = get_embeddings_for_docs(docs)
-    for doc, emb in zip(docs, embeddings):
-        metadata = {"id": doc["id"], "title": doc["title"], "source": str(spec_path)}
-        store.add(emb, metadata=metadata)
-    LOG.info("Stored %d documents into vector store", len(docs))
+    prefix = f"{spec_path.name}:"
+    doc_ids = [prefix + doc["id"] for doc in docs]
+    hashes = [content_hash(doc) for doc in docs]
+    stored = store.doc_hashes(prefix)
+    changed = [i for i, (doc_id, h) in enumerate(zip(doc_ids, hashes)) if stored.get(doc_id) != h]
+    removed = sorted(set(stored) - set(doc_ids))
+    if changed:
+        embeddings = get_embeddings_for_docs([docs[i] for i in changed], pipeline)
+        # "text" also feeds the store's keyword (BM25) index
+        metadatas = [{"id": docs[i]["id"], "title": docs[i]["title"], "source": str(spec_path),
+                      "text": docs[i]["text"]} for i in changed]
+        # one bulk call instead of one add (and one index update) per document
+        store.upsert([doc_ids[i] for i in changed], np.asarray(embeddings, dtype="float32"), metadatas,
+                     content_hashes=[hashes[i] for i in changed])
+    if removed:
+        store.delete(removed)
+    LOG.info("Spec has %d documents: %d embedded, %d unchanged, %d deleted",
+             len(docs), len(changed), len(docs) - len(changed), len(removed))
     return len(docs)
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Load spec docs and store embeddings into a vector DB")
+def open_store(args, index_path: Path, dim: int) -> Any:
+    """The store saved at ``index_path`` if it matches the requested kind, else an empty one.
+
+    Saved FAISS stores whose index cannot remove vectors (HNSW) are never
+    reopened: an incremental run would have to replace changed documents, so
+    they are rebuilt (unchanged sections come from the embedding cache).
+    """
+    rebuild = args.rebuild
+    if args.store == "faiss":
+        from vector_db.embeddings_store.faiss_store import APPEND_ONLY_INDEX_TYPES
+
+        if args.index_type in APPEND_ONLY_INDEX_TYPES and not rebuild:
+            LOG.info("%s indexes cannot replace documents in place; rebuilding the store at %s",
+                     args.index_type, index_path)
+            rebuild = True
+    if args.store == "faiss" and (args.shards > 1 or args.shard_by):
+        from vector_db.embeddings_store.sharded_store import ShardedEmbeddingsStore
+
+        if not rebuild and index_path.with_suffix(".shards.json").exists():
+            store = ShardedEmbeddingsStore.load(index_path)
+            if (store.index_type, store.dim, store.shard_by) == (args.index_type, dim, args.shard_by) and \
+                    (args.shard_by or store.n_shards == args.shards):
+                return store
+            LOG.info("Saved sharded store at %s does not match the requested sharding or index; rebuilding",
+                     index_path)
+        return ShardedEmbeddingsStore(dim=dim, shards=args.shards, shard_by=args.shard_by,
+                                      index_type=args.index_type)
+    if args.store == "faiss":
+        from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+        if not rebuild and index_path.with_suffix(".index").exists():
+            store = FAISSEmbeddingsStore.load(index_path)
+            if store.index_type == args.index_type and store.dim == dim and (store.doc_hashes() or not len(store)):
+                return store
+            LOG.info("Saved store at %s does not match the requested index or predates document ids; rebuilding",
+                     index_path)
+        return FAISSEmbeddingsStore(dim=dim, index_type=args.index_type)
+    dtype = "float16" if args.float16 else "float32"
+    if not rebuild and index_path.with_suffix(".npy").exists():
+        store = EmbeddingsStore.load(index_path)
+        if store.dtype.name == dtype and store.dim == dim:
+            return store
+        LOG.info("Saved store at %s does not match the requested dtype or dim; rebuilding", index_path)
+    return EmbeddingsStore(dim=dim, dtype=dtype)
+
+
+def add_store_arguments(parser: argparse.ArgumentParser) -> None:
+    """The store and embedding options shared by the spec loader and the corpus indexer."""
     parser.add_argument("--store", choices=("memory", "faiss"), default="memory", help="Which store to use")
-    parser.add_argument("--index-path", default="vector_db/faiss_store", help="Base path for FAISS index/meta files when using --store faiss")
-    parser.add_argument("--dim", type=int, default=128, help="Embedding dimension (used by FAISS store)")
-    args = parser.parse_args()
+    parser.add_argument("--index-path", default=None,
+                        help="Base path for the saved store (default: vector_db/faiss_store or vector_db/memory_store)")
+    parser.add_argument("--float16", action="store_true", help="Keep memory-store vectors as float16 (half the memory)")
+    parser.add_argument("--dim", type=int, default=128, help="Embedding dimension of the hash encoder")
+    parser.add_argument("--encoder", choices=sorted(ENCODERS), default="hash",
+                        help="Embedding backend (sentence-transformers needs that package)")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Model name for the sentence-transformers encoder")
+    parser.add_argument("--embed-batch", type=int, default=DEFAULT_BATCH_SIZE, help="Texts per encoder call")
+    parser.add_argument("--embed-workers", type=int, default=1, help="Encoder batches computed concurrently")
+    parser.add_argument("--embedding-cache", default=str(DEFAULT_CACHE_PATH),
+                        help="SQLite file caching embeddings by content hash and model ('' disables it)")
+    parser.add_argument("--index-type", choices=("flat", "ivf_flat", "ivf_pq", "hnsw", "sq8", "pq"), default="flat",
+                        help="FAISS index type (approximate types pay off for large corpora; IVF needs enough vectors to train)")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Split the FAISS store into this many hash shards, searched in parallel")
+    parser.add_argument("--shard-by", default=None,
+                        help="Shard the FAISS store by this metadata field instead (e.g. doc_type), one shard per value")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Ignore the saved store and embed every document again")
 
-    root = Path(__file__).resolve().parents[1]
-    spec_path = root / "data_sources" / "engine_spec_data.doc"
+
+def pipeline_and_store(args) -> Optional[Tuple[EmbeddingPipeline, Any, Path]]:
+    """``(pipeline, store, index_path)`` from the parsed ``add_store_arguments`` options.
+
+    Prints why and returns ``None`` if the store or encoder cannot be used.
+    """
+    index_path = Path(args.index_path or f"vector_db/{args.store}_store")
 
     if args.store == "faiss":
         try:
-            from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+            from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore  # noqa: F401
         except Exception as exc:  # pragma: no cover - provide friendly error if faiss missing
             LOG.exception("Failed to import FAISS store: %s", exc)
             print("FAISS is not available. Install 'faiss-cpu' or choose '--store memory'.")
-            return
-        try:
-            store = FAISSEmbeddingsStore(dim=args.dim)
-        except Exception as exc:  # pragma: no cover - friendly message
-            LOG.exception("Failed to initialize FAISS store: %s", exc)
-            print("FAISS cannot be used: check that 'faiss-cpu' is installed and available.")
-            return
-    else:
-        store = EmbeddingsStore()
+            return None
+    try:
+        encoder = get_encoder("hash", dim=args.dim) if args.encoder == "hash" else \
+            get_encoder(args.encoder, model_name=args.model)
+    except Exception as exc:  # pragma: no cover - friendly message
+        LOG.exception("Failed to initialize the %s encoder: %s", args.encoder, exc)
+        print(f"The {args.encoder} encoder cannot be used: check that its dependencies are installed.")
+        return None
+    cache = EmbeddingCache(Path(args.embedding_cache)) if args.embedding_cache else None
+    pipeline = EmbeddingPipeline(encoder, cache, batch_size=args.embed_batch, workers=args.embed_workers)
+
+    try:
+        store = open_store(args, index_path, encoder.dim)
+    except Exception as exc:  # pragma: no cover - friendly message
+        LOG.exception("Failed to initialize %s store: %s", args.store, exc)
+        print(f"The {args.store} store cannot be used: check that its dependencies are installed.")
+        return None
+    return pipeline, store, index_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load spec docs and store embeddings into a vector DB")
+    add_store_arguments(parser)
+    args = parser.parse_args()
+
+    root = Path(__file__).resolve().parents[1]
+    spec_path = root / "data_sources" / "engine_spec_data.doc"
+
+    opened = pipeline_and_store(args)
+    if opened is None:
+        return
+    pipeline, store, index_path = opened
 
     try:
-        count = store_spec_embeddings(spec_path, store)
-        if args.store == "faiss":
-            # persist index and metadata if the store exposes 'save'
-            save_fn = getattr(store, "save", None)
-            if callable(save_fn):
-                try:
-                    save_fn(Path(args.index_path))
-                except Exception:
-                    LOG.exception("Failed to save FAISS index")
+        count = store_spec_embeddings(spec_path, store, pipeline)
+        # persist vectors and metadata if the store exposes 'save'
+        save_fn = getattr(store, "save", None)
+        if callable(save_fn):
+            try:
+                save_fn(index_path)
+            except Exception:
+                LOG.exception("Failed to save %s store", args.store)
         print(f"Stored {count} spec documents into vector DB ({args.store})")
     except Exception as exc:  # pragma: no cover - simple CLI error reporting
         LOG.exception("Failed to load and store spec data: %s", exc)
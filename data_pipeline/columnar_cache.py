@@ -0,0 +1,235 @@
+"""Columnar on-disk cache of sensor CSV exports.
+
+Parsing ``synthetic_engine_data.csv`` from text, especially the ``time`` column,
+dominates short pipeline runs. ``build_cache`` converts a CSV once into a
+Parquet dataset that is hive-partitioned by ``unit_id`` and uses compact
+dtypes: float32 sensors and ``rul``, int8 flags and a dictionary (categorical)
+``unit_id``. ``load_sensor_frame`` reads the cache when it is fresh and
+falls back to the CSV otherwise:
+
+- Freshness is judged by the source's SHA-256. Size and mtime are only a
+  shortcut: when they match, the file is not re-hashed.
+- Files are memory-mapped.
+- A ``unit_ids`` filter opens only those engines' partitions.
+
+Sensor values in the cache are rounded to float32. Write the cache with
+``sensor_dtype="float64"`` if exact CSV values matter. A float64 cache holds
+exactly the values in the CSV text, as does the CSV fallback (parsed with
+``float_precision="round_trip"``). Callers that write values somewhere, such
+as ingestion into Neo4j, pass ``sensor_dtype="float64"`` to
+``load_sensor_frame`` so a float32 cache is never used for them.
+
+Build or refresh the cache:
+    python data_pipeline/columnar_cache.py --csv data_sources/synthetic_engine_data.csv
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as pa_ds
+    from pyarrow import fs as pa_fs
+except Exception:  # pragma: no cover - optional dependency
+    pa = None
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # add project root to import path
+
+from data_pipeline.csv_stream import SENSOR_COLS
+
+CACHE_VERSION = 1
+META_FILE = "_cache_meta.json"
+
+
+def default_cache_dir(csv_path) -> Path:
+    """``<csv dir>/.cache/<csv stem>.parquet``"""
+    csv_path = Path(csv_path)
+    return csv_path.parent / ".cache" / f"{csv_path.stem}.parquet"
+
+
+def source_sha256(path, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed. Install 'pyarrow' to enable the columnar cache.")
+
+
+def _schemas(sensor_dtype: str):
+    sensor = pa.float32() if sensor_dtype == "float32" else pa.float64()
+    read_types = {"unit_id": pa.string(), "time": pa.timestamp("ns"),
+                  "failure": pa.int8(), "rul": pa.float64(), "event_in_horizon": pa.int8(),
+                  **{c: pa.float64() for c in SENSOR_COLS}}
+    stored = {"unit_id": pa.string(), "time": pa.timestamp("ns"),
+              **{c: sensor for c in SENSOR_COLS},
+              "failure": pa.int8(), "rul": sensor, "event_in_horizon": pa.int8()}
+    return read_types, stored
+
+
+def _partitioning():
+    return pa_ds.partitioning(pa.schema([("unit_id", pa.string())]), flavor="hive")
+
+
+def read_meta(cache_dir) -> Optional[dict]:
+    path = Path(cache_dir) / META_FILE
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def build_cache(csv_path, cache_dir=None, sensor_dtype: str = "float32",
+                block_size: int = 64 << 20) -> Path:
+    """Convert ``csv_path`` to a ``unit_id``-partitioned Parquet dataset and return its directory.
+
+    The CSV is read in ``block_size`` byte blocks, so memory stays bounded. The
+    dataset is written next to the target and swapped in when complete, so an
+    interrupted build never leaves a half-written cache that looks fresh.
+    """
+    _require_pyarrow()
+    csv_path = Path(csv_path)
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir(csv_path)
+    read_types, stored = _schemas(sensor_dtype)
+
+    reader = pa_csv.open_csv(csv_path, read_options=pa_csv.ReadOptions(block_size=block_size),
+                             convert_options=pa_csv.ConvertOptions(column_types=read_types))
+    names = [f.name for f in reader.schema]
+    target = pa.schema([(n, stored.get(n, reader.schema.field(n).type)) for n in names])
+    rows = 0
+
+    def batches():
+        nonlocal rows
+        for batch in reader:
+            rows += batch.num_rows
+            yield batch.cast(target)
+
+    tmp_dir = cache_dir.with_name(cache_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.parent.mkdir(parents=True, exist_ok=True)
+    pa_ds.write_dataset(batches(), tmp_dir, schema=target, format="parquet",
+                        partitioning=_partitioning(), max_partitions=1 << 20,
+                        use_threads=False, basename_template="part-{i}.parquet")
+    stat = csv_path.stat()
+    meta = {"version": CACHE_VERSION, "source": str(csv_path), "sha256": source_sha256(csv_path),
+            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "rows": rows,
+            "columns": names, "sensor_dtype": sensor_dtype}
+    with open(tmp_dir / META_FILE, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+    return cache_dir
+
+
+def cache_is_fresh(csv_path, cache_dir=None, sensor_dtype: Optional[str] = None) -> bool:
+    """True if ``cache_dir`` holds a complete cache of the current ``csv_path`` contents.
+
+    With ``sensor_dtype`` the cache must also have been built with that
+    dtype. Nothing is written; ``load_sensor_frame`` records a new mtime.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir(csv_path)
+    meta = read_meta(cache_dir)
+    if not meta or meta.get("version") != CACHE_VERSION:
+        return False
+    if sensor_dtype is not None and meta.get("sensor_dtype", "float32") != sensor_dtype:
+        return False
+    stat = Path(csv_path).stat()
+    if stat.st_size != meta["size"]:
+        return False
+    if stat.st_mtime_ns == meta["mtime_ns"]:
+        return True
+    # touched but possibly unchanged: the content hash decides
+    return source_sha256(csv_path) == meta["sha256"]
+
+
+def _record_mtime(csv_path, cache_dir) -> None:
+    """Store the source's current mtime in a fresh cache's meta, so the next check skips hashing."""
+    meta = read_meta(cache_dir)
+    mtime_ns = Path(csv_path).stat().st_mtime_ns
+    if meta is None or meta["mtime_ns"] == mtime_ns:
+        return
+    meta["mtime_ns"] = mtime_ns
+    with open(Path(cache_dir) / META_FILE, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2)
+
+
+def read_cache(cache_dir, unit_ids: Optional[Iterable[str]] = None,
+               columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read the cached frame (memory-mapped), sorted by ``unit_id, time``.
+
+    With ``unit_ids`` only those engines' partitions are opened. ``unit_id``
+    comes back as a categorical whose categories are the engines present,
+    in sorted order.
+    """
+    _require_pyarrow()
+    # files starting with "_" (the meta file) are ignored by dataset discovery
+    dataset = pa_ds.dataset(str(cache_dir), format="parquet",
+                            partitioning=pa_ds.HivePartitioning.discover(infer_dictionary=True),
+                            filesystem=pa_fs.LocalFileSystem(use_mmap=True))
+    filt = None
+    if unit_ids is not None:
+        filt = pa_ds.field("unit_id").isin([str(u) for u in unit_ids])
+    order = (read_meta(cache_dir) or {}).get("columns") or dataset.schema.names
+    if columns is not None:
+        wanted = {"unit_id", "time", *columns}
+        order = [c for c in order if c in wanted]
+    df = dataset.to_table(columns=order, filter=filt).to_pandas()
+    df["unit_id"] = df["unit_id"].cat.remove_unused_categories()
+    df["unit_id"] = df["unit_id"].cat.reorder_categories(sorted(df["unit_id"].cat.categories))
+    return df.sort_values(["unit_id", "time"], kind="stable").reset_index(drop=True)
+
+
+def load_sensor_frame(csv_path, unit_ids: Optional[Iterable[str]] = None,
+                      columns: Optional[Sequence[str]] = None, use_cache: bool = True,
+                      cache_dir=None, sensor_dtype: Optional[str] = None) -> pd.DataFrame:
+    """Load a sensor CSV with ``time`` parsed, from the columnar cache when it is fresh.
+
+    Falls back to ``pd.read_csv`` when pyarrow is missing, no cache was built,
+    the CSV changed since or the cache's dtype is not ``sensor_dtype``
+    (``"float64"`` for exact values; default: any). In that case the frame
+    keeps the CSV's row order and dtypes.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir(csv_path)
+    if use_cache and pa is not None and cache_is_fresh(csv_path, cache_dir, sensor_dtype):
+        _record_mtime(csv_path, cache_dir)
+        return read_cache(cache_dir, unit_ids=unit_ids, columns=columns)
+    usecols = None if columns is None else list(dict.fromkeys(["unit_id", "time", *columns]))
+    # round_trip parses each value exactly, matching a float64 cache bit for bit
+    df = pd.read_csv(csv_path, parse_dates=["time"], usecols=usecols, float_precision="round_trip")
+    if unit_ids is not None:
+        df = df[df["unit_id"].isin(list(unit_ids))].reset_index(drop=True)
+    return df
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    p = argparse.ArgumentParser()
+    p.add_argument("--csv", required=True, help="Sensor CSV export to cache")
+    p.add_argument("--cache-dir", help="Target directory (default: <csv dir>/.cache/<stem>.parquet)")
+    p.add_argument("--sensor-dtype", choices=("float32", "float64"), default="float32",
+                   help="float64 keeps exact CSV values; Load_Engn_Data.py only uses a float64 cache")
+    p.add_argument("--force", action="store_true", help="Rebuild even if the cache is fresh")
+    args = p.parse_args()
+
+    if not args.force and cache_is_fresh(args.csv, args.cache_dir, args.sensor_dtype):
+        print("Cache is up to date:", args.cache_dir or default_cache_dir(args.csv))
+        sys.exit(0)
+    t0 = time.perf_counter()
+    out = build_cache(args.csv, args.cache_dir, sensor_dtype=args.sensor_dtype)
+    print(f"Wrote {read_meta(out)['rows']} rows to {out} in {time.perf_counter() - t0:.2f}s")
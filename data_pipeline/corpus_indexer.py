@@ -0,0 +1,205 @@
+"""Index the markdown corpus under ``docs/`` into the vector store, chunk by chunk.
+
+Every ``*.md`` file is split along its headings and then into overlapping
+windows of at most ``max_tokens`` whitespace-delimited tokens (``overlap``
+tokens repeated between neighbours). One vector is stored per chunk, so a
+search returns the passage that matched rather than a whole manual.
+
+Each chunk's metadata records:
+
+- ``source``: the file, relative to the corpus root;
+- ``doc_type``: its top-level directory (``maintenance_manuals``, ...);
+- ``heading``: the heading path (``Maintenance Manual — FM-01 > Steps``);
+- ``fm_id``: the failure-mode ids it belongs to (from the file name, else
+  the heading, else the text);
+- ``chunk``, ``start``, ``end`` and ``text``: the chunk's position and passage.
+
+Runs are incremental. Chunks are stored under ``docs:<file>#<n>`` with the
+file's content hash. A file whose hash is unchanged is skipped without
+being read into chunks. A changed file has its chunks upserted, and surplus
+old chunks deleted. Chunks of deleted files are removed. Chunks of every
+changed file are embedded together, in ``batch_size`` batches across
+``workers`` concurrent encoder calls, through the shared embedding pipeline
+and its on-disk cache.
+
+    python -m data_pipeline.corpus_indexer --store faiss
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from data_pipeline.embedding_pipeline import EmbeddingPipeline
+from data_pipeline.Load_Spec_Data import add_store_arguments, pipeline_and_store
+
+LOG = logging.getLogger(__name__)
+
+DOC_PREFIX = "docs:"
+DEFAULT_MAX_TOKENS = 200
+DEFAULT_OVERLAP = 40
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_TOKEN = re.compile(r"\S+")
+_FM_ID = re.compile(r"\bFM-\d{2}\b")
+
+
+def iter_sections(text: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield ``(heading path, start, end)`` character spans of a markdown text's sections.
+
+    A section runs from the line after a heading to the next heading.
+    Headings inside fenced code blocks are ignored.
+    """
+    path: List[Tuple[int, str]] = []
+    start, offset, fenced = 0, 0, False
+    for line in text.splitlines(keepends=True):
+        if _FENCE.match(line):
+            fenced = not fenced
+        match = None if fenced else _HEADING.match(line)
+        if match:
+            yield " > ".join(title for _, title in path), start, offset
+            level = len(match.group(1))
+            path = [(lvl, title) for lvl, title in path if lvl < level] + [(level, match.group(2))]
+            start = offset + len(line)
+        offset += len(line)
+    yield " > ".join(title for _, title in path), start, offset
+
+
+def chunk_markdown(text: str, max_tokens: int = DEFAULT_MAX_TOKENS,
+                   overlap: int = DEFAULT_OVERLAP) -> List[Dict[str, Any]]:
+    """Split markdown into chunks of at most ``max_tokens`` tokens, ``overlap`` shared with the previous one.
+
+    Returns ``{"heading", "start", "end", "text"}`` dicts in document order.
+    Chunks never cross a heading.
+    """
+    if max_tokens < 1 or not 0 <= overlap < max_tokens:
+        raise ValueError("need max_tokens >= 1 and 0 <= overlap < max_tokens")
+    step = max_tokens - overlap
+    chunks = []
+    for heading, lo, hi in iter_sections(text):
+        spans = [m.span() for m in _TOKEN.finditer(text, lo, hi)]
+        for first in range(0, len(spans), step):
+            last = min(first + max_tokens, len(spans)) - 1
+            start, end = spans[first][0], spans[last][1]
+            chunks.append({"heading": heading, "start": start, "end": end, "text": text[start:end]})
+            if last == len(spans) - 1:
+                break
+    return chunks
+
+
+def file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _fm_ids(*candidates: str) -> List[str]:
+    for text in candidates:
+        found = sorted(set(_FM_ID.findall(text)))
+        if found:
+            return found
+    return []
+
+
+def chunk_file(root: Path, path: Path, max_tokens: int = DEFAULT_MAX_TOKENS,
+               overlap: int = DEFAULT_OVERLAP) -> List[Dict[str, Any]]:
+    """The chunk metadata dicts of one corpus file (see the module docstring)."""
+    rel = path.relative_to(root).as_posix()
+    text = path.read_text(encoding="utf-8")
+    doc_type = rel.split("/")[0] if "/" in rel else "root"
+    chunks = []
+    for i, chunk in enumerate(chunk_markdown(text, max_tokens, overlap)):
+        chunks.append({"source": rel, "doc_type": doc_type, "heading": chunk["heading"],
+                       "fm_id": _fm_ids(path.name, chunk["heading"], chunk["text"]),
+                       "chunk": i, "start": chunk["start"], "end": chunk["end"], "text": chunk["text"]})
+    return chunks
+
+
+def embedding_text(meta: Dict[str, Any]) -> str:
+    """What gets embedded for a chunk: its heading path (context) and passage."""
+    return f"{meta['heading']}\n\n{meta['text']}" if meta["heading"] else meta["text"]
+
+
+def _doc_id(rel: str, i: int) -> str:
+    return f"{DOC_PREFIX}{rel}#{i}"
+
+
+def index_corpus(root: Path, store: Any, pipeline: Optional[EmbeddingPipeline] = None,
+                 max_tokens: int = DEFAULT_MAX_TOKENS, overlap: int = DEFAULT_OVERLAP,
+                 pattern: str = "*.md") -> Dict[str, int]:
+    """Bring ``store`` up to date with the markdown files under ``root``.
+
+    Returns counts: ``files``, ``skipped`` (unchanged), ``indexed``,
+    ``chunks`` (embedded this run) and ``deleted`` (chunks removed).
+    """
+    root = Path(root)
+    pipeline = pipeline or EmbeddingPipeline()
+    stored: Dict[str, Dict[str, Optional[str]]] = {}
+    for doc_id, h in store.doc_hashes(DOC_PREFIX).items():
+        rel, _, _ = doc_id[len(DOC_PREFIX):].rpartition("#")
+        stored.setdefault(rel, {})[doc_id] = h
+
+    files = sorted(p for p in root.rglob(pattern) if p.is_file())
+    doc_ids: List[str] = []
+    metadatas: List[Dict[str, Any]] = []
+    hashes: List[str] = []
+    stale: List[str] = []
+    skipped = 0
+    for path in files:
+        rel = path.relative_to(root).as_posix()
+        h = file_hash(path.read_bytes())
+        old = stored.pop(rel, {})
+        if old and all(v == h for v in old.values()):
+            skipped += 1
+            continue
+        chunks = chunk_file(root, path, max_tokens, overlap)
+        ids = [_doc_id(rel, i) for i in range(len(chunks))]
+        doc_ids.extend(ids)
+        metadatas.extend(chunks)
+        hashes.extend([h] * len(chunks))
+        stale.extend(sorted(set(old) - set(ids)))
+    # every chunk of a file that no longer exists
+    for old in stored.values():
+        stale.extend(old)
+
+    if doc_ids:
+        vectors = pipeline.embed(embedding_text(m) for m in metadatas)
+        store.upsert(doc_ids, np.asarray(vectors, dtype="float32"), metadatas, content_hashes=hashes)
+    deleted = store.delete(stale) if stale else 0
+    stats = {"files": len(files), "skipped": skipped, "indexed": len(files) - skipped,
+             "chunks": len(doc_ids), "deleted": deleted}
+    LOG.info("Corpus %s: %d files (%d unchanged, %d indexed), %d chunks embedded, %d chunks deleted",
+             root, stats["files"], stats["skipped"], stats["indexed"], stats["chunks"], stats["deleted"])
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Chunk and index the docs/ markdown corpus into a vector DB")
+    parser.add_argument("--root", default=str(Path(__file__).resolve().parents[1] / "docs"),
+                        help="Corpus directory (default: docs/)")
+    parser.add_argument("--max-tokens", type=int, default=DEFAULT_MAX_TOKENS, help="Tokens per chunk at most")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP, help="Tokens shared by neighbouring chunks")
+    # unchanged files are skipped, so pass --rebuild after changing --max-tokens/--overlap
+    add_store_arguments(parser)
+    args = parser.parse_args()
+
+    opened = pipeline_and_store(args)
+    if opened is None:
+        return
+    pipeline, store, index_path = opened
+    try:
+        stats = index_corpus(Path(args.root), store, pipeline, max_tokens=args.max_tokens, overlap=args.overlap)
+        if stats["chunks"] or stats["deleted"]:
+            store.save(index_path)
+        print(f"Indexed {stats['indexed']} of {stats['files']} files ({stats['chunks']} chunks, "
+              f"{stats['deleted']} removed) into vector DB ({args.store})")
+    except Exception as exc:  # pragma: no cover - simple CLI error reporting
+        LOG.exception("Failed to index corpus %s: %s", args.root, exc)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Bounded-memory streaming reader for sensor CSV exports.
+
+``iter_csv_batches`` reads the CSV in fixed-dtype chunks and yields
+``(kind, rows)`` UNWIND batches, where ``kind`` is one of ``"engines"``,
+``"readings"``, ``"failures"`` or ``"windows"``. Only one chunk plus at
+most ``window_size`` buffered rows per unit are held at a time, so memory
+stays flat regardless of file size.
+
+Rows of a unit must appear in time order (units may be interleaved). For a
+file already sorted by ``(unit_id, time)`` the batches match the in-memory
+path of ``ingest_csv`` exactly: same ``seq`` values, same ``window_id``s
+and the same window features.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline.windowing import build_window_records, compute_window_stats, first_window_start, window_sums
+
+SENSOR_COLS = [f"sensor_{i}" for i in range(1, 7)]
+
+# fixed dtypes so every chunk parses identically (no per-chunk type inference)
+CSV_DTYPES = {
+    "unit_id": "str",
+    **{c: "float64" for c in SENSOR_COLS},
+    "failure": "int8",
+    "rul": "float64",
+    "event_in_horizon": "int8",
+}
+
+REQUIRED_COLUMNS = {"unit_id", "time", "failure"}
+
+Batch = Tuple[str, List[Dict[str, Any]]]
+
+
+def reading_id(unit_id, ts: str) -> str:
+    """Deterministic SensorReading id shared by the UNWIND path and bulk-import files."""
+    return f"{unit_id}__{ts}"
+
+
+def failure_event_id(unit_id, ts: str) -> str:
+    """Deterministic FailureEvent id (one failure per unit and timestamp)."""
+    return f"{unit_id}__failure__{ts}"
+
+
+def reading_rows(frame: pd.DataFrame, seq: Sequence[int]) -> List[Dict[str, Any]]:
+    """Build ``CYpher_UNWIND_READINGS`` row dicts for ``frame`` (one ``seq`` per row)."""
+    n = len(frame)
+    sensors = [frame[c].astype(float).tolist() if c in frame.columns else [float("nan")] * n
+               for c in SENSOR_COLS]
+    rows = []
+    for i, (unit, ts) in enumerate(zip(frame["unit_id"].tolist(), frame["time"].tolist())):
+        ts = ts.isoformat()
+        row = {"unit_id": unit, "reading_id": reading_id(unit, ts), "ts": ts, "seq": int(seq[i])}
+        for c, col in zip(SENSOR_COLS, sensors):
+            row[c] = col[i]
+        rows.append(row)
+    return rows
+
+
+def failure_rows(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Build ``CYpher_UNWIND_FAILURES`` dicts for rows flagged ``failure == 1``."""
+    fails = frame[frame["failure"] == 1]
+    rows = []
+    for unit, ts in zip(fails["unit_id"].tolist(), fails["time"].tolist()):
+        ts = ts.isoformat()
+        rows.append({
+            "unit_id": unit,
+            "ts": ts,
+            "event_id": failure_event_id(unit, ts),
+            "severity": int(1),
+            "type": "component_failure",
+        })
+    return rows
+
+
+class UnitWindowState:
+    """Carries one unit's unfinished window rows across chunk boundaries.
+
+    ``offset`` is the unit-relative index of the first buffered row and
+    ``next_start`` the unit-relative start of the next window to emit, so
+    windows (and their ids) come out exactly as if the unit had been seen in
+    a single frame.
+    """
+
+    def __init__(self, unit_id, window_size: int, stride: int, features_cols: Sequence[str],
+                 skip_until: Optional[pd.Timestamp] = None):
+        self.unit_id = unit_id
+        # windows made only of rows at or before this time were committed by an earlier run
+        self.skip_until = np.datetime64(skip_until.to_datetime64(), "ns") if skip_until is not None else None
+        self.window_size = window_size
+        self.stride = stride
+        self.features_cols = list(features_cols)
+        self.offset = 0
+        self.next_start = 0
+        self.values = np.empty((0, len(self.features_cols)), dtype=np.float64)
+        self.failures = np.empty(0, dtype=np.int64)
+        self.times = np.empty(0, dtype="datetime64[ns]")
+
+    def feed(self, values: np.ndarray, failures: np.ndarray, times: np.ndarray) -> List[Dict[str, Any]]:
+        """Append the unit's next rows and return the windows they complete."""
+        buf_values = np.concatenate([self.values, values]) if len(self.values) else values
+        buf_failures = np.concatenate([self.failures, failures]) if len(self.failures) else failures
+        buf_times = np.concatenate([self.times, times]) if len(self.times) else times
+        n = len(buf_values)
+
+        first = self.next_start - self.offset
+        if self.skip_until is not None:
+            done = int(np.searchsorted(buf_times, self.skip_until, side="right"))
+            self.next_start = max(self.next_start,
+                                  first_window_start(self.offset + done, self.window_size, self.stride))
+            first = self.next_start - self.offset
+            if done < n:
+                self.skip_until = None
+        windows: List[Dict[str, Any]] = []
+        if first < n:
+            starts, stats = compute_window_stats(buf_values[first:], self.window_size, self.stride)
+            if len(starts):
+                local = starts + first
+                windows = build_window_records(
+                    self.unit_id, starts, self.window_size, stats,
+                    window_sums(buf_failures[first:], starts, self.window_size),
+                    pd.to_datetime(buf_times[local]), pd.to_datetime(buf_times[local + self.window_size - 1]),
+                    self.features_cols, offset=self.next_start)
+                self.next_start += len(starts) * self.stride
+
+        keep_from = min(self.next_start - self.offset, n)
+        self.values = buf_values[keep_from:].copy()
+        self.failures = buf_failures[keep_from:].copy()
+        self.times = buf_times[keep_from:].copy()
+        self.offset += keep_from
+        return windows
+
+
+def iter_csv_batches(csv_path, batch_size: int = 500, chunk_size: int = 100_000,
+                     make_windows: bool = False, window_size: int = 200, stride: int = 50,
+                     features_cols: Optional[Sequence[str]] = None,
+                     watermarks=None) -> Iterator[Batch]:
+    """Stream ``(kind, rows)`` UNWIND batches from ``csv_path`` chunk by chunk.
+
+    Within a chunk, new engines are yielded before the readings, failures and
+    windows that reference them. With ``watermarks`` (see
+    ``data_pipeline.watermarks``), readings at or before an engine's watermark
+    and windows already committed are skipped.
+    """
+    states: Dict[Any, UnitWindowState] = {}
+    seen_units: set = set()
+    pending: Dict[str, List[Dict[str, Any]]] = {"readings": [], "failures": [], "windows": []}
+    seq = 0
+
+    # round_trip: the same exact values as the in-memory path and a float64 columnar cache
+    reader = pd.read_csv(csv_path, dtype=CSV_DTYPES, parse_dates=["time"], chunksize=chunk_size,
+                         float_precision="round_trip")
+    for chunk in reader:
+        if not REQUIRED_COLUMNS.issubset(chunk.columns):
+            raise ValueError(f"CSV must contain at least columns: {REQUIRED_COLUMNS}. "
+                             f"Found: {chunk.columns.tolist()}")
+        cols = list(features_cols) if features_cols is not None else \
+            [c for c in chunk.columns if c.startswith("sensor_")]
+
+        new_units = [u for u in pd.unique(chunk["unit_id"]).tolist() if u not in seen_units]
+        if new_units:
+            seen_units.update(new_units)
+            yield "engines", [{"id": u} for u in new_units]
+
+        if watermarks:
+            fresh = watermarks.new_rows_mask(chunk)
+            pending["readings"].extend(reading_rows(chunk[fresh], np.arange(seq, seq + len(chunk))[fresh]))
+        else:
+            pending["readings"].extend(reading_rows(chunk, range(seq, seq + len(chunk))))
+        seq += len(chunk)
+        pending["failures"].extend(failure_rows(chunk))
+
+        if make_windows:
+            for unit, grp in chunk.groupby("unit_id", sort=False):
+                state = states.get(unit)
+                if state is None:
+                    state = states[unit] = UnitWindowState(
+                        unit, window_size, stride, cols,
+                        skip_until=watermarks.window_cutoff(unit) if watermarks else None)
+                pending["windows"].extend(state.feed(
+                    grp[cols].to_numpy(dtype=np.float64),
+                    grp["failure"].to_numpy(dtype=np.int64),
+                    grp["time"].to_numpy(dtype="datetime64[ns]")))
+
+        for kind, rows in pending.items():
+            full = len(rows) - len(rows) % batch_size
+            for i in range(0, full, batch_size):
+                yield kind, rows[i:i + batch_size]
+            del rows[:full]
+
+    for kind, rows in pending.items():
+        if rows:
+            yield kind, rows
@@ -1,3 +1,230 @@
-def build_embeddings(docs):
-    """Placeholder to build embeddings for documents."""
-    return []
+"""Batched text embedding with a persistent, content-addressed cache.
+
+An ``EmbeddingPipeline`` turns texts into an (N, dim) float32 matrix:
+
+- the encoder is pluggable. ``get_encoder(name, **kwargs)`` builds one of
+  ``ENCODERS`` (``hash``, ``sentence-transformers``), and
+  ``register_encoder`` adds more. Any object with ``model_id``, ``dim`` and
+  ``encode(texts) -> ndarray`` works;
+- texts are encoded ``batch_size`` at a time, duplicates only once.
+  ``workers > 1`` encodes that many batches concurrently on threads (model
+  backends and hashlib release the GIL while they compute);
+- with an ``EmbeddingCache`` every vector is stored on disk (SQLite) under
+  ``sha256(model_id, text)``. Unchanged text is never embedded twice, across
+  runs and across loaders, and switching models never returns another
+  model's vectors.
+
+``HashEncoder`` is the dependency-free fallback: repeated sha256 digests of
+the text, scaled to [0, 1]. The digests are decoded with one NumPy call per
+batch, not a Python loop per byte.
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+except Exception:  # pragma: no cover - optional dependency
+    SentenceTransformer = None
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_CACHE_PATH = Path("vector_db/embedding_cache.sqlite")
+
+# stay below SQLite's bound-parameter limit on older builds
+_MAX_PARAMS = 900
+
+
+def hash_embeddings(texts: Sequence[str], dim: int = 128) -> np.ndarray:
+    """(N, dim) float32 hash embeddings, equal to ``Load_Spec_Data.deterministic_embedding`` row by row."""
+    blocks = -(-dim // 32)
+    digests = []
+    for text in texts:
+        base = hashlib.sha256(text.encode("utf-8"))
+        for i in range(blocks):
+            h = base.copy()
+            h.update(i.to_bytes(2, "little", signed=False))
+            digests.append(h.digest())
+    raw = np.frombuffer(b"".join(digests), dtype=np.uint8).reshape(len(texts), blocks * 32)
+    return raw[:, :dim].astype(np.float32) / np.float32(255.0)
+
+
+class HashEncoder:
+    """Deterministic sha256-based vectors: stable and free, but with no semantic similarity."""
+
+    def __init__(self, dim: int = 128):
+        self.dim = int(dim)
+        self.model_id = f"sha256-hash/{self.dim}"
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return hash_embeddings(texts, self.dim)
+
+
+class SentenceTransformerEncoder:
+    """A local ``sentence-transformers`` model (downloaded once into the HF cache)."""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: Optional[str] = None):
+        if SentenceTransformer is None:
+            raise RuntimeError("sentence-transformers is not installed. Install 'sentence-transformers' "
+                               "to use this encoder, or use the 'hash' encoder.")
+        self.model = SentenceTransformer(model_name, device=device)
+        self.dim = int(self.model.get_sentence_embedding_dimension())
+        self.model_id = f"sentence-transformers/{model_name}"
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(list(texts), batch_size=len(texts), convert_to_numpy=True,
+                                            show_progress_bar=False), dtype=np.float32)
+
+
+ENCODERS: Dict[str, Callable[..., Any]] = {
+    "hash": HashEncoder,
+    "sentence-transformers": SentenceTransformerEncoder,
+}
+
+
+def register_encoder(name: str, factory: Callable[..., Any]) -> None:
+    """Make ``get_encoder(name, ...)`` build encoders with ``factory``."""
+    ENCODERS[name] = factory
+
+
+def get_encoder(name: str = "hash", **kwargs):
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown encoder: {name!r} (expected one of {sorted(ENCODERS)})")
+    return ENCODERS[name](**kwargs)
+
+
+def cache_key(model_id: str, text: str) -> bytes:
+    return hashlib.sha256(model_id.encode("utf-8") + b"\0" + text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Embedding vectors on disk, keyed by ``cache_key(model_id, text)``.
+
+    One SQLite file; vectors are stored as raw float32 bytes. ``path=None``
+    keeps the cache in memory (for tests and one-off runs).
+    """
+
+    def __init__(self, path: Optional[Path] = DEFAULT_CACHE_PATH):
+        if path is None:
+            target = ":memory:"
+        else:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            target = str(path)
+        self.path = path
+        self._conn = sqlite3.connect(target, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings "
+                               "(key BLOB PRIMARY KEY, model_id TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """``{key: vector}`` for the keys that are cached."""
+        out: Dict[bytes, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique), _MAX_PARAMS):
+                chunk = unique[start:start + _MAX_PARAMS]
+                cur = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                out.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in cur)
+        return out
+
+    def put_many(self, model_id: str, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        rows = [(key, model_id, vectors.shape[1], vec.tobytes()) for key, vec in zip(keys, vectors)]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, model_id, dim, vector) VALUES (?, ?, ?, ?)", rows)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class EmbeddingPipeline:
+    """Encode texts in batches, reading and filling an optional ``EmbeddingCache``.
+
+    ``hits`` and ``encoded`` count texts served from the cache and texts
+    actually run through the encoder. ``workers`` batches are encoded at
+    once; the encoder's ``encode`` must then be thread-safe.
+    """
+
+    def __init__(self, encoder=None, cache: Optional[EmbeddingCache] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 workers: int = 1):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self.encoder = encoder if encoder is not None else HashEncoder()
+        self.cache = cache
+        self.batch_size = int(batch_size)
+        self.workers = max(1, int(workers))
+        self.hits = 0
+        self.encoded = 0
+
+    @property
+    def dim(self) -> int:
+        return self.encoder.dim
+
+    @property
+    def model_id(self) -> str:
+        return self.encoder.model_id
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        """(N, dim) float32 embeddings of ``texts``, in order."""
+        texts = list(texts)
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        keys = [cache_key(self.model_id, t) for t in texts]
+        cached = self.cache.get_many(keys) if self.cache is not None else {}
+        # each distinct missing text is encoded once, whatever its repeats
+        missing: Dict[bytes, List[int]] = {}
+        for i, key in enumerate(keys):
+            if key in cached:
+                out[i] = cached[key]
+            else:
+                missing.setdefault(key, []).append(i)
+        self.hits += len(texts) - sum(len(rows) for rows in missing.values())
+        pending = list(missing.items())
+        batches = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+        for batch, vectors in zip(batches, self._encode_batches([[texts[rows[0]] for _, rows in b] for b in batches])):
+            if vectors.shape != (len(batch), self.dim):
+                raise ValueError(f"{self.model_id} returned shape {vectors.shape} for {len(batch)} texts")
+            for (_, rows), vec in zip(batch, vectors):
+                out[rows] = vec
+            # written per batch, so an interrupted run keeps what it computed
+            if self.cache is not None:
+                self.cache.put_many(self.model_id, [key for key, _ in batch], vectors)
+            self.encoded += len(batch)
+        return out
+
+    def _encode_batches(self, batches: List[List[str]]) -> Iterable[np.ndarray]:
+        """Encoder output per batch, in order; up to ``workers`` batches run concurrently."""
+        def encode(batch: List[str]) -> np.ndarray:
+            return np.asarray(self.encoder.encode(batch), dtype=np.float32)
+
+        if self.workers <= 1 or len(batches) <= 1:
+            yield from map(encode, batches)
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            yield from pool.map(encode, batches)
+
+    def embed_one(self, text: str) -> List[float]:
+        """One text's embedding as a list (the ``embedding_fn`` shape agents expect)."""
+        return self.embed([text])[0].tolist()
+
+
+def build_embeddings(docs: Iterable[str], encoder: str = "hash", cache_path: Optional[Path] = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1, **encoder_kwargs) -> np.ndarray:
+    """Embed ``docs`` with the named encoder; ``cache_path`` enables the on-disk cache."""
+    cache = EmbeddingCache(cache_path) if cache_path is not None else None
+    try:
+        return EmbeddingPipeline(get_encoder(encoder, **encoder_kwargs), cache, batch_size, workers).embed(docs)
+    finally:
+        if cache is not None:
+            cache.close()
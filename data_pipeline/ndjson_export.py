@@ -0,0 +1,146 @@
+"""Streaming NDJSON export of ingestion batches.
+
+``NDJSONExportWriter`` appends every engine, reading, failure and window batch
+to one newline-delimited JSON file per kind as it is produced. Output can be
+plain, gzip or zstd compressed (``engines.ndjson``, ``readings.ndjson.gz``,
+``windows.ndjson.zst``, ...). Nothing is held in memory and nothing is
+overwritten, so an export is complete however many batches it receives.
+
+The writer also implements the ``Neo4jIngestor`` batch interface. Passing it
+as ``ingest_csv(..., ingestor=writer)`` turns a run into a full offline
+export; the CLI's ``--export DIR`` does this.
+
+``iter_ndjson`` and ``read_export`` read the files back lazily, one dict at a
+time, whatever the compression. NaN sensor values are written as the JSON
+extension ``NaN``, which Python's ``json`` (and pandas) read back.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except Exception:  # pragma: no cover - optional dependency
+    zstandard = None
+
+from data_pipeline.watermarks import Watermarks
+
+KINDS = ("engines", "readings", "failures", "windows")
+SUFFIXES = {None: ".ndjson", "gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+
+_encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+
+def _open_text(path: Path, mode: str, compression: Optional[str], level: Optional[int] = None):
+    """Open ``path`` as text for ``"w"``/``"a"``/``"r"`` with the given compression."""
+    if compression is None:
+        return open(path, mode, encoding="utf-8", newline="\n")
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="\n",
+                         compresslevel=6 if level is None else level)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed. Install 'zstandard' for zstd exports.")
+        if mode == "r":
+            return zstandard.open(path, "rt", encoding="utf-8", newline="\n")
+        cctx = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return zstandard.open(path, mode + "t", cctx=cctx, encoding="utf-8", newline="\n")
+    raise ValueError(f"Unknown compression: {compression!r} (expected one of {list(SUFFIXES)})")
+
+
+def _compression_of(path: Path) -> Optional[str]:
+    for compression, suffix in SUFFIXES.items():
+        if compression and path.name.endswith(suffix):
+            return compression
+    return None
+
+
+class NDJSONExportWriter:
+    """Append-only NDJSON files for engines, readings, failures and windows.
+
+    ``append=True`` continues existing files (compressed files gain a new
+    frame/member, which readers handle transparently) instead of truncating.
+    """
+
+    def __init__(self, out_dir, compression: Optional[str] = None, level: Optional[int] = None,
+                 append: bool = False):
+        if compression not in SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression!r} (expected one of {list(SUFFIXES)})")
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self.paths = {kind: self.out_dir / f"{kind}{SUFFIXES[compression]}" for kind in KINDS}
+        self.counts: Dict[str, int] = dict.fromkeys(KINDS, 0)
+        self._files = {kind: _open_text(path, "a" if append else "w", compression, level)
+                       for kind, path in self.paths.items()}
+
+    @property
+    def rows_written(self) -> int:
+        return sum(self.counts.values())
+
+    def write_batch(self, kind: str, rows: List[Dict[str, Any]]) -> None:
+        if kind not in self._files:
+            raise ValueError(f"Unknown batch kind: {kind}")
+        if not rows:
+            return
+        self._files[kind].write("\n".join(map(_encode, rows)) + "\n")
+        self.counts[kind] += len(rows)
+
+    def close(self) -> None:
+        for fh in self._files.values():
+            fh.close()
+        self._files = {}
+
+    # Neo4jIngestor interface, so ingest_csv can export instead of writing to Neo4j
+    def ensure_constraints(self):
+        pass
+
+    def read_watermarks(self) -> Watermarks:
+        return Watermarks()
+
+    def start_writer(self, workers=4, queue_size=8, max_retries=5, on_commit=None):
+        return self
+
+    def flush(self):
+        for fh in self._files.values():
+            fh.flush()
+        return self
+
+    def ingest_engines_batch(self, engines):
+        self.write_batch("engines", engines)
+
+    def ingest_readings_batch(self, rows):
+        self.write_batch("readings", rows)
+
+    def ingest_failures_batch(self, fails):
+        self.write_batch("failures", fails)
+
+    def ingest_windows_batch(self, windows):
+        self.write_batch("windows", windows)
+
+
+def iter_ndjson(path) -> Iterator[Dict[str, Any]]:
+    """Lazily yield the records of an NDJSON file (compression taken from the suffix)."""
+    path = Path(path)
+    with _open_text(path, "r", _compression_of(path)) as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def export_path(out_dir, kind: str) -> Path:
+    """The ``kind`` file in an export directory, whichever compression it was written with."""
+    for suffix in SUFFIXES.values():
+        path = Path(out_dir) / f"{kind}{suffix}"
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"No {kind} export in {out_dir}")
+
+
+def read_export(out_dir, kind: str) -> Iterator[Dict[str, Any]]:
+    """Lazily yield one kind (``engines``, ``readings``, ``failures``, ``windows``) of an export."""
+    return iter_ndjson(export_path(out_dir, kind))
+
@@ -0,0 +1,172 @@
+"""Parallel, transactional Neo4j batch writer.
+
+``ParallelNeo4jWriter`` runs a fixed pool of worker threads, each holding its
+own session for its whole lifetime. Batches are split by a partition key
+(``unit_id`` for readings, failures and windows, ``id`` for engines) and each
+part is routed to the worker owning that key, so all MERGEs on a given Engine
+run serially on one worker and never contend for its lock, while different
+engines are written concurrently. Per-worker queues are bounded, so a fast
+producer blocks instead of buffering the whole file in memory.
+
+Every batch runs in a managed write transaction (``session.execute_write``);
+transient failures that outlive the driver's own retry window are retried
+again here with exponential backoff.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from neo4j import exceptions as neo4j_exceptions
+
+RETRYABLE_ERRORS = (
+    neo4j_exceptions.TransientError,
+    neo4j_exceptions.ServiceUnavailable,
+    neo4j_exceptions.SessionExpired,
+)
+
+_STOP = object()
+
+
+def _write_tx(tx, query, parameters):
+    return tx.run(query, parameters).consume()
+
+
+def partition_index(key: Any, partitions: int) -> int:
+    """Stable worker index for a partition key (same key -> same worker across runs)."""
+    return zlib.crc32(str(key).encode("utf-8")) % partitions
+
+
+class ParallelNeo4jWriter:
+    """Fan UNWIND batches out to `workers` threads with per-key ordering.
+
+    on_commit: optional callback ``(param_name, rows)`` invoked from the worker
+    thread after each sub-batch commits.
+    """
+
+    def __init__(self, driver, database: Optional[str] = None, workers: int = 4,
+                 queue_size: int = 8, max_retries: int = 5, retry_delay: float = 0.5,
+                 on_commit: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.driver = driver
+        self.database = database
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.on_commit = on_commit
+        self.rows_written = 0
+        self.batches_written = 0
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._threads = [threading.Thread(target=self._worker, args=(q,), name=f"neo4j-writer-{i}", daemon=True)
+                         for i, q in enumerate(self._queues)]
+        self._started = time.perf_counter()
+        for t in self._threads:
+            t.start()
+
+    # ---------------- producer side ----------------
+
+    def submit(self, query: str, param_name: str, rows: List[Dict[str, Any]], key: str = "unit_id") -> None:
+        """Queue ``rows`` for ``UNWIND $<param_name>``, split by ``rows[i][key]``."""
+        self._raise_if_failed()
+        if not rows:
+            return
+        parts: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for r in rows:
+            parts[partition_index(r[key], self.workers)].append(r)
+        for idx, part in parts.items():
+            self._put(self._queues[idx], (query, param_name, part))
+
+    def _put(self, q: queue.Queue, item) -> None:
+        # bounded put that notices a dead worker instead of blocking forever
+        while True:
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                self._raise_if_failed()
+
+    def close(self) -> None:
+        """Wait for all queued batches to commit, stop the workers and re-raise any failure."""
+        for q in self._queues:
+            if self._error is None:
+                self._put(q, _STOP)
+        for t in self._threads:
+            t.join()
+        self._raise_if_failed()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._error = self._error or exc
+            for t in self._threads:
+                t.join()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.rows_written / elapsed if elapsed > 0 else 0.0
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Neo4j writer failed: {self._error}") from self._error
+
+    # ---------------- worker side ----------------
+
+    def _worker(self, q: queue.Queue) -> None:
+        try:
+            with self.driver.session(database=self.database) as sess:
+                self._consume(sess, q)
+        except BaseException as exc:  # surfaced to the producer via _raise_if_failed
+            self._fail(exc)
+
+    def _consume(self, sess, q: queue.Queue) -> None:
+        while self._error is None:  # another worker failed -> stop consuming
+            try:
+                item = q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is _STOP:
+                return
+            query, param_name, rows = item
+            try:
+                self._write_with_retry(sess, query, {param_name: rows})
+            except Exception as exc:
+                sample = rows[0] if rows else None
+                raise RuntimeError(f"batch ${param_name} failed; sample row: {sample}. Cause: {exc}") from exc
+            with self._lock:
+                self.rows_written += len(rows)
+                self.batches_written += 1
+            if self.on_commit is not None:
+                self.on_commit(param_name, rows)
+
+    def _fail(self, exc: BaseException) -> None:
+        with self._lock:
+            if self._error is None:
+                self._error = exc
+
+    def _write_with_retry(self, sess, query: str, parameters: Dict[str, Any]) -> None:
+        attempt = 0
+        while True:
+            try:
+                sess.execute_write(_write_tx, query, parameters)
+                return
+            except RETRYABLE_ERRORS:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                time.sleep(self.retry_delay * (2 ** (attempt - 1)))
@@ -0,0 +1,117 @@
+"""Time-bucketed reading layout: one ReadingBucket node per engine per bucket.
+
+Instead of a ``SensorReading`` node (plus a ``HAS_READING`` edge) per row,
+readings are packed into ``(:Engine)-[:HAS_BUCKET]->(:ReadingBucket)`` nodes
+holding parallel array properties ``ts``, ``seq`` and ``sensor_1``..``sensor_6``
+for every sample in ``[start_ts, start_ts + bucket_seconds)``.
+
+``pack_buckets`` groups UNWIND reading rows into bucket payloads and
+``unpack_buckets`` turns bucket records back into a time-sorted DataFrame.
+See ``docs/graph_storage_layouts.md`` for the size/latency trade-offs.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import pandas as pd
+
+from data_pipeline.csv_stream import SENSOR_COLS
+
+DEFAULT_BUCKET_SECONDS = 3600
+
+ARRAY_FIELDS = ["ts", "seq", *SENSOR_COLS]
+
+CREATE_BUCKET_CONSTRAINT = """
+CREATE CONSTRAINT IF NOT EXISTS FOR (rb:ReadingBucket) REQUIRE rb.bucket_id IS UNIQUE
+"""
+
+# Appends only samples whose ts is not already in the bucket, so re-running a
+# batch (retries, resumed runs) leaves the arrays unchanged.
+CYpher_UNWIND_BUCKETS = """
+UNWIND $buckets AS b
+MERGE (eng:Engine {id: b.unit_id})
+MERGE (rb:ReadingBucket {bucket_id: b.bucket_id})
+ON CREATE SET rb.start_ts = b.start_ts, rb.end_ts = b.end_ts, rb.bucket_seconds = b.bucket_seconds,
+              rb.ts = [], rb.seq = [],
+              rb.sensor_1 = [], rb.sensor_2 = [], rb.sensor_3 = [],
+              rb.sensor_4 = [], rb.sensor_5 = [], rb.sensor_6 = []
+WITH eng, rb, b, [i IN range(0, size(b.ts) - 1) WHERE NOT b.ts[i] IN rb.ts] AS new
+SET rb.ts = rb.ts + [i IN new | b.ts[i]],
+    rb.seq = rb.seq + [i IN new | b.seq[i]],
+    rb.sensor_1 = rb.sensor_1 + [i IN new | b.sensor_1[i]],
+    rb.sensor_2 = rb.sensor_2 + [i IN new | b.sensor_2[i]],
+    rb.sensor_3 = rb.sensor_3 + [i IN new | b.sensor_3[i]],
+    rb.sensor_4 = rb.sensor_4 + [i IN new | b.sensor_4[i]],
+    rb.sensor_5 = rb.sensor_5 + [i IN new | b.sensor_5[i]],
+    rb.sensor_6 = rb.sensor_6 + [i IN new | b.sensor_6[i]]
+MERGE (eng)-[:HAS_BUCKET]->(rb)
+WITH eng, max(reduce(m = '', t IN b.ts | CASE WHEN t > m THEN t ELSE m END)) AS last_ts
+SET eng.last_ingested_ts = CASE WHEN eng.last_ingested_ts IS NULL OR last_ts > eng.last_ingested_ts
+                                THEN last_ts ELSE eng.last_ingested_ts END
+"""
+
+# ts values are ISO strings, so lexical comparison orders them correctly
+CYpher_READ_BUCKET_RANGE = """
+MATCH (:Engine {id: $unit_id})-[:HAS_BUCKET]->(rb:ReadingBucket)
+WHERE rb.start_ts <= $end AND rb.end_ts > $start
+RETURN rb.ts AS ts, rb.seq AS seq, rb.sensor_1 AS sensor_1, rb.sensor_2 AS sensor_2,
+       rb.sensor_3 AS sensor_3, rb.sensor_4 AS sensor_4, rb.sensor_5 AS sensor_5,
+       rb.sensor_6 AS sensor_6
+ORDER BY rb.start_ts
+"""
+
+
+def bucket_start(ts: str, bucket_seconds: int = DEFAULT_BUCKET_SECONDS) -> datetime:
+    """Floor an ISO timestamp to its bucket boundary (buckets are aligned to the epoch)."""
+    dt = datetime.fromisoformat(ts)
+    epoch = datetime(1970, 1, 1, tzinfo=dt.tzinfo)
+    offset = int((dt - epoch).total_seconds()) // bucket_seconds * bucket_seconds
+    return epoch + timedelta(seconds=offset)
+
+
+def pack_buckets(rows: Iterable[Mapping[str, Any]],
+                 bucket_seconds: int = DEFAULT_BUCKET_SECONDS) -> List[Dict[str, Any]]:
+    """Group reading rows (``CYpher_UNWIND_READINGS`` dicts) into bucket payloads.
+
+    Rows keep their input order inside a bucket; buckets come out in order of
+    first appearance.
+    """
+    buckets: Dict[tuple, Dict[str, Any]] = {}
+    for r in rows:
+        start = bucket_start(r["ts"], bucket_seconds)
+        key = (r["unit_id"], start)
+        b = buckets.get(key)
+        if b is None:
+            start_ts = start.isoformat()
+            b = buckets[key] = {
+                "unit_id": r["unit_id"],
+                "bucket_id": f"{r['unit_id']}__{start_ts}",
+                "start_ts": start_ts,
+                "end_ts": (start + timedelta(seconds=bucket_seconds)).isoformat(),
+                "bucket_seconds": bucket_seconds,
+                **{f: [] for f in ARRAY_FIELDS},
+            }
+        for f in ARRAY_FIELDS:
+            b[f].append(r[f])
+    return list(buckets.values())
+
+
+def unpack_buckets(records: Iterable[Mapping[str, Any]], start: Optional[str] = None,
+                   end: Optional[str] = None) -> pd.DataFrame:
+    """Flatten bucket records into a DataFrame with one row per reading.
+
+    ``start``/``end`` (ISO strings, inclusive) trim the partial buckets at the
+    edges of a range query. The result is sorted by ``time``.
+    """
+    columns: Dict[str, list] = {f: [] for f in ARRAY_FIELDS}
+    for rec in records:
+        for f in ARRAY_FIELDS:
+            columns[f].extend(rec[f])
+    df = pd.DataFrame(columns)
+    if start is not None:
+        df = df[df["ts"] >= start]
+    if end is not None:
+        df = df[df["ts"] <= end]
+    df.insert(0, "time", pd.to_datetime(df.pop("ts")))
+    return df.sort_values("time", kind="stable").reset_index(drop=True)
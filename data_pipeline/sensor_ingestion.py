@@ -1,5 +1,8 @@
-def ingest_sensor_csv(csv_path: str):
-    """Read sensor CSV and prepare for graph insertion."""
-    import pandas as pd
-    df = pd.read_csv(csv_path)
-    return df
+def ingest_sensor_csv(csv_path: str, unit_ids=None, use_cache: bool = True):
+    """Read sensor CSV and prepare for graph insertion.
+
+    Uses the columnar cache (``data_pipeline.columnar_cache``) when one was
+    built for ``csv_path``; ``unit_ids`` limits the load to those engines.
+    """
+    from data_pipeline.columnar_cache import load_sensor_frame
+    return load_sensor_frame(csv_path, unit_ids=unit_ids, use_cache=use_cache)
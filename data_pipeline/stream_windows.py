@@ -0,0 +1,192 @@
+"""Incremental sliding-window aggregator for live sensor feeds.
+
+``StreamingWindowAggregator`` consumes readings one at a time, from any
+number of interleaved engines. For every window it completes, it emits the
+same dict that ``make_windows_for_unit`` builds for that unit's rows. The
+``window_id`` is the same, and so is the ``features`` map (up to float
+rounding).
+
+Each engine holds a fixed-size ring of its last ``window_size`` samples plus
+a few per-sensor accumulators. Memory is therefore
+``O(engines * window_size * sensors)`` and is allocated when an engine is
+first seen. Per sample:
+
+- mean and std come from a running sum and sum of squares of the
+  shift-centred values. The shift and the sums are rebuilt from the ring once
+  per ``window_size`` samples, so rounding error cannot accumulate.
+- min and max come from monotonic deques of ``(index, value)``, which is
+  amortized O(1).
+- A NaN or inf reading is counted rather than summed. A window that contains
+  one computes that sensor's statistics from the ring, exactly as the batch
+  path's strided fallback does.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline.csv_stream import SENSOR_COLS
+from data_pipeline.windowing import STAT_NAMES, build_window_records
+
+
+class _EngineRing:
+    """Window state of one engine: ring buffers, running sums and min/max deques."""
+
+    __slots__ = ("count", "values", "failures", "times", "shift", "sums", "sqsums",
+                 "bad", "failure_sum", "mins", "maxs")
+
+    def __init__(self, window_size: int, n_cols: int):
+        self.count = 0
+        self.values = np.empty((window_size, n_cols), dtype=np.float64)
+        self.failures = np.zeros(window_size, dtype=np.int64)
+        self.times: List[Any] = [None] * window_size
+        self.shift = [0.0] * n_cols
+        self.sums = [0.0] * n_cols
+        self.sqsums = [0.0] * n_cols
+        self.bad = [0] * n_cols             # non-finite readings currently in the window
+        self.failure_sum = 0
+        self.mins = [deque() for _ in range(n_cols)]
+        self.maxs = [deque() for _ in range(n_cols)]
+
+    def rebase(self):
+        """Recompute the centring shift and the running sums from the ring contents."""
+        for j in range(len(self.sums)):
+            col = self.values[:, j]
+            good = col[np.isfinite(col)]
+            shift = float(good.mean()) if good.size else 0.0
+            centred = good - shift
+            self.shift[j] = shift
+            self.sums[j] = float(centred.sum())
+            self.sqsums[j] = float((centred * centred).sum())
+
+
+class StreamingWindowAggregator:
+    """Emit FeatureWindow records from per-sample updates across many engines.
+
+    Windows start at unit-relative sample ``0, stride, 2*stride, ...``, as in
+    ``make_windows_for_unit``. A window is emitted by the ``update`` call that
+    supplies its last sample.
+
+    Example:
+        agg = StreamingWindowAggregator(window_size=200, stride=50)
+        for rec in feed:
+            window = agg.update_record(rec)
+            if window is not None:
+                ingestor.ingest_windows_batch([window])
+    """
+
+    def __init__(self, window_size: int = 200, stride: int = 50,
+                 features_cols: Optional[Sequence[str]] = None):
+        if window_size <= 0 or stride <= 0:
+            raise ValueError("window_size and stride must be positive")
+        self.window_size = window_size
+        self.stride = stride
+        self.features_cols = list(features_cols) if features_cols is not None else list(SENSOR_COLS)
+        self._engines: Dict[Any, _EngineRing] = {}
+
+    @property
+    def n_engines(self) -> int:
+        return len(self._engines)
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the ring buffers (the deques are bounded by the window)."""
+        per_engine = self.window_size * (8 * len(self.features_cols) + 8 + 8)
+        return per_engine * len(self._engines)
+
+    def samples_seen(self, unit_id) -> int:
+        ring = self._engines.get(unit_id)
+        return ring.count if ring is not None else 0
+
+    def update(self, unit_id, values: Sequence[float], time: Any, failure: int = 0) -> Optional[Dict[str, Any]]:
+        """Add one reading of ``unit_id`` (``values`` ordered as ``features_cols``).
+
+        Returns the window dict completed by this sample, or ``None``.
+        """
+        ws = self.window_size
+        ring = self._engines.get(unit_id)
+        if ring is None:
+            ring = self._engines[unit_id] = _EngineRing(ws, len(self.features_cols))
+        n = ring.count
+        slot = n % ws
+        values = [float(v) for v in values]
+
+        if n >= ws:
+            for j, old in enumerate(ring.values[slot].tolist()):
+                if math.isfinite(old):
+                    d = old - ring.shift[j]
+                    ring.sums[j] -= d
+                    ring.sqsums[j] -= d * d
+                else:
+                    ring.bad[j] -= 1
+            ring.failure_sum -= int(ring.failures[slot])
+        elif n == 0:
+            ring.shift = [v if math.isfinite(v) else 0.0 for v in values]
+
+        ring.values[slot] = values
+        ring.failures[slot] = failure
+        ring.times[slot] = time
+        ring.failure_sum += int(failure)
+        oldest = n - ws + 1  # index of the oldest sample still in the window
+        for j, v in enumerate(values):
+            if math.isfinite(v):
+                d = v - ring.shift[j]
+                ring.sums[j] += d
+                ring.sqsums[j] += d * d
+                mins, maxs = ring.mins[j], ring.maxs[j]
+                while mins and mins[-1][1] >= v:
+                    mins.pop()
+                mins.append((n, v))
+                while maxs and maxs[-1][1] <= v:
+                    maxs.pop()
+                maxs.append((n, v))
+            else:
+                ring.bad[j] += 1
+            while ring.mins[j] and ring.mins[j][0][0] < oldest:
+                ring.mins[j].popleft()
+            while ring.maxs[j] and ring.maxs[j][0][0] < oldest:
+                ring.maxs[j].popleft()
+        ring.count = n = n + 1
+
+        window = None
+        if n >= ws and (n - ws) % self.stride == 0:
+            window = self._emit(unit_id, ring, start=n - ws)
+        if n % ws == 0:
+            ring.rebase()
+        return window
+
+    def update_record(self, record: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """``update`` from a reading dict with ``unit_id``, ``time`` (or ``ts``), sensors and ``failure``."""
+        time = record["time"] if "time" in record else record["ts"]
+        values = [record.get(c, float("nan")) for c in self.features_cols]
+        return self.update(record["unit_id"], values, time, failure=int(record.get("failure", 0) or 0))
+
+    def extend(self, records: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        """Feed many reading dicts and return the windows they complete, in order."""
+        windows = []
+        for rec in records:
+            window = self.update_record(rec)
+            if window is not None:
+                windows.append(window)
+        return windows
+
+    def _emit(self, unit_id, ring: _EngineRing, start: int) -> Dict[str, Any]:
+        ws = self.window_size
+        stats = np.empty((1, len(self.features_cols), len(STAT_NAMES)), dtype=np.float64)
+        for j in range(len(self.features_cols)):
+            if ring.bad[j]:
+                col = ring.values[:, j]
+                stats[0, j] = (col.mean(), col.std(ddof=0), col.min(), col.max())
+                continue
+            mean_c = ring.sums[j] / ws
+            var = max(ring.sqsums[j] / ws - mean_c * mean_c, 0.0)
+            stats[0, j] = (mean_c + ring.shift[j], math.sqrt(var), ring.mins[j][0][1], ring.maxs[j][0][1])
+        first_slot = start % ws
+        last_slot = (start + ws - 1) % ws
+        return build_window_records(
+            unit_id, np.array([start]), ws, stats, [ring.failure_sum],
+            [pd.Timestamp(ring.times[first_slot])], [pd.Timestamp(ring.times[last_slot])],
+            self.features_cols)[0]
@@ -1,6 +1,30 @@
 // Minimal graph schema for engines and readings
 CREATE CONSTRAINT IF NOT EXISTS FOR (e:Engine) REQUIRE e.id IS UNIQUE;
 CREATE CONSTRAINT IF NOT EXISTS FOR (fw:FeatureWindow) REQUIRE fw.window_id IS UNIQUE;
+CREATE CONSTRAINT IF NOT EXISTS FOR (rd:SensorReading) REQUIRE rd.reading_id IS UNIQUE;
+CREATE CONSTRAINT IF NOT EXISTS FOR (fe:FailureEvent) REQUIRE fe.event_id IS UNIQUE;
+CREATE CONSTRAINT IF NOT EXISTS FOR (rb:ReadingBucket) REQUIRE rb.bucket_id IS UNIQUE;
+
+// FeatureWindow statistics are typed properties (fw.sensor_1_mean, ..., fw.failure_count);
+// range indexes cover the time bounds and the features used by the FM threshold rules.
+CREATE INDEX fw_start_ts IF NOT EXISTS FOR (fw:FeatureWindow) ON (fw.start_ts);
+CREATE INDEX fw_end_ts IF NOT EXISTS FOR (fw:FeatureWindow) ON (fw.end_ts);
+CREATE INDEX fw_sensor_1_min IF NOT EXISTS FOR (fw:FeatureWindow) ON (fw.sensor_1_min);
+CREATE INDEX fw_sensor_2_min IF NOT EXISTS FOR (fw:FeatureWindow) ON (fw.sensor_2_min);
+CREATE INDEX fw_sensor_3_max IF NOT EXISTS FOR (fw:FeatureWindow) ON (fw.sensor_3_max);
+CREATE INDEX fw_sensor_4_max IF NOT EXISTS FOR (fw:FeatureWindow) ON (fw.sensor_4_max);
+CREATE INDEX fw_sensor_5_min IF NOT EXISTS FOR (fw:FeatureWindow) ON (fw.sensor_5_min);
+CREATE INDEX fw_sensor_6_max IF NOT EXISTS FOR (fw:FeatureWindow) ON (fw.sensor_6_max);
+CREATE INDEX fw_failure_count IF NOT EXISTS FOR (fw:FeatureWindow) ON (fw.failure_count);
 
 // Example nodes and relationships
 // (Engine)-[:HAS_READING]->(SensorReading)
+// (Engine)-[:HAD_FAILURE]->(FailureEvent)
+// (Engine)-[:HAS_WINDOW]->(FeatureWindow)
+//
+// Node keys are deterministic: SensorReading.reading_id = "<unit_id>__<ts>",
+// FailureEvent.event_id = "<unit_id>__failure__<ts>",
+// FeatureWindow.window_id = "<unit_id>__<start>__<end>".
+//
+// Engine.last_ingested_ts / Engine.last_window_end_ts are ingestion watermarks
+// (latest committed reading ts / FeatureWindow end_ts) used by incremental runs.
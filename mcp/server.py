@@ -7,11 +7,19 @@ Run:
     python -m mcp.server
 """
 
+import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Union
 
 from mcp.server_runtime import MCPServerRuntime
-from mcp.tools.vector_search import VectorSearch
+from mcp.tools.vector_search import VectorSearch, process_memory_mb
+
+
+def _report_load(vector_search: VectorSearch) -> None:
+    mem = process_memory_mb()
+    shared = f", mapped={mem['file']:.1f} MB" if "file" in mem else ""
+    print(f"   FAISS index loaded on first query in {vector_search.load_seconds * 1000:.1f} ms, "
+          f"rss={mem['rss']:.1f} MB{shared}")
 
 
 def main() -> None:
@@ -22,18 +30,26 @@ def main() -> None:
     # ------------------------------------------------------------------
     vector_store_base = Path("vector_db/faiss_store")
 
-    if not vector_store_base.with_suffix(".index").exists():
+    # a sharded store (Load_Spec_Data --shards/--shard-by) has a manifest instead
+    sharded = vector_store_base.with_suffix(".shards.json").exists()
+    if not sharded and not vector_store_base.with_suffix(".index").exists():
         raise FileNotFoundError(
             f"FAISS index not found at {vector_store_base.with_suffix('.index')}"
         )
 
-    if not vector_store_base.with_suffix(".meta.json").exists():
+    if not sharded and not any(vector_store_base.with_suffix(suffix).exists() for suffix in (".meta.sqlite", ".meta.json")):
         raise FileNotFoundError(
-            f"FAISS metadata not found at {vector_store_base.with_suffix('.meta.json')}"
+            f"FAISS metadata not found at {vector_store_base.with_suffix('.meta.sqlite')}"
         )
 
-    vector_search = VectorSearch.from_path(vector_store_base)
-    print("FAISS vector store loaded")
+    # Memory-mapped and lazy: startup does not read the index, the first
+    # query maps it, and worker processes on one host share its pages.
+    # Repeated queries are answered from an LRU result cache.
+    t0 = time.perf_counter()
+    vector_search = VectorSearch.from_path(vector_store_base, mmap=True, lazy=True, cache_size=1024)
+    mem = process_memory_mb()
+    print(f"FAISS vector store registered (mmap, lazy) in {(time.perf_counter() - t0) * 1000:.1f} ms, "
+          f"rss={mem['rss']:.1f} MB")
 
     # ------------------------------------------------------------------
     # Create MCP Server Runtime
@@ -46,7 +62,8 @@ def main() -> None:
     @server.tool(name="vector_search")
     def vector_search_tool(
         query_embedding: List[float],
-        k: int = 5
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         MCP Tool: Vector similarity search
@@ -54,14 +71,112 @@ def main() -> None:
         Args:
             query_embedding: embedding vector for the query
             k: number of nearest neighbors
+            filters: optional metadata filters, e.g. {"id": "FM-03"} or {"source": [...]}
 
         Returns:
             List of search results with score + metadata
         """
         print("MCP TOOL CALLED → vector_search")
-        print(f"   embedding_dim={len(query_embedding)}, k={k}")
+        print(f"   embedding_dim={len(query_embedding)}, k={k}, filters={filters}")
+
+        first_load = not vector_search.is_loaded
+        results = vector_search.search(query_embedding, k=k, filters=filters)
+        if first_load:
+            _report_load(vector_search)
+
+        print(f"   results_returned={len(results)}")
+        return results
+
+    # ------------------------------------------------------------------
+    # Register MCP Tool: vector_search_batch
+    # ------------------------------------------------------------------
+    @server.tool(name="vector_search_batch")
+    def vector_search_batch_tool(
+        query_embeddings: List[List[float]],
+        k: Union[int, List[int]] = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        MCP Tool: Vector similarity search for several queries at once
+
+        Args:
+            query_embeddings: one embedding vector per sub-query
+            k: number of nearest neighbors, shared or one per query
+            filters: optional metadata filters applied to every query
+
+        Returns:
+            One list of search results (score + metadata) per query
+        """
+        print("MCP TOOL CALLED → vector_search_batch")
+        print(f"   queries={len(query_embeddings)}, k={k}, filters={filters}")
+
+        first_load = not vector_search.is_loaded
+        results = vector_search.search_batch(query_embeddings, k=k, filters=filters)
+        if first_load:
+            _report_load(vector_search)
+
+        print(f"   results_returned={sum(len(r) for r in results)}")
+        return results
+
+    # ------------------------------------------------------------------
+    # Register MCP Tools: keyword_search, hybrid_search
+    # ------------------------------------------------------------------
+    @server.tool(name="keyword_search")
+    def keyword_search_tool(
+        query: str,
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        MCP Tool: BM25 keyword search (exact codes, sensor names, values)
+
+        Args:
+            query: query text, e.g. "FM-04" or "sensor_4 torque"
+            k: number of results
+            filters: optional metadata filters
+
+        Returns:
+            List of search results with BM25 score + metadata
+        """
+        print("MCP TOOL CALLED → keyword_search")
+        print(f"   query={query!r}, k={k}, filters={filters}")
+
+        first_load = not vector_search.is_loaded
+        results = vector_search.keyword_search(query, k=k, filters=filters)
+        if first_load:
+            _report_load(vector_search)
+
+        print(f"   results_returned={len(results)}")
+        return results
+
+    @server.tool(name="hybrid_search")
+    def hybrid_search_tool(
+        query: str,
+        query_embedding: Optional[List[float]] = None,
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        MCP Tool: keyword + vector search merged by reciprocal rank fusion
+
+        Args:
+            query: query text for the keyword index
+            query_embedding: embedding of the query; without it only the
+                keyword index is searched
+            k: number of results
+            filters: optional metadata filters
+
+        Returns:
+            List of search results with fused score, dense_score,
+            lexical_score + metadata
+        """
+        print("MCP TOOL CALLED → hybrid_search")
+        print(f"   query={query!r}, embedding={'yes' if query_embedding else 'no'}, k={k}, filters={filters}")
 
-        results = vector_search.search(query_embedding, k=k)
+        first_load = not vector_search.is_loaded
+        results = vector_search.hybrid_search(query, k=k, filters=filters, query_vector=query_embedding)
+        if first_load:
+            _report_load(vector_search)
 
         print(f"   results_returned={len(results)}")
         return results
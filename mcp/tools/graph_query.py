@@ -1,4 +1,71 @@
+import re
+
+
 def run_graph_query(driver, cypher: str, params: dict = None):
     """Run a Cypher query against a Neo4j driver. Placeholder for MCP tool."""
     with driver.session() as sess:
         return list(sess.run(cypher, params or {}))
+
+
+def read_reading_range(driver, unit_id: str, start: str, end: str):
+    """Read one engine's readings in [start, end] from the ReadingBucket layout.
+
+    ``start``/``end`` are ISO timestamps. Returns a DataFrame with columns
+    ``time``, ``seq`` and ``sensor_1``..``sensor_6`` sorted by time.
+    """
+    from data_pipeline.reading_buckets import CYpher_READ_BUCKET_RANGE, unpack_buckets
+
+    records = run_graph_query(driver, CYpher_READ_BUCKET_RANGE,
+                              {"unit_id": unit_id, "start": start, "end": end})
+    return unpack_buckets(records, start=start, end=end)
+
+
+# property names cannot be query parameters, so only these are spliced into Cypher
+_FEATURE_PROPERTY = re.compile(r"^(sensor_\d+_(mean|std|min|max)|failure_count)$")
+_OPERATORS = {">", ">=", "<", "<=", "=", "<>"}
+
+
+def build_window_filter_query(thresholds, unit_id: str = None, start: str = None,
+                              end: str = None, limit: int = 100):
+    """Build a parameterized Cypher query selecting FeatureWindows by feature thresholds.
+
+    ``thresholds`` maps a feature property to ``(operator, value)``, e.g.
+    ``{"sensor_4_max": (">", 3.0), "sensor_1_min": ("<", -0.65)}``; conditions
+    are AND-ed. ``start``/``end`` (ISO strings) bound ``fw.start_ts``/``fw.end_ts``.
+    All filters run in the database, using the FeatureWindow range indexes.
+    """
+    where, params = [], {"limit": int(limit)}
+    for i, (prop, (op, value)) in enumerate(sorted(thresholds.items())):
+        if not _FEATURE_PROPERTY.match(prop):
+            raise ValueError(f"Unknown FeatureWindow feature: {prop!r}")
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported operator {op!r}; expected one of {sorted(_OPERATORS)}")
+        where.append(f"fw.{prop} {op} $v{i}")
+        params[f"v{i}"] = value
+    if start is not None:
+        where.append("fw.start_ts >= $start")
+        params["start"] = start
+    if end is not None:
+        where.append("fw.end_ts <= $end")
+        params["end"] = end
+    if unit_id is not None:
+        where.append("eng.id = $unit_id")
+        params["unit_id"] = unit_id
+    cypher = "MATCH (eng:Engine)-[:HAS_WINDOW]->(fw:FeatureWindow)\n"
+    if where:
+        cypher += "WHERE " + "\n  AND ".join(where) + "\n"
+    cypher += ("RETURN eng.id AS unit_id, fw {.*} AS window\n"
+               "ORDER BY fw.start_ts\n"
+               "LIMIT $limit")
+    return cypher, params
+
+
+def find_windows(driver, thresholds, unit_id: str = None, start: str = None,
+                 end: str = None, limit: int = 100):
+    """Return FeatureWindows matching ``thresholds`` as dicts (filtering happens server-side).
+
+    Example: ``find_windows(driver, {"sensor_4_max": (">", 3.0)}, unit_id="unit_1")``
+    """
+    cypher, params = build_window_filter_query(thresholds, unit_id=unit_id, start=start,
+                                               end=end, limit=limit)
+    return [dict(rec["window"], unit_id=rec["unit_id"]) for rec in run_graph_query(driver, cypher, params)]
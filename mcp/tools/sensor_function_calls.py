@@ -1,3 +1,15 @@
-def read_sensor_batch(source):
-    """Placeholder to read sensor data from a source or API."""
-    return []
+def read_sensor_batch(source, aggregator=None):
+    """Read a batch of sensor readings from ``source``.
+
+    ``source`` is an iterable of reading dicts (``unit_id``, ``time``,
+    ``sensor_1``..``sensor_6``, ``failure``) or a callable returning one.
+    With a ``data_pipeline.stream_windows.StreamingWindowAggregator`` the
+    readings are fed to it and the FeatureWindows they complete are returned
+    instead of the readings.
+    """
+    if source is None:
+        return []
+    readings = list(source() if callable(source) else source)
+    if aggregator is not None:
+        return aggregator.extend(readings)
+    return readings
@@ -1,9 +1,22 @@
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
 
 from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+from vector_db.embeddings_store.lexical import DEFAULT_RRF_K, is_keyword_query
+from vector_db.embeddings_store.sharded_store import ShardedEmbeddingsStore
+from vector_db.embeddings_store.store import EmbeddingsStore
+
+SearchStore = Union[FAISSEmbeddingsStore, EmbeddingsStore, ShardedEmbeddingsStore]
 
 
 class VectorSearch:
@@ -12,49 +25,244 @@ class VectorSearch:
     This class provides a small, testable interface for searching a
     FAISS-based vector DB. It prefers an in-memory store instance but
     can also load a store from disk using ``FAISSEmbeddingsStore.load``.
+    A NumPy ``EmbeddingsStore`` (saved as ``<base>.npy``) works the same way
+    where faiss is not installed, and so does a ``ShardedEmbeddingsStore``
+    (saved as ``<base>.shards.json``), which searches its shards in parallel.
 
     Example:
         store = FAISSEmbeddingsStore.load(Path("vector_db/embeddings"))
         vs = VectorSearch(store=store)
         results = vs.search([0.1, 0.2, ...], k=5)
 
-    Results are lists of dicts in the form: {"score": float, "metadata": dict}
+    Results are lists of dicts in the form: {"score": float, "metadata": dict}.
+    ``search_batch`` answers several queries with one index search and
+    returns one such list per query.
+
+    ``from_path(base, mmap=True, lazy=True)`` is the server setting: nothing
+    is read until the first search, and the index is then memory-mapped so
+    worker processes on one host share its pages. ``load_seconds`` records
+    how long the load took.
+
+    ``cache_size > 0`` keeps the results of that many recent queries in an
+    LRU cache. The key is a hash of the normalized query vector quantized to
+    ``cache_quantum``, ``k`` and the filters, so repeated (or numerically
+    near-identical) queries skip the index. Each entry remembers the store
+    object and its ``version``, which every add, upsert, delete and search
+    setting change bumps. Loading a store clears the cache. A stale entry is
+    therefore never returned. ``cache_info()`` reports hits and misses.
+
+    ``keyword_search`` ranks by BM25 over the store's inverted index and
+    ``hybrid_search`` fuses that with the dense ranking (reciprocal rank
+    fusion). Queries made only of codes such as ``FM-04`` or ``sensor_4``
+    are answered from the inverted index without computing an embedding.
     """
 
-    def __init__(self, store: Optional[FAISSEmbeddingsStore] = None, base_path: Optional[Path] = None):
-        if store is not None and not isinstance(store, FAISSEmbeddingsStore):
-            raise TypeError("store must be an instance of FAISSEmbeddingsStore")
-        self.store: Optional[FAISSEmbeddingsStore] = store
+    def __init__(self, store: Optional[SearchStore] = None, base_path: Optional[Path] = None,
+                 mmap: bool = False, lazy: bool = False, cache_size: int = 0, cache_quantum: float = 1e-5):
+        if store is not None and not isinstance(store, (FAISSEmbeddingsStore, EmbeddingsStore, ShardedEmbeddingsStore)):
+            raise TypeError("store must be an instance of FAISSEmbeddingsStore, EmbeddingsStore or ShardedEmbeddingsStore")
+        self.store: Optional[SearchStore] = store
+        self.load_seconds: Optional[float] = None
+        self._pending: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self.cache_size = int(cache_size)
+        self.cache_quantum = float(cache_quantum)
+        self._cache: "OrderedDict[bytes, List[Dict[str, Any]]]" = OrderedDict()
+        # (store, version) the cached results were computed from
+        self._cache_source: Optional[tuple] = None
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
         if self.store is None and base_path is not None:
-            self.load_from_path(base_path)
+            self.load_from_path(base_path, mmap=mmap, lazy=lazy)
 
     @classmethod
-    def from_path(cls, base_path: Path) -> "VectorSearch":
+    def from_path(cls, base_path: Path, mmap: bool = False, lazy: bool = False,
+                  cache_size: int = 0, cache_quantum: float = 1e-5) -> "VectorSearch":
         """Create a VectorSearch by loading a FAISS store from disk."""
-        inst = cls()
-        inst.load_from_path(base_path)
+        inst = cls(cache_size=cache_size, cache_quantum=cache_quantum)
+        inst.load_from_path(base_path, mmap=mmap, lazy=lazy)
         return inst
 
-    def load_from_path(self, base_path: Path) -> None:
+    def load_from_path(self, base_path: Path, mmap: bool = False, lazy: bool = False) -> None:
         """Load a FAISS index and metadata from the given base path.
 
         The path refers to the same base used by ``FAISSEmbeddingsStore.save`` and
         ``FAISSEmbeddingsStore.load`` (the implementation expects a .index and
-        a .meta.json file alongside the provided base path).
+        a .meta.sqlite, or legacy .meta.json, file alongside the provided base
+        path). A base with a ``.npy`` file loads as a NumPy ``EmbeddingsStore``,
+        one with a ``.shards.json`` manifest as a ``ShardedEmbeddingsStore``.
+        ``mmap`` maps the index read-only; ``lazy`` defers the load to the
+        first search.
         """
-        self.store = FAISSEmbeddingsStore.load(Path(base_path))
+        self.store = None
+        self._pending = (Path(base_path), mmap)
+        self.cache_clear()
+        if not lazy:
+            self._get_store()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.store is not None
 
-    def search(self, vector: List[float], k: int = 5) -> List[Dict[str, Any]]:
+    def _get_store(self) -> SearchStore:
+        if self.store is None and self._pending is not None:
+            with self._lock:
+                if self.store is None:
+                    base_path, mmap = self._pending
+                    t0 = time.perf_counter()
+                    if base_path.with_suffix(".shards.json").exists():
+                        store_cls = ShardedEmbeddingsStore
+                    elif base_path.with_suffix(".npy").exists():
+                        store_cls = EmbeddingsStore
+                    else:
+                        store_cls = FAISSEmbeddingsStore
+                    self.store = store_cls.load(base_path, mmap=mmap)
+                    self.load_seconds = time.perf_counter() - t0
+                    self._pending = None
+        if self.store is None:
+            raise RuntimeError("No vector store is loaded. Provide a store or a base_path to load from.")
+        return self.store
+
+    def search(self, vector: List[float], k: int = 5,
+               filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Search the underlying FAISS store for top-k nearest neighbors.
 
         Args:
             vector: The query vector as a list of floats.
             k: Number of nearest neighbors to return.
+            filters: Optional metadata filters, ``{field: value or [values]}``,
+                applied inside the index search (e.g. ``{"source": "spec.doc"}``).
 
         Returns:
             A list of result dicts, each with keys ``score`` and ``metadata``.
         """
-        if self.store is None:
-            raise RuntimeError("No vector store is loaded. Provide a store or a base_path to load from.")
-        return self.store.query(vector, k=k)
+        store = self._get_store()
+        if self.cache_size <= 0:
+            return store.query(vector, k=k, filters=filters)
+        return self._cached_search(store, np.asarray(vector, dtype=np.float32).reshape(1, -1), [int(k)], filters)[0]
+
+    def search_batch(self, vectors: Sequence[List[float]],
+                     k: Union[int, Sequence[int]] = 5,
+                     filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Search several query vectors in one batched FAISS call.
+
+        Args:
+            vectors: The query vectors, as a list of lists or an (N, dim) array.
+            k: Neighbours per query, either one value or one per query.
+            filters: Optional metadata filters applied to every query.
+
+        Returns:
+            One list of ``{"score", "metadata"}`` dicts per query, in input order.
+        """
+        store = self._get_store()
+        queries = np.asarray(vectors, dtype=np.float32)
+        if self.cache_size <= 0 or queries.ndim != 2 or not len(queries):
+            return store.query_batch(vectors, k=k, filters=filters)
+        ks = [int(k)] * len(queries) if isinstance(k, (int, np.integer)) else [int(x) for x in k]
+        if len(ks) != len(queries):
+            raise ValueError(f"Got {len(ks)} k values for {len(queries)} queries")
+        return self._cached_search(store, queries, ks, filters)
+
+    def keyword_search(self, query: str, k: int = 5,
+                       filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """BM25 search over the indexed metadata text; ``score`` is the BM25 score."""
+        return self._get_store().query_text(query, k=k, filters=filters)
+
+    def hybrid_search(self, query: str, k: int = 5, filters: Optional[Dict[str, Any]] = None,
+                      query_vector: Optional[List[float]] = None,
+                      embed_fn: Optional[Callable[[str], List[float]]] = None,
+                      rrf_k: int = DEFAULT_RRF_K, candidates: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Dense and BM25 search fused by reciprocal rank.
+
+        Args:
+            query: The query text, searched in the inverted index.
+            k: Number of results to return.
+            filters: Optional metadata filters applied to both searches.
+            query_vector: The query's embedding; otherwise ``embed_fn(query)``
+                computes it when needed.
+            rrf_k: The fusion constant (larger flattens the rank weights).
+            candidates: Results taken from each side before fusing
+                (default ``max(4k, 20)``).
+
+        Returns:
+            ``{"score", "metadata", "dense_score", "lexical_score"}`` dicts.
+            A pure keyword query (every word contains a digit) that has BM25
+            hits returns those without embedding; so does any query when no
+            vector or ``embed_fn`` is given.
+        """
+        store = self._get_store()
+        if query_vector is None and (embed_fn is None or is_keyword_query(query)):
+            hits = store.query_text(query, k=k, filters=filters)
+            if hits or embed_fn is None:
+                return [{"score": h["score"], "metadata": h["metadata"], "dense_score": None,
+                         "lexical_score": h["score"]} for h in hits]
+        if query_vector is None:
+            query_vector = embed_fn(query)
+        return store.query_hybrid(query_vector, query, k=k, filters=filters, rrf_k=rrf_k, candidates=candidates)
+
+    def cache_info(self) -> Dict[str, int]:
+        return {"hits": self.cache_hits, "misses": self.cache_misses,
+                "size": len(self._cache), "maxsize": self.cache_size}
+
+    def cache_clear(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_source = None
+
+    def _cache_keys(self, queries: np.ndarray, ks: List[int], filters: Optional[Dict[str, Any]]) -> List[bytes]:
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        quantized = np.rint(queries / norms / self.cache_quantum).astype(np.int64)
+        extra = json.dumps(filters, sort_keys=True, default=str).encode("utf-8") if filters else b""
+        return [hashlib.blake2b(row.tobytes() + k.to_bytes(8, "little", signed=True) + extra,
+                                digest_size=16).digest()
+                for row, k in zip(quantized, ks)]
+
+    def _cached_search(self, store: SearchStore, queries: np.ndarray, ks: List[int],
+                       filters: Optional[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Answer cached queries from the LRU and the rest with one ``query_batch``."""
+        keys = self._cache_keys(queries, ks, filters)
+        source = (store, store.version)
+        with self._cache_lock:
+            if self._cache_source is None or self._cache_source[0] is not store or self._cache_source[1] != store.version:
+                self._cache.clear()
+                self._cache_source = source
+            found: List[Optional[List[Dict[str, Any]]]] = []
+            for key in keys:
+                hit = self._cache.get(key)
+                if hit is not None:
+                    self._cache.move_to_end(key)
+                found.append(hit)
+            missing = [i for i, hit in enumerate(found) if hit is None]
+            self.cache_hits += len(keys) - len(missing)
+            self.cache_misses += len(missing)
+        if missing:
+            fresh = store.query_batch(queries[missing], k=[ks[i] for i in missing], filters=filters)
+            with self._cache_lock:
+                # drop results computed while the store changed under us
+                if self._cache_source == source and store.version == source[1]:
+                    for i, res in zip(missing, fresh):
+                        self._cache[keys[i]] = res
+                        self._cache.move_to_end(keys[i])
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            for i, res in zip(missing, fresh):
+                found[i] = res
+        # callers get their own copies, so mutating a result cannot corrupt the cache
+        return [copy.deepcopy(res) for res in found]
+
 
+def process_memory_mb() -> Dict[str, float]:
+    """Resident memory of this process in MB: ``rss``, plus ``anon`` (private) and ``file`` (mapped, shareable) on Linux."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as fh:
+            fields = dict(line.split(":", 1) for line in fh if line.startswith(("VmRSS", "RssAnon", "RssFile")))
+        kb = {k: int(v.split()[0]) for k, v in fields.items()}
+        return {"rss": kb.get("VmRSS", 0) / 1024, "anon": kb.get("RssAnon", 0) / 1024,
+                "file": kb.get("RssFile", 0) / 1024}
+    except OSError:  # pragma: no cover - non-Linux fallback (peak, not current)
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"rss": peak / (1024 * 1024 if sys.platform == "darwin" else 1024)}
@@ -0,0 +1,61 @@
+"""Latency of metadata-filtered vector search vs unfiltered and vs over-fetching.
+
+For each corpus size a flat store is filled with synthetic vectors whose
+``source`` metadata takes ``--sources`` values, so a ``{"source": ...}``
+filter keeps ``1/sources`` of the corpus. Per query it times:
+
+- ``unfiltered``: plain top-k;
+- ``selector``: ``query(..., filters=...)``, the filter applied inside FAISS;
+- ``overfetch``: top ``k * sources`` then Python filtering, the old
+  workaround. It can still return fewer than k hits.
+
+    python scripts/bench_filtered_search.py --sizes 10000 100000 1000000 --sources 50
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # add project root to import path
+import numpy as np
+from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+
+def _ms(fn, queries):
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        lat.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(lat)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Filtered vs unfiltered vector search latency")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    p.add_argument("--dim", type=int, default=128)
+    p.add_argument("--sources", type=int, default=50, help="Distinct source values (filter selectivity 1/N)")
+    p.add_argument("--index-type", default="flat")
+    p.add_argument("--queries", type=int, default=100)
+    p.add_argument("--k", type=int, default=10)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.normal(size=(args.queries, args.dim)).astype("float32")
+    flt = {"source": "doc_0"}
+    print(f"{'rows':>10s} {'unfiltered ms':>14s} {'selector ms':>12s} {'overfetch ms':>13s} {'overfetch hits':>15s}")
+    for n in args.sizes:
+        store = FAISSEmbeddingsStore(dim=args.dim, index_type=args.index_type)
+        for start in range(0, n, 100_000):
+            m = min(100_000, n - start)
+            store.add_many(rng.normal(size=(m, args.dim)).astype("float32"),
+                           [{"id": i, "source": f"doc_{i % args.sources}"} for i in range(start, start + m)])
+
+        def overfetch(q):
+            res = store.query(q, k=args.k * args.sources)
+            return [r for r in res if r["metadata"]["source"] == flt["source"]][:args.k]
+
+        hits = statistics.mean(len(overfetch(q)) for q in queries[:10])
+        print(f"{n:>10,} {_ms(lambda q: store.query(q, k=args.k), queries):14.2f} "
+              f"{_ms(lambda q: store.query(q, k=args.k, filters=flt), queries):12.2f} "
+              f"{_ms(overfetch, queries):13.2f} {hits:15.1f}")
@@ -0,0 +1,41 @@
+"""Scaling of FeatureWindow computation across worker processes.
+
+Generates a many-engine synthetic fleet (benchmarks.fleet) and times
+data_pipeline.parallel_windows.iter_unit_windows for each worker count.
+Pool start-up (spawn) is included, as in a real ingest run.
+
+Usage:
+    python scripts/bench_parallel_windows.py --engines 2000 --rows 2000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # add project root to import path
+from benchmarks.fleet import generate_fleet
+from data_pipeline.parallel_windows import iter_unit_windows
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument("--engines", type=int, default=2000)
+    p.add_argument("--rows", type=int, default=2000, help="Readings per engine")
+    p.add_argument("--window-size", type=int, default=200)
+    p.add_argument("--stride", type=int, default=10)
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = p.parse_args()
+
+    df = generate_fleet(args.engines, args.rows).sort_values(["unit_id", "time"], kind="stable").reset_index(drop=True)
+    print(f"engines={args.engines} rows={len(df):,} window_size={args.window_size} "
+          f"stride={args.stride} cpus={os.cpu_count()}")
+    counts = sorted(set(args.workers))
+    base = None
+    for workers in counts:
+        t0 = time.perf_counter()
+        n_windows = sum(len(w) for _, w in iter_unit_windows(df, args.window_size, args.stride,
+                                                              workers=workers))
+        elapsed = time.perf_counter() - t0
+        base = base or elapsed
+        print(f"workers={workers:3d} {elapsed:8.2f} s  {n_windows / elapsed:12,.0f} windows/s  "
+              f"speedup vs workers={counts[0]}: {base / elapsed:5.2f}x")
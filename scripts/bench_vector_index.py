@@ -0,0 +1,119 @@
+"""Recall@k, query latency and bytes/vector of the vector store's index types against the flat index.
+
+Builds a synthetic clustered corpus (or loads ``--vectors file.npy``), takes
+exact top-k neighbours from ``IndexFlatIP`` as ground truth, then for each
+approximate or compressed index sweeps its search settings (``nprobe`` for
+IVF, ``ef_search`` for HNSW, ``rerank`` for the quantized types). It reports
+build time, index bytes per vector, recall@k and per-query latency through
+``FAISSEmbeddingsStore.query``:
+
+    python scripts/bench_vector_index.py --n 200000 --dim 128 --k 10
+    python scripts/bench_vector_index.py --types sq8 pq ivf_pq --rerank 0 4 16 --out compression.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # add project root to import path
+import numpy as np
+from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore, faiss
+
+
+def clustered_vectors(n, dim, clusters=256, spread=0.6, seed=0):
+    """``n`` float32 vectors scattered around ``clusters`` random centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype("float32")
+    labels = rng.integers(0, clusters, n)
+    return centres[labels] + spread * rng.normal(size=(n, dim)).astype("float32")
+
+
+def recall_at_k(found, truth, k):
+    """Mean fraction of the true top-k ids present in each returned top-k list."""
+    hits = [len(set(f[:k]) & set(t[:k])) for f, t in zip(found, truth)]
+    return sum(hits) / (k * len(truth)) if len(truth) else 0.0
+
+
+def run_config(vectors, queries, truth, k, index_type, params, settings):
+    keep_full = any(s.get("rerank", 0) > 1 for s in settings)
+    store = FAISSEmbeddingsStore(dim=vectors.shape[1], index_type=index_type, keep_full=keep_full, **params)
+    metas = [{"id": i} for i in range(len(vectors))]
+    t0 = time.perf_counter()
+    store.add_many(vectors, metas, copy=True)
+    build_s = time.perf_counter() - t0
+    bytes_per_vector = store.memory_report()["bytes_per_vector"]
+    rows = []
+    for setting in settings:
+        store.set_search_params(**setting)
+        found, lat = [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            res = store.query(q, k=k)
+            lat.append((time.perf_counter() - t0) * 1000)
+            found.append([r["metadata"]["id"] for r in res])
+        lat.sort()
+        rows.append({"index_type": index_type, "params": params, "search": setting,
+                     "build_s": round(build_s, 3), "bytes_per_vector": bytes_per_vector, "recall": round(recall_at_k(found, truth, k), 4),
+                     "p50_ms": round(statistics.median(lat), 4),
+                     "p99_ms": round(lat[min(len(lat) - 1, int(0.99 * len(lat)))], 4)})
+    return rows
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Recall@k vs latency for the FAISS store index types")
+    p.add_argument("--n", type=int, default=100_000, help="Corpus size")
+    p.add_argument("--dim", type=int, default=128)
+    p.add_argument("--vectors", help="Optional .npy (N, dim) corpus instead of synthetic vectors")
+    p.add_argument("--queries", type=int, default=500)
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--types", nargs="+", default=["ivf_flat", "ivf_pq", "hnsw", "sq8", "pq"])
+    p.add_argument("--nlist", type=int, help="IVF cells (default: 4 * sqrt(n))")
+    p.add_argument("--pq-m", type=int, default=16, help="PQ sub-vectors for pq / ivf_pq")
+    p.add_argument("--hnsw-m", type=int, default=32)
+    p.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    p.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    p.add_argument("--rerank", type=int, nargs="+", default=[0, 4],
+                   help="Candidate factors re-scored against the full-precision copy (sq8, pq, ivf_pq)")
+    p.add_argument("--out", help="Write the result rows as JSON")
+    args = p.parse_args()
+    if faiss is None:
+        sys.exit("faiss is not installed. Install 'faiss-cpu'.")
+
+    if args.vectors:
+        vectors = np.load(args.vectors).astype("float32")
+    else:
+        vectors = clustered_vectors(args.n + args.queries, args.dim)
+    vectors, queries = vectors[:-args.queries], vectors[-args.queries:]
+    nlist = args.nlist or max(1, int(4 * np.sqrt(len(vectors))))
+
+    # exact neighbours from the flat index are the ground truth
+    exact = FAISSEmbeddingsStore(dim=vectors.shape[1])
+    exact.add_many(vectors, copy=True)
+    q = queries.copy()
+    faiss.normalize_L2(q)
+    truth = exact.index.search(q, args.k)[1].tolist()
+    results = run_config(vectors, queries, truth, args.k, "flat", {}, [{}])
+    for index_type in args.types:
+        if index_type == "hnsw":
+            params, settings = {"m": args.hnsw_m}, [{"ef_search": e} for e in args.ef_search]
+        elif index_type == "sq8":
+            params, settings = {}, [{"rerank": r} for r in args.rerank]
+        elif index_type == "pq":
+            params, settings = {"m": args.pq_m}, [{"rerank": r} for r in args.rerank]
+        elif index_type == "ivf_pq":
+            params = {"nlist": nlist, "m": args.pq_m}
+            settings = [{"nprobe": n, "rerank": r} for n in args.nprobe for r in args.rerank]
+        else:
+            params, settings = {"nlist": nlist}, [{"nprobe": n} for n in args.nprobe]
+        results.extend(run_config(vectors, queries, truth, args.k, index_type, params, settings))
+
+    print(f"n={len(vectors):,} dim={vectors.shape[1]} queries={len(queries)} k={args.k}")
+    print(f"{'index':9s} {'search':20s} {'build s':>8s} {'B/vec':>7s} {'recall':>7s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    for r in results:
+        setting = ",".join(f"{key}={v}" for key, v in r["search"].items()) or "-"
+        print(f"{r['index_type']:9s} {setting:20s} {r['build_s']:8.2f} {r['bytes_per_vector']:7.1f} "
+              f"{r['recall']:7.3f} {r['p50_ms']:8.3f} {r['p99_ms']:8.3f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
@@ -0,0 +1,101 @@
+"""Startup time and resident memory of the vector store load modes.
+
+Writes a synthetic store (or uses ``--base`` of an existing one), then starts
+``--procs`` worker processes per mode. Each worker creates a ``VectorSearch``,
+runs one query and, while all workers are alive, reports:
+
+- startup ms (``VectorSearch.from_path``) and first-query ms;
+- private (anon) and mapped (file) resident memory;
+- PSS, the proportional share of pages, which drops when pages are shared.
+
+Modes: ``eager`` (read the index into RAM), ``mmap`` and ``lazy-mmap`` (the
+MCP server setting):
+
+    python scripts/bench_vector_load.py --n 500000 --dim 128 --procs 4
+"""
+import argparse
+import multiprocessing as mp
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # add project root to import path
+import numpy as np
+from mcp.tools.vector_search import VectorSearch, process_memory_mb
+from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+MODES = {"eager": {}, "mmap": {"mmap": True}, "lazy-mmap": {"mmap": True, "lazy": True}}
+
+
+def _pss_mb():
+    try:
+        with open("/proc/self/smaps_rollup", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def _worker(base, dim, mode, barrier, out):
+    before = process_memory_mb()
+    t0 = time.perf_counter()
+    vs = VectorSearch.from_path(base, **MODES[mode])
+    startup = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    vs.search(np.ones(dim, dtype="float32"), k=10)
+    first_query = time.perf_counter() - t0
+    barrier.wait()  # every worker holds its index now
+    after = process_memory_mb()
+    out.put({"startup_ms": startup * 1000, "first_query_ms": first_query * 1000,
+             "anon_mb": after.get("anon", after["rss"]) - before.get("anon", before["rss"]),
+             "file_mb": after.get("file", 0.0) - before.get("file", 0.0), "pss_mb": _pss_mb()})
+    barrier.wait()
+
+
+def run_mode(base, dim, mode, procs):
+    ctx = mp.get_context("spawn")
+    barrier, out = ctx.Barrier(procs), ctx.Queue()
+    workers = [ctx.Process(target=_worker, args=(base, dim, mode, barrier, out)) for _ in range(procs)]
+    for w in workers:
+        w.start()
+    rows = [out.get() for _ in workers]
+    for w in workers:
+        w.join()
+    return {key: statistics.mean(r[key] for r in rows) for key in rows[0]} | \
+        {"total_pss_mb": sum(r["pss_mb"] for r in rows)}
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Startup time and memory of eager vs mmap vs lazy store loading")
+    p.add_argument("--base", help="Existing store base path (default: build a synthetic one)")
+    p.add_argument("--n", type=int, default=200_000)
+    p.add_argument("--dim", type=int, default=128)
+    p.add_argument("--index-type", default="flat")
+    p.add_argument("--procs", type=int, default=2, help="Worker processes per mode")
+    args = p.parse_args()
+
+    tmp = None
+    if args.base:
+        base = Path(args.base)
+        dim = FAISSEmbeddingsStore.load(base, mmap=True).dim
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        base, dim = Path(tmp.name) / "store", args.dim
+        store = FAISSEmbeddingsStore(dim=dim, index_type=args.index_type)
+        vectors = np.random.default_rng(0).random((args.n, dim), dtype="float32")
+        store.add_many(vectors, [{"id": i} for i in range(args.n)])
+        store.save(base)
+        del store, vectors
+    size_mb = base.with_suffix(".index").stat().st_size / 1e6
+    print(f"index {base.with_suffix('.index')} ({size_mb:.1f} MB), {args.procs} processes per mode")
+    print(f"{'mode':10s} {'startup ms':>11s} {'1st query ms':>13s} {'anon MB':>8s} {'mapped MB':>10s} "
+          f"{'PSS MB':>8s} {'total PSS':>10s}")
+    for mode in MODES:
+        r = run_mode(base, dim, mode, args.procs)
+        print(f"{mode:10s} {r['startup_ms']:11.1f} {r['first_query_ms']:13.1f} {r['anon_mb']:8.1f} "
+              f"{r['file_mb']:10.1f} {r['pss_mb']:8.1f} {r['total_pss_mb']:10.1f}")
+    if tmp is not None:
+        tmp.cleanup()
@@ -0,0 +1,103 @@
+"""Compare FeatureWindow threshold queries: typed properties vs a features_json string.
+
+Both layouts are built from the same windows. The typed layout is the regular
+:FeatureWindow nodes, written by Load_Engn_Data.py --make-windows. The JSON
+layout is copied into :FeatureWindowJson nodes, and filtering it means
+fetching every window and parsing JSON client-side. Run against a scratch
+database:
+    python data_pipeline/Load_Engn_Data.py --csv data_sources/synthetic_engine_data.csv \
+        --neo4j bolt://localhost:7687 --user neo4j --password <pw> --make-windows
+    python scripts/bench_window_queries.py --neo4j bolt://localhost:7687 --user neo4j --password <pw>
+
+The benchmark does not modify the :FeatureWindow nodes. Windows written by
+older versions (features_json only) are converted by
+scripts/migrate_feature_windows.py.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # add project root to import path
+from neo4j import GraphDatabase
+from mcp.tools.graph_query import build_window_filter_query
+
+COPY_TO_JSON_LAYOUT = """
+MATCH (fw:FeatureWindow)
+WITH fw, properties(fw) AS p
+MERGE (j:FeatureWindowJson {window_id: fw.window_id})
+SET j.start_ts = fw.start_ts, j.end_ts = fw.end_ts
+RETURN fw.window_id AS window_id, p AS props
+"""
+
+SET_JSON = """
+UNWIND $rows AS r
+MATCH (j:FeatureWindowJson {window_id: r.window_id})
+SET j.features_json = r.features_json
+"""
+
+READ_JSON_LAYOUT = "MATCH (j:FeatureWindowJson) RETURN j.window_id AS window_id, j.features_json AS features_json"
+
+_SKIP = {"window_id", "start_ts", "end_ts", "created_at"}
+_OPS = {">": float.__gt__, ">=": float.__ge__, "<": float.__lt__, "<=": float.__le__, "=": float.__eq__}
+
+
+def build_json_layout(sess, batch=1000):
+    records = list(sess.run(COPY_TO_JSON_LAYOUT))
+    rows = [{"window_id": r["window_id"],
+             "features_json": json.dumps({k: v for k, v in r["props"].items() if k not in _SKIP})}
+            for r in records]
+    for i in range(0, len(rows), batch):
+        sess.run(SET_JSON, {"rows": rows[i:i + batch]}).consume()
+    return len(rows)
+
+
+def json_filter(sess, thresholds):
+    hits = []
+    for rec in sess.run(READ_JSON_LAYOUT):
+        feats = json.loads(rec["features_json"])
+        if all(feats.get(k) is not None and _OPS[op](float(feats[k]), float(v))
+               for k, (op, v) in thresholds.items()):
+            hits.append(rec["window_id"])
+    return hits
+
+
+def median_ms(fn, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, result
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument("--neo4j", default="bolt://localhost:7687")
+    p.add_argument("--user", default="neo4j")
+    p.add_argument("--password", default="test")
+    p.add_argument("--repeat", type=int, default=10)
+    p.add_argument("--keep", action="store_true", help="Keep the :FeatureWindowJson copy")
+    args = p.parse_args()
+
+    # trigger thresholds from docs/specifications/engine_specification.md
+    scenarios = {
+        "sensor_4_max > 3.0": {"sensor_4_max": (">", 3.0)},
+        "sensor_1_min < -0.65 and sensor_4_max > 2.5": {"sensor_1_min": ("<", -0.65),
+                                                        "sensor_4_max": (">", 2.5)},
+        "failure_count >= 1": {"failure_count": (">=", 1)},
+    }
+
+    driver = GraphDatabase.driver(args.neo4j, auth=(args.user, args.password))
+    with driver.session() as sess:
+        print(f"copied {build_json_layout(sess)} windows to :FeatureWindowJson")
+        for name, thresholds in scenarios.items():
+            cypher, params = build_window_filter_query(thresholds, limit=1_000_000)
+            typed_ms, typed = median_ms(lambda: list(sess.run(cypher, params)), args.repeat)
+            json_ms, hits = median_ms(lambda: json_filter(sess, thresholds), args.repeat)
+            print(f"{name:45s} typed {typed_ms:8.2f} ms ({len(typed)} hits)   "
+                  f"json {json_ms:8.2f} ms ({len(hits)} hits)")
+        if not args.keep:
+            sess.run("MATCH (j:FeatureWindowJson) DETACH DELETE j").consume()
+    driver.close()
@@ -0,0 +1,67 @@
+"""Timing comparison: per-window pandas loop vs the vectorized windowing engine,
+plus the per-sample cost of the streaming aggregator (data_pipeline/stream_windows.py).
+
+Usage:
+    python scripts/bench_windows.py --window-size 200 --stride 5 --repeat 3
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # add project root to import path
+import pandas as pd
+from data_pipeline.Load_Engn_Data import make_windows_for_unit
+from data_pipeline.stream_windows import StreamingWindowAggregator
+
+
+def loop_windows(df_unit, unit_id, window_size, stride):
+    """Original implementation: slice the frame and reduce one column at a time."""
+    features_cols = [c for c in df_unit.columns if c.startswith("sensor_")]
+    out = []
+    for start in range(0, len(df_unit) - window_size + 1, stride):
+        win = df_unit.iloc[start:start + window_size]
+        feats = {}
+        for c in features_cols:
+            arr = win[c].values.astype(float)
+            feats[f"{c}_mean"] = float(arr.mean())
+            feats[f"{c}_std"] = float(arr.std(ddof=0))
+            feats[f"{c}_min"] = float(arr.min())
+            feats[f"{c}_max"] = float(arr.max())
+        feats["failure_count"] = int(win["failure"].sum())
+        out.append((f"{unit_id}__{start}__{start + window_size}", feats))
+    return out
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument("--csv", default="data_sources/synthetic_engine_data.csv")
+    p.add_argument("--window-size", type=int, default=200)
+    p.add_argument("--stride", type=int, default=5)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    df = pd.read_csv(args.csv, parse_dates=['time']).sort_values(["unit_id", "time"])
+    groups = [(u, g.reset_index(drop=True)) for u, g in df.groupby("unit_id", sort=False)]
+    n_windows = sum(len(make_windows_for_unit(g, u, args.window_size, args.stride)) for u, g in groups)
+
+    t_loop = best_of(lambda: [loop_windows(g, u, args.window_size, args.stride) for u, g in groups], args.repeat)
+    t_vec = best_of(lambda: [make_windows_for_unit(g, u, args.window_size, args.stride) for u, g in groups],
+                    args.repeat)
+    print(f"rows={len(df)} units={len(groups)} windows={n_windows} "
+          f"window_size={args.window_size} stride={args.stride}")
+    print(f"loop:       {t_loop * 1000:9.1f} ms")
+    print(f"vectorized: {t_vec * 1000:9.1f} ms  ({t_loop / t_vec:.1f}x)")
+
+    records = df.to_dict("records")
+    t_stream = best_of(lambda: StreamingWindowAggregator(args.window_size, args.stride).extend(records),
+                       args.repeat)
+    print(f"streaming:  {t_stream * 1000:9.1f} ms  ({t_stream / len(records) * 1e6:.1f} us/sample)")
@@ -17,6 +17,9 @@ with driver.session() as sess:
     sess.run("MATCH (r:SensorReading) DETACH DELETE r")
     sess.run("MATCH (f:FailureEvent) DETACH DELETE f")
     sess.run("MATCH (w:FeatureWindow) DETACH DELETE w")
+    sess.run("MATCH (b:ReadingBucket) DETACH DELETE b")
+    # reset ingestion watermarks so the next run re-ingests everything
+    sess.run("MATCH (e:Engine) REMOVE e.last_ingested_ts, e.last_window_end_ts")
 
     after = {
         'engines': sess.run("MATCH (e:Engine) RETURN count(e) as c").single().value(),
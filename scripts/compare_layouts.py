@@ -0,0 +1,89 @@
+"""Compare the per-row SensorReading layout with the ReadingBucket layout.
+
+Offline (no Neo4j): node / relationship / property counts each layout
+produces for a CSV:
+    python scripts/compare_layouts.py --csv data_sources/synthetic_engine_data.csv
+
+Live: also time the same range query against a graph holding both layouts
+(ingest once with --layout rows and once with --layout buckets) and, when run
+on the database host, report the store size on disk:
+    python scripts/compare_layouts.py --csv data_sources/synthetic_engine_data.csv \
+        --neo4j bolt://localhost:7687 --user neo4j --password <pw> --store-dir /data/databases/neo4j
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # add project root to import path
+import pandas as pd
+from data_pipeline.csv_stream import SENSOR_COLS, reading_rows
+from data_pipeline.reading_buckets import CYpher_READ_BUCKET_RANGE, pack_buckets
+
+ROWS_RANGE_QUERY = """
+MATCH (:Engine {id: $unit_id})-[:HAS_READING]->(rd:SensorReading)
+WHERE rd.ts >= $start AND rd.ts <= $end
+RETURN rd.ts AS ts, rd.seq AS seq, rd.sensor_1 AS sensor_1, rd.sensor_2 AS sensor_2,
+       rd.sensor_3 AS sensor_3, rd.sensor_4 AS sensor_4, rd.sensor_5 AS sensor_5,
+       rd.sensor_6 AS sensor_6
+ORDER BY rd.ts
+"""
+
+
+def offline_counts(csv_path, bucket_seconds):
+    df = pd.read_csv(csv_path, parse_dates=["time"])
+    rows = reading_rows(df, range(len(df)))
+    buckets = pack_buckets(rows, bucket_seconds)
+    per_row_props = 3 + len(SENSOR_COLS)          # reading_id, ts, seq, sensors
+    per_bucket_props = 4 + 2 + len(SENSOR_COLS)   # bucket_id, start/end_ts, bucket_seconds, ts[], seq[], sensors[]
+    return {
+        "rows": {"nodes": len(rows), "relationships": len(rows), "properties": len(rows) * per_row_props},
+        "buckets": {"nodes": len(buckets), "relationships": len(buckets),
+                    "properties": len(buckets) * per_bucket_props},
+    }
+
+
+def dir_size(path):
+    return sum(p.stat().st_size for p in Path(path).rglob("*") if p.is_file())
+
+
+def time_query(sess, query, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = len(list(sess.run(query, params)))
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, n
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument("--csv", default="data_sources/synthetic_engine_data.csv")
+    p.add_argument("--bucket-seconds", type=int, default=3600)
+    p.add_argument("--neo4j", help="Bolt URI; omit for offline counts only")
+    p.add_argument("--user", default="neo4j")
+    p.add_argument("--password", default="test")
+    p.add_argument("--store-dir", help="Database store directory on this host, for the on-disk size")
+    p.add_argument("--unit", default="unit_1")
+    p.add_argument("--start", default="2025-01-01T06:00:00")
+    p.add_argument("--end", default="2025-01-01T12:00:00")
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args()
+
+    counts = offline_counts(args.csv, args.bucket_seconds)
+    for layout, c in counts.items():
+        print(f"{layout:8s} nodes={c['nodes']:>10,} relationships={c['relationships']:>10,} "
+              f"properties={c['properties']:>10,}")
+
+    if args.store_dir:
+        print(f"store size on disk: {dir_size(args.store_dir) / 1e6:.1f} MB ({args.store_dir})")
+
+    if args.neo4j:
+        from neo4j import GraphDatabase
+        params = {"unit_id": args.unit, "start": args.start, "end": args.end}
+        driver = GraphDatabase.driver(args.neo4j, auth=(args.user, args.password))
+        with driver.session() as sess:
+            for layout, query in (("rows", ROWS_RANGE_QUERY), ("buckets", CYpher_READ_BUCKET_RANGE)):
+                ms, n = time_query(sess, query, params, args.repeat)
+                print(f"{layout:8s} range query: median {ms:.2f} ms, {n} records")
+        driver.close()
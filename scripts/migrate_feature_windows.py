@@ -0,0 +1,48 @@
+"""Convert FeatureWindow nodes written by older versions to typed properties.
+
+Older versions of Load_Engn_Data.py stored each window's statistics as one
+``features_json`` string. This one-way migration copies them onto the node as
+typed properties (``fw.sensor_1_mean`` ... ``fw.failure_count``) and removes
+``features_json``, so threshold filters can use the range indexes in
+graph_db/schema.cypher. Already migrated windows are left alone, so the script
+can be re-run safely. Back up the database first:
+    python scripts/migrate_feature_windows.py --neo4j bolt://localhost:7687 --user neo4j --password <pw>
+"""
+import argparse
+import json
+
+from neo4j import GraphDatabase
+
+READ_LEGACY = """
+MATCH (fw:FeatureWindow) WHERE fw.features_json IS NOT NULL
+RETURN fw.window_id AS window_id, fw.features_json AS features_json
+"""
+
+MIGRATE_LEGACY = """
+UNWIND $rows AS r
+MATCH (fw:FeatureWindow {window_id: r.window_id})
+SET fw += r.features
+REMOVE fw.features_json
+"""
+
+
+def migrate_legacy(sess, batch=1000):
+    rows = [{"window_id": r["window_id"], "features": json.loads(r["features_json"])}
+            for r in sess.run(READ_LEGACY)]
+    for i in range(0, len(rows), batch):
+        sess.run(MIGRATE_LEGACY, {"rows": rows[i:i + batch]}).consume()
+    return len(rows)
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description="Convert FeatureWindow.features_json to typed properties")
+    p.add_argument("--neo4j", default="bolt://localhost:7687")
+    p.add_argument("--user", default="neo4j")
+    p.add_argument("--password", default="test")
+    p.add_argument("--batch", type=int, default=1000, help="Windows updated per transaction")
+    args = p.parse_args()
+
+    driver = GraphDatabase.driver(args.neo4j, auth=(args.user, args.password))
+    with driver.session() as sess:
+        print(f"migrated {migrate_legacy(sess, args.batch)} FeatureWindow nodes to typed properties")
+    driver.close()
@@ -0,0 +1,75 @@
+import json
+
+import pandas as pd
+import pytest
+
+from benchmarks.fake_sink import FakeIngestor
+from benchmarks.fleet import FLEET_COLUMNS, generate_fleet, write_fleet_csv
+from benchmarks.run import compare, run
+from data_pipeline.Load_Engn_Data import ingest_csv
+from data_pipeline.watermarks import Watermarks
+
+
+def test_generated_fleet_matches_csv_schema():
+    df = generate_fleet(4, 500, failure_rate=1 / 400, seed=3)
+    assert df.columns.tolist() == FLEET_COLUMNS
+    assert df["unit_id"].unique().tolist() == ["unit_1", "unit_2", "unit_3", "unit_4"]
+    for unit, grp in df.groupby("unit_id"):
+        assert grp["time"].is_monotonic_increasing
+        assert grp["time"].iloc[0] == pd.Timestamp("2025-01-01") + pd.Timedelta(days=int(unit[5:]) - 1)
+        assert grp["failure"].sum() <= 1
+        if grp["failure"].sum():
+            at = int(grp["failure"].to_numpy().argmax())
+            assert (grp["rul"].iloc[at:] == 0).all()
+            if at:
+                assert grp["rul"].iloc[at - 1] == 1
+    assert generate_fleet(2, 50, seed=1).equals(generate_fleet(2, 50, seed=1))
+
+
+def test_fleet_csv_written_in_chunks(tmp_path):
+    path = tmp_path / "fleet.csv"
+    assert write_fleet_csv(path, engines=5, rows_per_engine=40, engines_per_chunk=2) == 200
+    df = pd.read_csv(path, parse_dates=["time"])
+    assert len(df) == 200 and df["unit_id"].nunique() == 5
+    assert df.groupby("unit_id")["time"].min()["unit_5"] == pd.Timestamp("2025-01-05")
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_fake_ingestor_receives_ingest_csv_batches(tmp_path, stream):
+    path = tmp_path / "fleet.csv"
+    write_fleet_csv(path, engines=3, rows_per_engine=300, failure_rate=1 / 300)
+    sink = FakeIngestor(serialize=True, keep_rows=True)
+    ingest_csv(str(path), None, None, None, batch_size=128, make_windows=True, window_size=50,
+               stride=25, stream=stream, chunk_size=250, use_cache=False, ingestor=sink)
+    summary = sink.summary()
+    assert sink.closed
+    assert summary["engines"]["rows"] == 3
+    assert summary["readings"]["rows"] == 900 and summary["readings"]["max_batch"] <= 128
+    assert summary["windows"]["rows"] == 3 * 11
+    assert sink.rows_written == sum(s["rows"] for s in summary.values())
+    assert {w["window_id"] for w in sink.received["windows"]} >= {"unit_1__0__50", "unit_3__250__300"}
+
+
+def test_fake_ingestor_watermarks_skip_rows(tmp_path):
+    path = tmp_path / "fleet.csv"
+    write_fleet_csv(path, engines=2, rows_per_engine=100)
+    sink = FakeIngestor(watermarks=Watermarks(readings={"unit_1": "2025-01-01T00:49:00"}))
+    ingest_csv(str(path), None, None, None, use_cache=False, ingestor=sink)
+    assert sink.stats["readings"].rows == 150
+
+
+def test_run_report_and_compare(tmp_path):
+    report = run([2000, 4000], rows_per_engine=1000, window_size=50, stride=25,
+                 in_memory_limit=2000, workdir=tmp_path, log=lambda *_: None)
+    json.dumps(report)
+    stages = [(r["stage"], r["mode"], r["rows"]) for r in report["results"]]
+    assert stages == [(s, "memory", 2000) for s in ("csv_parse", "row_dicts", "windowing", "ingest")] + \
+        [(s, "stream", 4000) for s in ("csv_parse", "row_dicts", "windowing", "ingest")]
+    assert report["results"][2]["windows"] == 2 * 39
+
+    slower = json.loads(json.dumps(report))
+    for r in slower["results"]:
+        r["rows_per_s"] /= 2
+    flags = compare(slower, report)
+    assert len(flags) == 8 and all(f["regression"] and f["ratio"] == 0.5 for f in flags)
+    assert not any(f["regression"] for f in compare(report, slower))
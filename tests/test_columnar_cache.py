@@ -0,0 +1,91 @@
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from data_pipeline.columnar_cache import (build_cache, cache_is_fresh, default_cache_dir,  # noqa: E402
+                                          load_sensor_frame, read_meta)
+from data_pipeline.Load_Engn_Data import make_windows_for_unit  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+CSV = ROOT / "data_sources" / "synthetic_engine_data.csv"
+
+
+@pytest.fixture
+def csv_copy(tmp_path):
+    path = tmp_path / "engine.csv"
+    shutil.copy(CSV, path)
+    return path
+
+
+def test_cache_round_trip_and_compact_dtypes(csv_copy):
+    assert not cache_is_fresh(csv_copy)
+    out = build_cache(csv_copy)
+    assert out == default_cache_dir(csv_copy)
+    assert sorted(p.name for p in out.iterdir() if p.is_dir())[:2] == ["unit_id=unit_1", "unit_id=unit_2"]
+    assert cache_is_fresh(csv_copy)
+
+    cached = load_sensor_frame(csv_copy)
+    source = pd.read_csv(csv_copy, parse_dates=["time"]).sort_values(["unit_id", "time"]).reset_index(drop=True)
+    assert cached.columns.tolist() == source.columns.tolist()
+    assert str(cached["unit_id"].dtype) == "category"
+    assert cached["sensor_1"].dtype == "float32" and cached["failure"].dtype == "int8"
+    assert (cached["time"] == source["time"]).all()
+    assert (cached["unit_id"].astype(str) == source["unit_id"]).all()
+    assert cached["sensor_4"].to_numpy() == pytest.approx(source["sensor_4"].to_numpy(), rel=1e-6)
+
+
+def test_single_engine_load_and_windows(csv_copy):
+    build_cache(csv_copy)
+    unit = load_sensor_frame(csv_copy, unit_ids=["unit_3"], columns=["sensor_4"])
+    assert unit.columns.tolist() == ["time", "unit_id", "sensor_4"]
+    assert set(unit["unit_id"]) == {"unit_3"} and len(unit) == 2000
+
+    full = load_sensor_frame(csv_copy, unit_ids=["unit_1"])
+    from_csv = load_sensor_frame(csv_copy, unit_ids=["unit_1"], use_cache=False)
+    got = make_windows_for_unit(full, "unit_1", window_size=50, stride=25)
+    expected = make_windows_for_unit(from_csv, "unit_1", window_size=50, stride=25)
+    assert [w["window_id"] for w in got] == [w["window_id"] for w in expected]
+    assert got[3]["features"] == pytest.approx(expected[3]["features"], rel=1e-5, abs=1e-6)
+
+
+def test_cache_invalidated_by_content_hash(csv_copy):
+    build_cache(csv_copy)
+    meta = read_meta(default_cache_dir(csv_copy))
+    # same bytes, new mtime: still fresh; the check writes nothing, a load records the mtime
+    os.utime(csv_copy, ns=(meta["mtime_ns"] + 10**9, meta["mtime_ns"] + 10**9))
+    assert cache_is_fresh(csv_copy)
+    assert read_meta(default_cache_dir(csv_copy)) == meta
+    assert str(load_sensor_frame(csv_copy)["unit_id"].dtype) == "category"
+    assert read_meta(default_cache_dir(csv_copy))["mtime_ns"] == meta["mtime_ns"] + 10**9
+
+    # same size, different content: stale, and the loader falls back to the CSV
+    text = csv_copy.read_text()
+    csv_copy.write_text(text.replace("unit_1,", "unit_9,", 1))
+    assert not cache_is_fresh(csv_copy)
+    df = load_sensor_frame(csv_copy)
+    assert str(df["unit_id"].dtype) != "category" and df["unit_id"].iloc[0] == "unit_9"
+
+
+def test_float64_cache_is_exact_and_float32_is_not_used_for_it(csv_copy):
+    from data_pipeline.csv_stream import SENSOR_COLS
+
+    build_cache(csv_copy)
+    assert not cache_is_fresh(csv_copy, sensor_dtype="float64")
+    # a float32 cache is skipped: the CSV is read, with exact values
+    from_csv = load_sensor_frame(csv_copy, sensor_dtype="float64")
+    assert str(from_csv["unit_id"].dtype) != "category" and from_csv["sensor_1"].dtype == "float64"
+
+    build_cache(csv_copy, sensor_dtype="float64")
+    assert cache_is_fresh(csv_copy, sensor_dtype="float64") and not cache_is_fresh(csv_copy, sensor_dtype="float32")
+    cached = load_sensor_frame(csv_copy, sensor_dtype="float64")
+    assert str(cached["unit_id"].dtype) == "category"
+    source = from_csv.sort_values(["unit_id", "time"], kind="stable").reset_index(drop=True)
+    for col in [*SENSOR_COLS, "rul"]:
+        # bit-identical, so ingestion writes the same values with or without the cache
+        assert np.array_equal(cached[col].to_numpy(), source[col].to_numpy(), equal_nan=True)
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+
+from data_pipeline.corpus_indexer import chunk_markdown, index_corpus, iter_sections
+from data_pipeline.embedding_pipeline import EmbeddingPipeline, hash_embeddings
+from vector_db.embeddings_store.store import EmbeddingsStore
+
+DOCS = Path(__file__).resolve().parents[1] / "docs"
+
+
+def test_sections_follow_heading_levels_and_skip_fences():
+    text = "intro\n# A\nalpha\n## B\nbeta\n```\n# not a heading\n```\n## C\ngamma\n# D\ndelta\n"
+    sections = [(h, text[lo:hi].strip()) for h, lo, hi in iter_sections(text)]
+    assert [h for h, _ in sections] == ["", "A", "A > B", "A > C", "D"]
+    assert "# not a heading" in sections[2][1]
+
+
+def test_chunks_are_token_bounded_and_overlap():
+    words = [f"w{i}" for i in range(25)]
+    text = "# Title\n" + " ".join(words) + "\n## Next\nshort section\n"
+    chunks = chunk_markdown(text, max_tokens=10, overlap=3)
+    body = [c for c in chunks if c["heading"] == "Title"]
+    assert [c["text"].split() for c in body] == [words[0:10], words[7:17], words[14:24], words[21:25]]
+    assert all(text[c["start"]:c["end"]] == c["text"] for c in chunks)
+    assert chunks[-1] == {"heading": "Title > Next", "start": text.index("short"), "end": len(text) - 1,
+                          "text": "short section"}
+    with pytest.raises(ValueError):
+        chunk_markdown(text, max_tokens=5, overlap=5)
+
+
+def test_index_corpus_is_incremental(tmp_path):
+    (tmp_path / "manuals").mkdir()
+    manual = tmp_path / "manuals" / "FM-07_Seal_Leak.md"
+    manual.write_text("# FM-07: Seal Leak\n## Steps\n" + " ".join(f"step{i}" for i in range(30)) + "\n",
+                      encoding="utf-8")
+    other = tmp_path / "overview.md"
+    other.write_text("# Overview\nCovers FM-01 and FM-02.\n", encoding="utf-8")
+    store = EmbeddingsStore()
+    pipeline = EmbeddingPipeline(batch_size=2, workers=2)
+
+    stats = index_corpus(tmp_path, store, pipeline, max_tokens=20, overlap=5)
+    assert stats == {"files": 2, "skipped": 0, "indexed": 2, "chunks": 3, "deleted": 0}
+    metas = [store.metadata[i] for i in range(3)]
+    assert {m["source"] for m in metas} == {"manuals/FM-07_Seal_Leak.md", "overview.md"}
+    steps = [m for m in metas if m["heading"] == "FM-07: Seal Leak > Steps"]
+    assert len(steps) == 2 and all(m["fm_id"] == ["FM-07"] and m["doc_type"] == "manuals" for m in steps)
+    assert store.query(hash_embeddings(["Overview\n\nCovers FM-01 and FM-02."])[0], k=1,
+                       filters={"fm_id": "FM-02"})[0]["metadata"]["source"] == "overview.md"
+
+    # nothing changed: nothing embedded
+    assert index_corpus(tmp_path, store, pipeline, max_tokens=20, overlap=5)["skipped"] == 2
+
+    # a shorter manual drops a chunk; a deleted file drops all of its chunks
+    manual.write_text("# FM-07: Seal Leak\n## Steps\nreplace the seal\n", encoding="utf-8")
+    other.unlink()
+    stats = index_corpus(tmp_path, store, pipeline, max_tokens=20, overlap=5)
+    assert stats == {"files": 1, "skipped": 0, "indexed": 1, "chunks": 1, "deleted": 2}
+    assert len(store) == 1 and list(store.doc_hashes()) == ["docs:manuals/FM-07_Seal_Leak.md#0"]
+
+
+def test_repository_docs_are_searchable_by_passage():
+    store = EmbeddingsStore()
+    stats = index_corpus(DOCS, store)
+    assert stats["files"] >= 15 and len(store) > stats["files"]
+    hits = store.query([0.5] * 128, k=500, filters={"doc_type": "maintenance_manuals", "fm_id": "FM-05"})
+    assert hits and {h["metadata"]["source"] for h in hits} == {"maintenance_manuals/FM-05_Bearing_Wear_Acceleration.md"}
+    assert any(h["metadata"]["heading"].endswith("> Steps") for h in hits)
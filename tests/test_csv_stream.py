@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from data_pipeline.csv_stream import iter_csv_batches
+from data_pipeline.Load_Engn_Data import make_windows_for_unit
+
+ROOT = Path(__file__).resolve().parents[1]
+CSV = ROOT / "data_sources" / "synthetic_engine_data.csv"
+
+
+def _sorted_csv(tmp_path, rows=None):
+    df = pd.read_csv(CSV, parse_dates=["time"]).sort_values(["unit_id", "time"]).reset_index(drop=True)
+    if rows is not None:
+        df = df.groupby("unit_id", sort=False).head(rows).reset_index(drop=True)
+    path = tmp_path / "sorted.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+
+def _collect(path, **kwargs):
+    out = {"engines": [], "readings": [], "failures": [], "windows": []}
+    sizes = []
+    for kind, rows in iter_csv_batches(path, **kwargs):
+        out[kind].extend(rows)
+        sizes.append((kind, len(rows)))
+    return out, sizes
+
+
+@pytest.mark.parametrize("chunk_size", [97, 1000, 50_000])
+def test_stream_windows_match_in_memory_path(tmp_path, chunk_size):
+    path, df = _sorted_csv(tmp_path, rows=600)
+    out, _ = _collect(path, batch_size=128, chunk_size=chunk_size,
+                      make_windows=True, window_size=40, stride=15)
+
+    expected = []
+    for unit in df["unit_id"].unique().tolist():
+        df_unit = df[df["unit_id"] == unit].reset_index(drop=True)
+        expected.extend(make_windows_for_unit(df_unit, unit, window_size=40, stride=15))
+
+    assert [w["window_id"] for w in out["windows"]] == [w["window_id"] for w in expected]
+    for got, exp in zip(out["windows"], expected):
+        assert (got["start_ts"], got["end_ts"]) == (exp["start_ts"], exp["end_ts"])
+        gf, ef = got["features"], exp["features"]
+        assert gf == pytest.approx(ef, rel=1e-9, abs=1e-9)
+
+
+def test_stream_readings_and_batches(tmp_path):
+    path, df = _sorted_csv(tmp_path, rows=300)
+    out, sizes = _collect(path, batch_size=100, chunk_size=250)
+
+    assert [e["id"] for e in out["engines"]] == df["unit_id"].unique().tolist()
+    assert len(out["readings"]) == len(df)
+    assert [r["seq"] for r in out["readings"]] == list(range(len(df)))
+    first = df.iloc[0]
+    assert out["readings"][0]["ts"] == first["time"].isoformat()
+    assert out["readings"][0]["sensor_4"] == pytest.approx(first["sensor_4"])
+    assert len(out["failures"]) == int((df["failure"] == 1).sum())
+    assert all(n <= 100 for _, n in sizes)
+    assert not out["windows"]
+
+
+def test_stride_larger_than_window(tmp_path):
+    path, df = _sorted_csv(tmp_path, rows=200)
+    out, _ = _collect(path, chunk_size=33, make_windows=True, window_size=10, stride=25)
+    df_unit = df[df["unit_id"] == "unit_1"].reset_index(drop=True)
+    expected = make_windows_for_unit(df_unit, "unit_1", window_size=10, stride=25)
+    got = [w["window_id"] for w in out["windows"] if w["unit_id"] == "unit_1"]
+    assert got == [w["window_id"] for w in expected]
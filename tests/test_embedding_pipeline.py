@@ -0,0 +1,96 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+from data_pipeline.embedding_pipeline import (
+    EmbeddingCache,
+    EmbeddingPipeline,
+    HashEncoder,
+    build_embeddings,
+    get_encoder,
+    hash_embeddings,
+    register_encoder,
+)
+
+
+def _reference_hash_embedding(text, dim):
+    vec, i = [], 0
+    while len(vec) < dim:
+        digest = hashlib.sha256(text.encode("utf-8") + i.to_bytes(2, "little")).digest()
+        vec.extend(b / 255.0 for b in digest)
+        i += 1
+    return vec[:dim]
+
+
+class CountingEncoder:
+    model_id = "counting/3"
+    dim = 3
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(t), 1.0, 0.0] for t in texts], dtype=np.float32)
+
+
+def test_hash_embeddings_match_the_reference_loop():
+    texts = ["", "short", "x" * 1000, "ünïcödé"]
+    for dim in (16, 100, 128):
+        got = hash_embeddings(texts, dim)
+        assert got.shape == (4, dim) and got.dtype == np.float32
+        expected = np.array([_reference_hash_embedding(t, dim) for t in texts])
+        np.testing.assert_allclose(got, expected, rtol=1e-6)
+
+
+def test_pipeline_batches_dedupes_and_caches(tmp_path):
+    encoder = CountingEncoder()
+    cache_path = tmp_path / "emb.sqlite"
+    pipeline = EmbeddingPipeline(encoder, EmbeddingCache(cache_path), batch_size=2)
+    out = pipeline.embed(["a", "bb", "a", "ccc", "dddd"])
+    assert out[:, 0].tolist() == [1, 2, 1, 3, 4]
+    assert encoder.calls == [["a", "bb"], ["ccc", "dddd"]]
+    # the repeated "a" is encoded once, but it is not a cache hit
+    assert (pipeline.hits, pipeline.encoded) == (0, 4)
+
+    # a new pipeline over the same file encodes only new text
+    again = EmbeddingPipeline(encoder, EmbeddingCache(cache_path), batch_size=2)
+    np.testing.assert_array_equal(again.embed(["dddd", "eeeee", "a"])[:, 0], [4, 5, 1])
+    assert encoder.calls[-1] == ["eeeee"] and again.hits == 2
+
+    # another model never sees these vectors
+    other = EmbeddingPipeline(HashEncoder(dim=3), EmbeddingCache(cache_path))
+    np.testing.assert_allclose(other.embed(["a"]), hash_embeddings(["a"], 3))
+    assert other.hits == 0 and len(EmbeddingCache(cache_path)) == 6
+
+
+def test_encoder_registry_and_build_embeddings(tmp_path):
+    register_encoder("counting", CountingEncoder)
+    assert build_embeddings(["a", "bb"], encoder="counting").shape == (2, 3)
+    np.testing.assert_allclose(build_embeddings(["a"], dim=8, cache_path=tmp_path / "c.sqlite"),
+                               hash_embeddings(["a"], 8))
+    with pytest.raises(ValueError):
+        get_encoder("nope")
+
+    class Broken(CountingEncoder):
+        def encode(self, texts):
+            return np.zeros((1, 3), dtype=np.float32)
+
+    with pytest.raises(ValueError):
+        EmbeddingPipeline(Broken()).embed(["a", "b"])
+
+
+def test_retriever_agent_embeds_queries_with_the_pipeline(tmp_path):
+    from agents.data_retriever import DataRetrieverAgent
+    from vector_db.embeddings_store.store import EmbeddingsStore
+
+    texts = ["turbine imbalance", "bearing wear", "fuel leak"]
+    store = EmbeddingsStore()
+    store.add_many(hash_embeddings(texts), [{"text": t} for t in texts])
+    store.save(tmp_path / "store")
+
+    agent = DataRetrieverAgent(tmp_path / "store")
+    assert agent.retrieve("bearing wear", k=1)[0]["metadata"]["text"] == "bearing wear"
+    many = agent.retrieve_many(["fuel leak", "turbine imbalance"], k=1)
+    assert [r[0]["metadata"]["text"] for r in many] == ["fuel leak", "turbine imbalance"]
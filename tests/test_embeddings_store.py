@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from vector_db.embeddings_store.store import EmbeddingsStore
+
+
+def _brute_force(vectors, query, k):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.argsort(-(unit @ (query / np.linalg.norm(query))), kind="stable")[:k].tolist()
+
+
+def test_growth_and_exact_top_k():
+    rng = np.random.default_rng(0)
+    vecs = rng.normal(size=(3000, 24)).astype("float32")
+    store = EmbeddingsStore(capacity=16)
+    for start in range(0, len(vecs), 700):
+        chunk = vecs[start:start + 700]
+        store.add_many(chunk, [{"id": i} for i in range(start, start + len(chunk))])
+    store.add(np.zeros(24), {"id": "zero"})
+    assert len(store) == 3001 and store.dim == 24
+    assert store._vectors.shape[0] == 4096  # doubled from 16, not grown per row
+
+    for qi in (0, 1234, 2999):
+        res = store.query(vecs[qi], k=7)
+        assert [r["metadata"]["id"] for r in res] == _brute_force(vecs, vecs[qi], 7)
+        assert res[0]["score"] == pytest.approx(1.0, abs=1e-5)
+
+    batched = store.query_batch(vecs[:4], k=[1, 2, 0, 5])
+    assert [len(r) for r in batched] == [1, 2, 0, 5]
+    single = store.query(vecs[3], k=5)
+    assert [r["metadata"] for r in batched[3]] == [r["metadata"] for r in single]
+    assert [r["score"] for r in batched[3]] == pytest.approx([r["score"] for r in single], abs=1e-5)
+    assert len(store.query(vecs[0], k=10_000)) == 3001
+    with pytest.raises(ValueError):
+        store.add([1.0, 2.0])
+
+
+def test_filters_and_empty_store():
+    assert EmbeddingsStore().query([1.0, 0.0], k=3) == []
+    store = EmbeddingsStore(dim=3)
+    store.add_many(np.eye(3), [{"id": "a", "kind": "x"}, {"id": "b", "kind": "y"}, {"id": "c", "kind": "x"}])
+    res = store.query([1, 1, 0], k=3, filters={"kind": "x"})
+    assert [r["metadata"]["id"] for r in res] == ["a", "c"]
+    assert store.query([1, 1, 0], k=3, filters={"kind": "z"}) == []
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_save_load_and_mmap(tmp_path: Path, dtype):
+    rng = np.random.default_rng(1)
+    vecs = rng.normal(size=(500, 16)).astype("float32")
+    store = EmbeddingsStore(dtype=dtype)
+    store.add_many(vecs, [{"id": i} for i in range(500)])
+    assert store._vectors.dtype == np.dtype(dtype)
+    expected = [r["metadata"]["id"] for r in store.query(vecs[42], k=5)]
+    assert expected[0] == 42
+
+    base = tmp_path / "mem"
+    store.save(base)
+    assert np.load(base.with_suffix(".npy")).shape == (500, 16)
+    for mmap in (False, True):
+        loaded = EmbeddingsStore.load(base, mmap=mmap)
+        assert loaded.dtype == np.dtype(dtype) and len(loaded) == 500
+        assert [r["metadata"]["id"] for r in loaded.query(vecs[42], k=5)] == expected
+    with pytest.raises(RuntimeError):
+        EmbeddingsStore.load(base, mmap=True).add(vecs[0])
+    writable = EmbeddingsStore.load(base)
+    writable.add(vecs[0], {"id": "dup"})
+    assert len(writable) == 501
+
+
+def test_float16_halves_memory():
+    vecs = np.random.default_rng(2).normal(size=(1024, 64))
+    full, half = EmbeddingsStore(dtype="float32"), EmbeddingsStore(dtype="float16")
+    full.add_many(vecs)
+    half.add_many(vecs)
+    assert half.memory_bytes * 2 == full.memory_bytes
+
+
+def test_upsert_delete_masks_removed_rows(tmp_path: Path):
+    store = EmbeddingsStore(dim=3)
+    assert store.upsert(["a", "b", "c"], np.eye(3), [{"id": "a"}, {"id": "b"}, {"id": "c"}],
+                        content_hashes=["1", "1", "1"]) == {"added": 3, "replaced": 0}
+    # "a" moves to b's direction and "b" goes away
+    assert store.upsert(["a"], [[0, 1, 0]], [{"id": "a"}], content_hashes=["2"]) == {"added": 0, "replaced": 1}
+    assert store.delete(["b"]) == 1
+    assert len(store) == 2 and store.doc_hashes() == {"a": "2", "c": "1"}
+    assert [r["metadata"]["id"] for r in store.query([1, 0.5, 0], k=5)] == ["a", "c"]
+
+    base = tmp_path / "upsert"
+    store.save(base)
+    for mmap in (False, True):
+        loaded = EmbeddingsStore.load(base, mmap=mmap)
+        assert len(loaded) == 2 and loaded.doc_hashes() == {"a": "2", "c": "1"}
+        assert [r["metadata"]["id"] for r in loaded.query([1, 0.5, 0], k=5)] == ["a", "c"]
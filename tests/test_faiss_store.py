@@ -40,3 +40,267 @@ def test_faiss_store_add_query_and_persistence(tmp_path):
     results2 = loaded.query(q2, k=2)
     assert results2
     assert all("metadata" in r for r in results2)
+
+
+def test_add_many_matches_add_and_normalizes_in_place():
+    pytest.importorskip("faiss")
+    import numpy as np
+
+    from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+    rng = np.random.default_rng(0)
+    vecs = rng.normal(size=(50, 16)).astype("float32")
+    vecs[3] = 0.0
+    metas = [{"id": i} for i in range(len(vecs))]
+
+    one_by_one = FAISSEmbeddingsStore(dim=16)
+    for v, m in zip(vecs, metas):
+        one_by_one.add(v.tolist(), m)
+
+    bulk = FAISSEmbeddingsStore(dim=16)
+    original = vecs.copy()
+    assert bulk.add_many(vecs, metas) == 50
+    # float32 C-contiguous input is normalized in place, zero rows stay zero
+    assert np.allclose(np.linalg.norm(vecs[[0, 1, 49]], axis=1), 1.0, atol=1e-6)
+    assert not vecs[3].any()
+
+    q = original[7]
+    assert [r["metadata"] for r in bulk.query(q, k=5)] == [r["metadata"] for r in one_by_one.query(q, k=5)]
+
+    kept = FAISSEmbeddingsStore(dim=16)
+    before = original.copy()
+    kept.add_many(original, metas, copy=True)
+    assert np.array_equal(original, before)
+    assert kept.index.ntotal == 50
+
+    with pytest.raises(ValueError):
+        bulk.add_many(np.zeros((2, 8), dtype="float32"), [{}, {}])
+    with pytest.raises(ValueError):
+        bulk.add_many(np.zeros((2, 16), dtype="float32"), [{}])
+
+
+def test_add_chunks_from_iterator():
+    pytest.importorskip("faiss")
+    import numpy as np
+
+    from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+    def chunks():
+        for start in range(0, 1000, 256):
+            n = min(256, 1000 - start)
+            yield np.random.default_rng(start).random((n, 8), dtype="float32"), \
+                [{"id": start + i} for i in range(n)]
+
+    store = FAISSEmbeddingsStore(dim=8)
+    assert store.add_chunks(chunks()) == 1000
+    assert store.index.ntotal == len(store.metadata) == 1000
+    assert store.metadata[999] == {"id": 999}
+
+
+@pytest.mark.parametrize("index_type,params", [
+    ("ivf_flat", {"nlist": 16}),
+    ("ivf_pq", {"nlist": 8, "m": 8, "nbits": 6}),
+    ("hnsw", {"m": 16}),
+])
+def test_ann_index_types_round_trip(tmp_path, index_type, params):
+    pytest.importorskip("faiss")
+    import numpy as np
+
+    from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+    rng = np.random.default_rng(1)
+    vecs = rng.normal(size=(600, 32)).astype("float32")
+    store = FAISSEmbeddingsStore(dim=32, index_type=index_type, nprobe=16, ef_search=128, **params)
+    store.add_many(vecs.copy(), [{"id": i} for i in range(len(vecs))])
+    assert store.is_trained and store.index.ntotal == 600
+    if index_type != "ivf_pq":
+        # searching every cell / a wide candidate list finds the query vector itself
+        assert store.query(vecs[5], k=1)[0]["metadata"]["id"] == 5
+
+    base = tmp_path / "ann"
+    store.save(base)
+    config = json.loads(base.with_suffix(".config.json").read_text())
+    assert config["index_type"] == index_type and config["search"]["nprobe"] == 16
+    loaded = FAISSEmbeddingsStore.load(base)
+    assert loaded.index_type == index_type and loaded.index_params == store.index_params
+    assert [r["metadata"] for r in loaded.query(vecs[5], k=5)] == [r["metadata"] for r in store.query(vecs[5], k=5)]
+
+
+def test_ivf_training_requirements_and_legacy_load(tmp_path):
+    pytest.importorskip("faiss")
+    import numpy as np
+
+    from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+    store = FAISSEmbeddingsStore(dim=8, index_type="ivf_flat", nlist=64)
+    assert not store.is_trained
+    with pytest.raises(ValueError):
+        store.add_many(np.ones((10, 8), dtype="float32"))
+    with pytest.raises(ValueError):
+        FAISSEmbeddingsStore(dim=8, index_type="ivf_pq", m=3)
+    with pytest.raises(ValueError):
+        FAISSEmbeddingsStore(dim=8, index_type="annoy")
+
+    # files saved before the config sidecar existed load as a flat index
+    flat = FAISSEmbeddingsStore(dim=8)
+    flat.add_many(np.eye(8, dtype="float32"), [{"id": i} for i in range(8)])
+    base = tmp_path / "legacy"
+    flat.save(base)
+    base.with_suffix(".config.json").unlink()
+    assert FAISSEmbeddingsStore.load(base).index_type == "flat"
+
+
+@pytest.mark.parametrize("index_type,params", [("flat", {}), ("ivf_flat", {"nlist": 16}), ("hnsw", {"m": 8})])
+def test_filtered_query_only_returns_matching_rows(tmp_path, index_type, params):
+    pytest.importorskip("faiss")
+    import numpy as np
+
+    from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+    rng = np.random.default_rng(2)
+    vecs = rng.normal(size=(2000, 16)).astype("float32")
+    # one row in 100 belongs to the rare source
+    metas = [{"id": i, "source": "rare.doc" if i % 100 == 0 else "bulk.doc"} for i in range(len(vecs))]
+    store = FAISSEmbeddingsStore(dim=16, index_type=index_type, nprobe=2, ef_search=16, **params)
+    store.add_many(vecs.copy(), metas)
+
+    q = vecs[7]
+    res = store.query(q, k=5, filters={"source": "rare.doc"})
+    assert len(res) == 5
+    assert all(r["metadata"]["source"] == "rare.doc" for r in res)
+    # the exact top-5 among the allowed rows
+    allowed = np.arange(0, 2000, 100)
+    unit = vecs[allowed] / np.linalg.norm(vecs[allowed], axis=1, keepdims=True)
+    expected = allowed[np.argsort(-(unit @ (q / np.linalg.norm(q))))[:5]].tolist()
+    if index_type == "flat":
+        assert [r["metadata"]["id"] for r in res] == expected
+
+    assert store.query(q, k=5, filters={"source": "nowhere"}) == []
+    batched = store.query_batch(vecs[:3], k=[1, 2, 3], filters={"id": [0, 100, 200]})
+    assert [len(r) for r in batched] == [1, 2, 3]
+
+    base = tmp_path / "filtered"
+    store.save(base)
+    assert base.with_suffix(".meta.sqlite").exists() and not base.with_suffix(".meta.json").exists()
+    for mmap in (False, True):
+        loaded = FAISSEmbeddingsStore.load(base, mmap=mmap)
+        assert [r["metadata"] for r in loaded.query(q, k=5, filters={"source": "rare.doc"})] == \
+            [r["metadata"] for r in res]
+
+
+def test_legacy_meta_json_still_loads(tmp_path):
+    pytest.importorskip("faiss")
+    import numpy as np
+
+    from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+    store = FAISSEmbeddingsStore(dim=4)
+    store.add_many(np.eye(4, dtype="float32"), [{"id": f"v{i}", "source": "a" if i < 2 else "b"} for i in range(4)])
+    base = tmp_path / "legacy"
+    store.save(base)
+    base.with_suffix(".meta.sqlite").unlink()
+    base.with_suffix(".meta.json").write_text(json.dumps([store.metadata[i] for i in range(4)]))
+
+    loaded = FAISSEmbeddingsStore.load(base)
+    assert [r["metadata"]["id"] for r in loaded.query([0, 0, 1, 0], k=4, filters={"source": "b"})] == ["v2", "v3"]
+
+
+def test_compressed_indexes_rerank_and_memory_report(tmp_path):
+    pytest.importorskip("faiss")
+    import numpy as np
+
+    from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+    rng = np.random.default_rng(3)
+    centres = rng.normal(size=(32, 32))
+    vecs = (centres[rng.integers(0, 32, 3000)] + 0.5 * rng.normal(size=(3000, 32))).astype("float32")
+    metas = [{"id": i} for i in range(len(vecs))]
+    flat = FAISSEmbeddingsStore(dim=32)
+    flat.add_many(vecs.copy(), metas)
+    truth = [[r["metadata"]["id"] for r in res] for res in flat.query_batch(vecs[:50], k=5)]
+
+    def recall(store):
+        found = [[r["metadata"]["id"] for r in res] for res in store.query_batch(vecs[:50], k=5)]
+        return np.mean([len(set(f) & set(t)) / 5 for f, t in zip(found, truth)])
+
+    sq8 = FAISSEmbeddingsStore(dim=32, index_type="sq8", keep_full=True)
+    sq8.add_many(vecs.copy(), metas)
+    report = sq8.memory_report()
+    assert report["bytes_per_vector"] < 0.3 * flat.memory_report()["bytes_per_vector"]
+    assert report["full_copy_bytes"] == 3000 * 32 * 4
+    sq8.set_search_params(rerank=4)
+    assert recall(sq8) == 1.0
+
+    pq = FAISSEmbeddingsStore(dim=32, index_type="pq", m=8, nbits=6, keep_full=True)
+    pq.add_many(vecs.copy(), metas)
+    # 6 bytes of codes plus the 8-byte stable row id
+    assert pq.memory_report()["bytes_per_vector"] < 16 + 8
+    coarse = recall(pq)
+    pq.set_search_params(rerank=8)
+    assert recall(pq) > coarse
+    # re-ranked scores are exact cosine similarities
+    top = pq.query(vecs[0], k=1)[0]
+    assert top["metadata"]["id"] == 0 and top["score"] == pytest.approx(1.0, abs=1e-5)
+
+    base = tmp_path / "pq"
+    pq.save(base)
+    assert base.with_suffix(".full.npy").exists()
+    loaded = FAISSEmbeddingsStore.load(base, mmap=True)
+    assert isinstance(loaded.full_vectors, np.memmap) and loaded.rerank == 8
+    assert loaded.query_batch(vecs[:5], k=5) == pq.query_batch(vecs[:5], k=5)
+
+    with pytest.raises(ValueError):
+        FAISSEmbeddingsStore(dim=32, index_type="sq8", rerank=4)
+
+
+@pytest.mark.parametrize("index_type,params", [("flat", {}), ("ivf_flat", {"nlist": 4}), ("sq8", {}),
+                                               ("pq", {"m": 4, "nbits": 4})])
+def test_upsert_and_delete_by_doc_id(tmp_path, index_type, params):
+    pytest.importorskip("faiss")
+    import numpy as np
+
+    from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+    rng = np.random.default_rng(4)
+    vecs = rng.normal(size=(64, 16)).astype("float32")
+    doc_ids = [f"doc-{i}" for i in range(64)]
+    store = FAISSEmbeddingsStore(dim=16, index_type=index_type, keep_full=True, rerank=4, **params)
+    assert store.upsert(doc_ids, vecs.copy(), [{"id": d} for d in doc_ids],
+                        content_hashes=["v1"] * 64) == {"added": 64, "replaced": 0}
+
+    # replace doc-3 with doc-9's vector and delete doc-9: a search for that vector finds doc-3
+    assert store.upsert(["doc-3", "doc-64"], vecs[[9, 10]].copy(), [{"id": "doc-3"}, {"id": "doc-64"}],
+                        content_hashes=["v2", "v1"]) == {"added": 1, "replaced": 1}
+    assert store.delete(["doc-9", "missing"]) == 1
+    assert len(store) == len(store.metadata) == 64
+    assert store.query(vecs[9], k=1)[0]["metadata"]["id"] == "doc-3"
+    assert all(r["metadata"]["id"] != "doc-9" for r in store.query(vecs[9], k=64))
+    assert store.query(vecs[9], k=1, filters={"id": ["doc-3", "doc-9"]})[0]["metadata"]["id"] == "doc-3"
+    hashes = store.doc_hashes("doc-")
+    assert len(hashes) == 64 and hashes["doc-3"] == "v2" and "doc-9" not in hashes
+
+    # ids, hashes and the id counter survive a save; a reloaded store keeps upserting
+    base = tmp_path / "upsert"
+    store.save(base)
+    loaded = FAISSEmbeddingsStore.load(base)
+    assert loaded.next_id == store.next_id == 66
+    assert loaded.doc_hashes() == store.doc_hashes()
+    loaded.upsert(["doc-3"], vecs[[5]].copy(), [{"id": "doc-3"}])
+    assert [r["metadata"]["id"] for r in loaded.query(vecs[5], k=2)] in (["doc-3", "doc-5"], ["doc-5", "doc-3"])
+    assert FAISSEmbeddingsStore.load(base, mmap=True).query(vecs[9], k=1)[0]["metadata"]["id"] == "doc-3"
+
+
+def test_hnsw_store_cannot_remove_documents():
+    pytest.importorskip("faiss")
+    import numpy as np
+
+    from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore
+
+    store = FAISSEmbeddingsStore(dim=4, index_type="hnsw", m=4)
+    store.upsert(["a", "b"], np.eye(4, dtype="float32")[:2])
+    assert store.upsert(["c"], np.eye(4, dtype="float32")[2:3]) == {"added": 1, "replaced": 0}
+    with pytest.raises(ValueError):
+        store.delete(["a"])
+    with pytest.raises(ValueError):
+        store.upsert(["b"], np.eye(4, dtype="float32")[3:])
+    assert len(store) == 3 and store.query([0, 1, 0, 0], k=1)[0]["score"] == pytest.approx(1.0)
@@ -0,0 +1,57 @@
+import pytest
+
+from mcp.tools.graph_query import build_window_filter_query, find_windows
+
+
+class FakeSession:
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, cypher, params):
+        self.calls.append((cypher, params))
+        return iter(self.records)
+
+
+class FakeDriver:
+    def __init__(self, records):
+        self.sess = FakeSession(records)
+
+    def session(self):
+        return self.sess
+
+
+def test_thresholds_become_parameterized_predicates():
+    cypher, params = build_window_filter_query(
+        {"sensor_4_max": (">", 3.0), "sensor_1_min": ("<", -0.65)},
+        unit_id="unit_1", start="2025-01-01T00:00:00", limit=10)
+    assert "fw.sensor_1_min < $v0" in cypher
+    assert "fw.sensor_4_max > $v1" in cypher
+    assert "fw.start_ts >= $start" in cypher and "eng.id = $unit_id" in cypher
+    assert "fw.end_ts" not in cypher
+    assert params == {"v0": -0.65, "v1": 3.0, "unit_id": "unit_1",
+                      "start": "2025-01-01T00:00:00", "limit": 10}
+
+
+@pytest.mark.parametrize("thresholds", [
+    {"sensor_1_mean) DETACH DELETE fw //": (">", 0)},
+    {"window_id": ("=", "x")},
+    {"sensor_1_max": ("CONTAINS", 1)},
+])
+def test_rejects_unknown_properties_and_operators(thresholds):
+    with pytest.raises(ValueError):
+        build_window_filter_query(thresholds)
+
+
+def test_find_windows_returns_flat_dicts():
+    driver = FakeDriver([{"unit_id": "unit_2", "window": {"window_id": "unit_2__0__50", "sensor_4_max": 3.4}}])
+    got = find_windows(driver, {"sensor_4_max": (">", 3.0)})
+    assert got == [{"window_id": "unit_2__0__50", "sensor_4_max": 3.4, "unit_id": "unit_2"}]
+    cypher, params = driver.sess.calls[0]
+    assert "WHERE fw.sensor_4_max > $v0" in cypher and params["v0"] == 3.0
@@ -35,8 +35,72 @@ def test_store_spec_embeddings_memory_store(tmp_path):
     store = EmbeddingsStore()
     count = store_spec_embeddings(spec_path, store)
     assert count == 6
-    # internal store should contain 6 entries
-    assert len(store._store) == 6
+    # store should contain 6 entries
+    assert len(store) == 6
     # metadata for first entry should include id and title
-    _, meta = store._store[0]
+    meta = store.metadata[0]
     assert "id" in meta and "title" in meta
+    # and the memory store is searchable: a document's own embedding finds it first
+    docs = split_failure_modes(load_spec_text(spec_path))
+    hit = store.query(deterministic_embedding(docs[2]["text"]), k=1)[0]
+    assert hit["metadata"]["id"] == docs[2]["id"]
+
+
+def test_store_spec_embeddings_is_incremental(tmp_path, monkeypatch):
+    import data_pipeline.Load_Spec_Data as loader
+
+    root = Path(__file__).resolve().parents[1]
+    spec_path = tmp_path / "spec.doc"
+    spec_path.write_text(load_spec_text(root / "data_sources" / "engine_spec_data.doc"), encoding="utf-8")
+    embedded = []
+    real = loader.get_embeddings_for_docs
+
+    def counting(docs, pipeline=None):
+        docs = list(docs)
+        embedded.append([d["id"] for d in docs])
+        return real(docs, pipeline)
+
+    monkeypatch.setattr(loader, "get_embeddings_for_docs", counting)
+    store = EmbeddingsStore()
+    assert store_spec_embeddings(spec_path, store) == 6
+    assert store_spec_embeddings(spec_path, store) == 6
+    assert len(embedded) == 1 and len(store) == 6
+
+    # edit one section and drop the last one: only the edited section is re-embedded
+    docs = split_failure_modes(spec_path.read_text(encoding="utf-8"))
+    text = "\n\n".join(d["text"] for d in docs[:-1]).replace(docs[1]["text"], docs[1]["text"] + " Revised.")
+    spec_path.write_text(text, encoding="utf-8")
+    assert store_spec_embeddings(spec_path, store) == 5
+    assert embedded[-1] == [docs[1]["id"]]
+    assert len(store) == 5 and sorted(store.doc_hashes()) == sorted(f"spec.doc:{d['id']}" for d in docs[:-1])
+    edited = split_failure_modes(text)[1]
+    assert store.query(deterministic_embedding(edited["text"]), k=1)[0]["metadata"]["id"] == docs[1]["id"]
+
+
+def test_hnsw_store_is_rebuilt_on_rerun(tmp_path):
+    pytest.importorskip("faiss")
+    import argparse
+
+    from data_pipeline.Load_Spec_Data import add_store_arguments, open_store
+
+    root = Path(__file__).resolve().parents[1]
+    spec_path = tmp_path / "spec.doc"
+    spec_path.write_text(load_spec_text(root / "data_sources" / "engine_spec_data.doc"), encoding="utf-8")
+    parser = argparse.ArgumentParser()
+    add_store_arguments(parser)
+    args = parser.parse_args(["--store", "faiss", "--index-type", "hnsw", "--embedding-cache", ""])
+    index_path = tmp_path / "store"
+    store = open_store(args, index_path, 128)
+    assert store_spec_embeddings(spec_path, store) == 6
+    store.save(index_path)
+
+    # an HNSW index cannot replace the edited section, so the re-run starts from an empty store
+    docs = split_failure_modes(spec_path.read_text(encoding="utf-8"))
+    spec_path.write_text(spec_path.read_text(encoding="utf-8").replace(docs[1]["text"], docs[1]["text"] + " Revised."),
+                         encoding="utf-8")
+    store = open_store(args, index_path, 128)
+    assert len(store) == 0
+    assert store_spec_embeddings(spec_path, store) == 6
+    assert len(store) == 6 and store.index_type == "hnsw"
+    edited = split_failure_modes(spec_path.read_text(encoding="utf-8"))[1]
+    assert store.query(deterministic_embedding(edited["text"]), k=1)[0]["metadata"]["id"] == docs[1]["id"]
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from vector_db.embeddings_store.metadata_store import SQLiteMetadataStore
+
+
+def _store():
+    store = SQLiteMetadataStore()
+    store.add(range(4), [
+        {"id": "FM-01", "source": "spec.doc", "doc_type": "spec", "tags": ["vibration", "turbine"]},
+        {"id": "FM-02", "source": "spec.doc", "doc_type": "spec", "page": 2},
+        {"id": "M-1", "source": "manual.pdf", "doc_type": "manual", "page": "2"},
+        None,
+    ])
+    return store
+
+
+def test_get_and_len():
+    store = _store()
+    assert len(store) == 4
+    assert store[3] == {}
+    assert store.get([2, 0, 99]) == {0: store[0], 2: store[2]}
+    with pytest.raises(KeyError):
+        store[99]
+
+
+def test_ids_matching_filters():
+    store = _store()
+    assert store.ids_matching({"source": "spec.doc"}).tolist() == [0, 1]
+    assert store.ids_matching({"doc_type": ["spec", "manual"], "source": "manual.pdf"}).tolist() == [2]
+    assert store.ids_matching({"tags": "turbine"}).tolist() == [0]
+    # values keep their JSON type: 2 and "2" are different
+    assert store.ids_matching({"page": 2}).tolist() == [1]
+    assert store.ids_matching({"page": "2"}).tolist() == [2]
+    assert store.ids_matching({"source": "missing"}).tolist() == []
+    with pytest.raises(ValueError):
+        store.ids_matching({})
+
+
+def test_numbers_match_across_int_float_and_numpy():
+    store = SQLiteMetadataStore()
+    store.add(range(4), [{"torque": 2.0}, {"torque": np.int64(2)}, {"torque": np.float32(2.5)},
+                         {"torque": [np.float64(3.0), 4]}])
+    assert store.ids_matching({"torque": 2}).tolist() == [0, 1]
+    assert store.ids_matching({"torque": np.float64(2.0)}).tolist() == [0, 1]
+    assert store.ids_matching({"torque": 2.5}).tolist() == [2]
+    assert store.ids_matching({"torque": [3, np.int32(4)]}).tolist() == [3]
+    assert store.ids_matching({"torque": True}).tolist() == []
+    # sidecars written before the normalization stored whole floats as "2.0"
+    store._conn.execute("INSERT INTO meta_fields VALUES ('torque', '2.0', 9)")
+    assert store.ids_matching({"torque": 2}).tolist() == [0, 1, 9]
+
+
+def test_replace_delete_and_file_round_trip(tmp_path):
+    store = _store()
+    store.add([1], [{"id": "FM-02", "source": "other.doc"}])
+    assert store.ids_matching({"source": "spec.doc"}).tolist() == [0]
+    store.delete([0])
+    assert store.ids_matching({"source": "spec.doc"}).tolist() == []
+
+    path = tmp_path / "meta.sqlite"
+    store.save(path)
+    ro = SQLiteMetadataStore(path, read_only=True)
+    assert len(ro) == 3 and ro[1]["source"] == "other.doc"
+    copy = SQLiteMetadataStore.from_file(path)
+    copy.add([10], [{"id": "new"}])
+    assert len(copy) == 4 and len(SQLiteMetadataStore(path, read_only=True)) == 3
+
+
+def test_search_text_bm25_filters_and_legacy_sidecar(tmp_path):
+    import sqlite3
+
+    store = SQLiteMetadataStore()
+    store.add(range(3), [
+        {"id": "FM-04", "title": "Compressor stall", "text": "sensor_4 above 45 psi", "source": "spec.doc"},
+        {"id": "FM-40", "title": "Bearing wear", "text": "sensor_4 drift", "source": "manual.pdf"},
+        {"id": "M-1", "text": "torque 45 Nm", "source": "manual.pdf"},
+    ])
+    # codes are single tokens: FM-04 never matches FM-40
+    assert [row for row, _ in store.search_text("FM-04")] == [0]
+    hits = store.search_text("sensor_4 45")
+    # row 0 has both terms; scores are positive and descending
+    assert hits[0][0] == 0 and {row for row, _ in hits} == {0, 1, 2}
+    assert hits[0][1] > hits[1][1] >= hits[2][1] > 0
+    assert [row for row, _ in store.search_text("sensor_4", filters={"source": "manual.pdf"})] == [1]
+    assert store.search_text("!!") == [] and store.search_text("FM-04", k=0) == []
+
+    store.add([0], [{"id": "FM-04", "text": "replaced"}])
+    store.delete([1])
+    assert store.search_text("sensor_4") == []
+
+    # a sidecar written before the keyword index existed is indexed on load
+    path = tmp_path / "meta.sqlite"
+    store.save(path)
+    with sqlite3.connect(path) as conn:
+        conn.execute("DROP TABLE lexical")
+    assert SQLiteMetadataStore(path, read_only=True).search_text("torque") == []
+    assert [row for row, _ in SQLiteMetadataStore.from_file(path).search_text("torque")] == [2]
@@ -0,0 +1,74 @@
+import gzip
+import math
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from data_pipeline.Load_Engn_Data import ingest_csv
+from data_pipeline.ndjson_export import NDJSONExportWriter, export_path, iter_ndjson, read_export
+
+ROOT = Path(__file__).resolve().parents[1]
+CSV = ROOT / "data_sources" / "synthetic_engine_data.csv"
+
+try:
+    import zstandard
+except Exception:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSIONS = [None, "gzip",
+                pytest.param("zstd", marks=pytest.mark.skipif(zstandard is None, reason="zstandard not installed"))]
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_batches_are_appended_and_read_back_lazily(tmp_path, compression):
+    writer = NDJSONExportWriter(tmp_path, compression=compression)
+    writer.write_batch("readings", [{"unit_id": "u", "seq": 0, "sensor_1": 1.5}])
+    writer.write_batch("readings", [{"unit_id": "u", "seq": 1, "sensor_1": float("nan")}])
+    writer.write_batch("windows", [{"window_id": "u__0__2", "features": {"failure_count": 0}}])
+    writer.close()
+
+    assert writer.counts == {"engines": 0, "readings": 2, "failures": 0, "windows": 1}
+    rows = read_export(tmp_path, "readings")
+    assert next(rows) == {"unit_id": "u", "seq": 0, "sensor_1": 1.5}
+    assert math.isnan(next(rows)["sensor_1"])
+    assert list(read_export(tmp_path, "windows"))[0]["features"] == {"failure_count": 0}
+    assert list(read_export(tmp_path, "engines")) == []
+
+    # append continues the same files instead of truncating them
+    more = NDJSONExportWriter(tmp_path, compression=compression, append=True)
+    more.write_batch("readings", [{"unit_id": "u", "seq": 2}])
+    more.close()
+    assert [r["seq"] for r in read_export(tmp_path, "readings")] == [0, 1, 2]
+
+
+def test_gzip_files_are_standard(tmp_path):
+    writer = NDJSONExportWriter(tmp_path, compression="gzip")
+    writer.write_batch("engines", [{"id": "unit_1"}, {"id": "unit_2"}])
+    writer.close()
+    path = export_path(tmp_path, "engines")
+    assert path.name == "engines.ndjson.gz"
+    assert gzip.open(path, "rt").read() == '{"id":"unit_1"}\n{"id":"unit_2"}\n'
+    with pytest.raises(ValueError):
+        NDJSONExportWriter(tmp_path, compression="bz2")
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_ingest_csv_exports_every_batch(tmp_path, stream):
+    df = pd.read_csv(CSV, parse_dates=["time"]).groupby("unit_id", sort=False).head(300)
+    src = tmp_path / "small.csv"
+    df.to_csv(src, index=False)
+    out = tmp_path / "export"
+    ingest_csv(str(src), None, None, None, batch_size=100, make_windows=True, window_size=50,
+               stride=50, dry_run=True, stream=stream, chunk_size=400, use_cache=False,
+               export_dir=out, export_compression="gzip")
+
+    assert sorted(p.name for p in out.iterdir()) == [f"{k}.ndjson.gz" for k in
+                                                     ("engines", "failures", "readings", "windows")]
+    readings = list(iter_ndjson(export_path(out, "readings")))
+    assert len(readings) == len(df)
+    assert len({r["reading_id"] for r in readings}) == len(df)
+    windows = list(read_export(out, "windows"))
+    # every window batch is kept, not just the last one
+    assert len(windows) == 6 * df["unit_id"].nunique()
+    assert {e["id"] for e in read_export(out, "engines")} == set(df["unit_id"])
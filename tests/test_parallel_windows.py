@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from data_pipeline.Load_Engn_Data import make_windows_for_unit
+from data_pipeline.parallel_windows import iter_unit_windows, unit_slices
+
+ROOT = Path(__file__).resolve().parents[1]
+CSV = ROOT / "data_sources" / "synthetic_engine_data.csv"
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    df = pd.read_csv(CSV, parse_dates=["time"]).groupby("unit_id", sort=False).head(300)
+    return df.sort_values(["unit_id", "time"]).reset_index(drop=True)
+
+
+def _expected(df, start_rows=None):
+    out = []
+    for unit in df["unit_id"].unique().tolist():
+        df_unit = df[df["unit_id"] == unit].reset_index(drop=True)
+        out.append((unit, make_windows_for_unit(df_unit, unit, window_size=40, stride=20,
+                                                start_row=(start_rows or {}).get(unit, 0))))
+    return out
+
+
+def test_unit_slices_are_contiguous_ranges(fleet):
+    slices = unit_slices(fleet)
+    assert [u for u, _, _ in slices] == sorted(fleet["unit_id"].unique())
+    assert slices[0][1] == 0 and slices[-1][2] == len(fleet)
+    assert all(hi - lo == 300 for _, lo, hi in slices)
+    assert unit_slices(fleet.iloc[:0]) == []
+
+
+def test_serial_matches_per_unit_windows(fleet):
+    start_rows = {"unit_2": 100}
+    assert list(iter_unit_windows(fleet, window_size=40, stride=20, start_rows=start_rows)) == \
+        _expected(fleet, start_rows)
+    with pytest.raises(ValueError):
+        list(iter_unit_windows(fleet, window_size=40, stride=20, start_rows={"unit_1": 5}))
+
+
+def test_process_pool_streams_same_windows_in_order(fleet):
+    got = list(iter_unit_windows(fleet, window_size=40, stride=20, workers=2))
+    assert got == _expected(fleet)
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from data_pipeline.csv_stream import SENSOR_COLS, reading_rows
+from data_pipeline.reading_buckets import bucket_start, pack_buckets, unpack_buckets
+
+ROOT = Path(__file__).resolve().parents[1]
+CSV = ROOT / "data_sources" / "synthetic_engine_data.csv"
+
+
+def _rows(n=300):
+    df = pd.read_csv(CSV, parse_dates=["time"]).groupby("unit_id", sort=False).head(n).reset_index(drop=True)
+    return df, reading_rows(df, range(len(df)))
+
+
+def test_bucket_start_floors_to_boundary():
+    assert bucket_start("2025-01-01T10:59:59").isoformat() == "2025-01-01T10:00:00"
+    assert bucket_start("2025-01-01T10:15:00", 900).isoformat() == "2025-01-01T10:15:00"
+
+
+def test_pack_buckets_groups_by_unit_and_hour():
+    df, rows = _rows()
+    buckets = pack_buckets(rows)
+    expected = df.assign(b=df["time"].dt.floor("h")).groupby(["unit_id", "b"]).size()
+    assert len(buckets) == len(expected)
+    assert sum(len(b["ts"]) for b in buckets) == len(rows)
+    first = buckets[0]
+    assert first["bucket_id"] == "unit_1__2025-01-01T00:00:00"
+    assert first["end_ts"] == "2025-01-01T01:00:00"
+    assert all(len(first[c]) == len(first["ts"]) for c in SENSOR_COLS)
+
+
+def test_unpack_round_trip_and_range_trim():
+    df, rows = _rows()
+    unit_rows = [r for r in rows if r["unit_id"] == "unit_2"]
+    buckets = pack_buckets(unit_rows)
+    # feed buckets back in reverse to check sorting
+    out = unpack_buckets(reversed(buckets), start="2025-01-02T01:30:00", end="2025-01-02T03:00:00")
+    assert out["time"].is_monotonic_increasing
+    assert out["time"].iloc[0] == pd.Timestamp("2025-01-02T01:30:00")
+    assert out["time"].iloc[-1] == pd.Timestamp("2025-01-02T03:00:00")
+    assert len(out) == 91
+    src = df[df["unit_id"] == "unit_2"].set_index("time")
+    row = out.iloc[10]
+    assert row["sensor_3"] == pytest.approx(src.loc[row["time"], "sensor_3"])
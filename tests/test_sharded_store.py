@@ -0,0 +1,133 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+from mcp.tools.vector_search import VectorSearch  # noqa: E402
+from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore  # noqa: E402
+from vector_db.embeddings_store.sharded_store import ShardedEmbeddingsStore, hash_shard  # noqa: E402
+
+
+def _data(n: int = 400, dim: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype("float32")
+    sites = ["north", "south", "east"]
+    metas = [{"id": f"doc-{i}", "site": sites[i % 3], "text": f"unit_{i % 7} reading"} for i in range(n)]
+    return vectors, metas
+
+
+def _ids(hits):
+    return [h["metadata"]["id"] for h in hits]
+
+
+def test_hash_shards_match_single_store():
+    vectors, metas = _data()
+    single = FAISSEmbeddingsStore(dim=16)
+    single.add_many(vectors, metas, copy=True)
+    sharded = ShardedEmbeddingsStore(dim=16, shards=4)
+    sharded.upsert([m["id"] for m in metas], vectors, metas)
+
+    assert len(sharded) == 400 and sorted(sharded.shard_names) == ["0", "1", "2", "3"]
+    assert all(50 < size < 150 for size in sharded.shard_sizes().values())
+    assert "doc-7" in sharded.shard(hash_shard("doc-7", 4)).doc_hashes("doc-7")
+
+    queries = np.random.default_rng(1).standard_normal((5, 16)).astype("float32")
+    for got, want in zip(sharded.query_batch(queries, k=[1, 5, 10, 0, 3]),
+                         single.query_batch(queries, k=[1, 5, 10, 0, 3])):
+        assert _ids(got) == _ids(want)
+        assert [h["score"] for h in got] == pytest.approx([h["score"] for h in want], abs=1e-5)
+    assert _ids(sharded.query(queries[0], k=8, filters={"site": "east"})) == \
+        _ids(single.query(queries[0], k=8, filters={"site": "east"}))
+    assert sharded.query(queries[0], k=5, filters={"site": "nowhere"}) == []
+
+    # rows without a document id are spread round-robin
+    rr = ShardedEmbeddingsStore(dim=16, shards=3)
+    rr.add_many(vectors[:9])
+    assert rr.shard_sizes() == {"0": 3, "1": 3, "2": 3}
+
+
+def test_upsert_delete_and_collection_shards():
+    vectors, metas = _data(n=30)
+    store = ShardedEmbeddingsStore(dim=16, shard_by="site")
+    ids = [m["id"] for m in metas]
+    assert store.upsert(ids, vectors, metas) == {"added": 30, "replaced": 0}
+    assert store.shard_sizes() == {"north": 10, "south": 10, "east": 10}
+
+    # a document whose site changes moves shards; one without a site goes to _default
+    moved = {**metas[0], "site": "south"}
+    assert store.upsert(["doc-0", "new"], vectors[:2], [moved, {"id": "new"}]) == {"added": 1, "replaced": 1}
+    assert store.shard_sizes() == {"north": 9, "south": 11, "east": 10, "_default": 1}
+    assert store.query(vectors[0], k=1, filters={"site": "south"})[0]["metadata"]["id"] == "doc-0"
+    # a filter on the shard field only visits the shards it names
+    assert set(_ids(store.query(vectors[0], k=40, filters={"site": ["north", "east"]}))) == \
+        {f"doc-{i}" for i in range(1, 30) if i % 3 != 1}
+
+    # numeric shard values route and filter the same whether written as int, float or NumPy scalar
+    by_gen = ShardedEmbeddingsStore(dim=16, shard_by="gen")
+    by_gen.upsert(["a", "b"], vectors[:2], [{"id": "a", "gen": 2.0}, {"id": "b", "gen": np.int64(3)}])
+    assert by_gen.shard_names == ["2", "3"]
+    assert _ids(by_gen.query(vectors[0], k=5, filters={"gen": 2})) == ["a"]
+
+    assert store.delete(["doc-0", "doc-1", "missing"]) == 2
+    assert len(store) == 29 and "doc-0" not in store.doc_hashes()
+    with pytest.raises(ValueError):
+        store.add([0.0] * 16, {"site": ["north", "south"]})
+
+    hashed = ShardedEmbeddingsStore(dim=16, shards=2)
+    hashed.upsert(ids, vectors, metas, content_hashes=["h"] * 30)
+    assert hashed.upsert(["doc-3"], vectors[:1], [metas[3]]) == {"added": 0, "replaced": 1}
+    assert hashed.delete(["doc-3", "doc-4"]) == 2 and len(hashed) == 28
+
+
+def test_save_load_partial_and_vector_search(tmp_path: Path):
+    vectors, metas = _data(n=60)
+    store = ShardedEmbeddingsStore(dim=16, shard_by="site")
+    store.upsert([m["id"] for m in metas], vectors, metas)
+    base = tmp_path / "sharded"
+    store.save(base)
+    files = sorted(p.name for p in base.with_suffix(".shards").iterdir())
+    assert base.with_suffix(".shards.json").exists() and len(files) == 9
+
+    # only changed shards are rewritten
+    index_files = {p: p.stat().st_mtime_ns for p in base.with_suffix(".shards").glob("*.index")}
+    store.upsert(["doc-0"], vectors[:1], [metas[0]])
+    store.save(base)
+    rewritten = [p for p, mtime in index_files.items() if p.stat().st_mtime_ns != mtime]
+    assert len(rewritten) == 1
+
+    # shards load on their own; writes to a shard that is saved but not loaded fail
+    part = ShardedEmbeddingsStore.load(base, shards=["east"])
+    assert part.shard_names == ["east"] and len(part) == 20
+    assert {h["metadata"]["site"] for h in part.query(vectors[0], k=5)} == {"east"}
+    with pytest.raises(RuntimeError):
+        part.upsert(["doc-0"], vectors[:1], [metas[0]])
+    part.load_shard("north")
+    # doc-0 may have moved here from a shard that is still not loaded: no duplicates
+    with pytest.raises(RuntimeError):
+        part.upsert(["doc-3"], vectors[:1], [{**metas[3], "site": "east"}])
+    with pytest.raises(RuntimeError):
+        part.delete(["doc-3"])
+    part.load_shard("south")
+    assert part.upsert(["doc-3"], vectors[:1], [{**metas[3], "site": "east"}]) == {"added": 0, "replaced": 1}
+    assert part.shard_sizes() == {"east": 21, "north": 19, "south": 20}
+    assert part.delete(["doc-3"]) == 1
+    with pytest.raises(KeyError):
+        ShardedEmbeddingsStore.load(base, shards=["west"])
+
+    # VectorSearch picks the sharded store from the manifest
+    vs = VectorSearch.from_path(base, mmap=True, lazy=True, cache_size=8)
+    full = FAISSEmbeddingsStore(dim=16)
+    full.add_many(vectors, metas, copy=True)
+    assert _ids(vs.search(vectors[5], k=6)) == _ids(full.query(vectors[5], k=6))
+    assert isinstance(vs.store, ShardedEmbeddingsStore) and vs.store.read_only
+    with pytest.raises(RuntimeError):
+        vs.store.add(vectors[0], {"site": "north"})
+    assert vs.search_batch(vectors[:2], k=3) == [vs.search(vectors[0], k=3), vs.search(vectors[1], k=3)]
+    assert vs.cache_info()["hits"] == 2
+
+    keyword = vs.keyword_search("unit_3", k=30)
+    assert len(keyword) == 9 and all(h["metadata"]["text"] == "unit_3 reading" for h in keyword)
+    fused = vs.hybrid_search("unit_3", k=5, query_vector=vectors[3])
+    assert fused[0]["metadata"]["id"] == "doc-3" and fused[0]["dense_score"] == pytest.approx(1.0, abs=1e-5)
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_pipeline.Load_Engn_Data import make_windows_for_unit
+from data_pipeline.stream_windows import StreamingWindowAggregator
+from mcp.tools.sensor_function_calls import read_sensor_batch
+
+ROOT = Path(__file__).resolve().parents[1]
+CSV = ROOT / "data_sources" / "synthetic_engine_data.csv"
+
+
+def _frame(rows=400):
+    return pd.read_csv(CSV, parse_dates=["time"]).groupby("unit_id", sort=False).head(rows).reset_index(drop=True)
+
+
+def _batch_windows(df, window_size, stride):
+    out = {}
+    for unit in df["unit_id"].unique().tolist():
+        df_unit = df[df["unit_id"] == unit].reset_index(drop=True)
+        for w in make_windows_for_unit(df_unit, unit, window_size=window_size, stride=stride):
+            out[w["window_id"]] = w
+    return out
+
+
+@pytest.mark.parametrize("window_size,stride", [(50, 10), (10, 25), (7, 3)])
+def test_interleaved_stream_matches_batch_windows(window_size, stride):
+    # the CSV interleaves units by time, like a live fleet feed
+    df = _frame()
+    df.loc[123, "sensor_2"] = np.nan
+    agg = StreamingWindowAggregator(window_size=window_size, stride=stride)
+    got = agg.extend(df.to_dict("records"))
+    expected = _batch_windows(df, window_size, stride)
+
+    assert sorted(w["window_id"] for w in got) == sorted(expected)
+    for w in got:
+        e = expected[w["window_id"]]
+        assert (w["unit_id"], w["start_ts"], w["end_ts"]) == (e["unit_id"], e["start_ts"], e["end_ts"])
+        assert list(w["features"]) == list(e["features"])
+        for key, val in e["features"].items():
+            if val != val:  # NaN
+                assert w["features"][key] != w["features"][key]
+            else:
+                assert w["features"][key] == pytest.approx(val, rel=1e-9, abs=1e-9)
+
+
+def test_windows_emitted_on_their_last_sample():
+    agg = StreamingWindowAggregator(window_size=4, stride=2, features_cols=["sensor_1"])
+    t0 = pd.Timestamp("2025-01-01")
+    emitted = [agg.update("u", [float(i)], t0 + pd.Timedelta(minutes=i), failure=int(i == 3))
+               for i in range(8)]
+    assert [w is not None for w in emitted] == [False, False, False, True, False, True, False, True]
+    assert [w["window_id"] for w in emitted if w] == ["u__0__4", "u__2__6", "u__4__8"]
+    first = emitted[3]
+    assert first["features"]["sensor_1_mean"] == 1.5
+    assert (first["features"]["sensor_1_min"], first["features"]["sensor_1_max"]) == (0.0, 3.0)
+    assert first["features"]["failure_count"] == 1
+    assert emitted[7]["features"]["failure_count"] == 0
+    assert emitted[7]["end_ts"] == (t0 + pd.Timedelta(minutes=7)).isoformat()
+
+
+def test_memory_is_fixed_per_engine():
+    agg = StreamingWindowAggregator(window_size=20, stride=5)
+    rng = np.random.default_rng(0)
+    for i in range(200):
+        for unit in range(50):
+            agg.update(f"unit_{unit}", rng.normal(size=6), pd.Timestamp("2025-01-01") + pd.Timedelta(seconds=i))
+    assert agg.n_engines == 50 and agg.samples_seen("unit_7") == 200
+    ring = agg._engines["unit_7"]
+    assert ring.values.shape == (20, 6)
+    assert all(len(d) <= 20 for d in ring.mins + ring.maxs)
+
+
+def test_read_sensor_batch_feeds_aggregator():
+    df = _frame(rows=30)
+    records = df.to_dict("records")
+    assert read_sensor_batch(lambda: records) == records
+    windows = read_sensor_batch(records, aggregator=StreamingWindowAggregator(window_size=10, stride=10))
+    assert len(windows) == 3 * df["unit_id"].nunique()
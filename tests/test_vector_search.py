@@ -50,3 +50,155 @@ def test_search_without_store_raises():
 def test_wrong_store_type_raises():
     with pytest.raises(TypeError):
         VectorSearch(store="not-a-store")
+
+
+def test_search_batch_matches_single_searches():
+    store = _make_store()
+    vs = VectorSearch(store=store)
+    queries = [[1, 0, 0], [0, 0.2, 1], [0.6, 0.4, 0]]
+
+    batched = vs.search_batch(queries, k=2)
+    assert batched == [vs.search(q, k=2) for q in queries]
+    assert [r[0]["metadata"]["id"] for r in batched] == ["v1", "v3", "v1"]
+
+
+def test_search_batch_per_query_k():
+    store = _make_store()
+    vs = VectorSearch(store=store)
+    results = vs.search_batch([[1, 0, 0], [0, 1, 0], [0, 0, 1]], k=[1, 3, 0])
+    assert [len(r) for r in results] == [1, 3, 0]
+    assert results[1][0]["metadata"]["id"] == "v2"
+    assert vs.search_batch([], k=3) == []
+    with pytest.raises(ValueError):
+        vs.search_batch([[1, 0, 0]], k=[1, 2])
+
+
+@pytest.mark.parametrize("index_type,params", [("flat", {}), ("hnsw", {"m": 8}), ("ivf_flat", {"nlist": 4})])
+def test_mmap_load_is_read_only_and_equivalent(tmp_path: Path, index_type, params):
+    import numpy as np
+
+    vecs = np.random.default_rng(0).normal(size=(200, 8)).astype("float32")
+    store = FAISSEmbeddingsStore(dim=8, index_type=index_type, nprobe=4, **params)
+    store.add_many(vecs.copy(), [{"id": i} for i in range(200)])
+    base = tmp_path / "store"
+    store.save(base)
+
+    mapped = FAISSEmbeddingsStore.load(base, mmap=True)
+    assert mapped.read_only
+    assert mapped.query_batch(vecs[:5], k=3) == store.query_batch(vecs[:5], k=3)
+    with pytest.raises(RuntimeError):
+        mapped.add([1.0] * 8, {"id": "new"})
+
+
+def test_lazy_load_defers_until_first_search(tmp_path: Path):
+    base = tmp_path / "embeddings"
+    _make_store().save(base)
+
+    vs = VectorSearch.from_path(base, mmap=True, lazy=True)
+    assert not vs.is_loaded and vs.load_seconds is None
+    assert vs.search([0, 0, 1], k=1)[0]["metadata"]["id"] == "v3"
+    assert vs.is_loaded and vs.load_seconds is not None
+
+    missing = VectorSearch.from_path(tmp_path / "missing", lazy=True)
+    with pytest.raises(Exception):
+        missing.search([1, 0, 0])
+
+
+def test_numpy_store_through_vector_search(tmp_path: Path):
+    from vector_db.embeddings_store.store import EmbeddingsStore
+
+    store = EmbeddingsStore(dim=3)
+    store.add_many([[1, 0, 0], [0, 1, 0], [0, 0, 1]], [{"id": "v1"}, {"id": "v2"}, {"id": "v3"}])
+    assert VectorSearch(store=store).search([0, 1, 0], k=1)[0]["metadata"]["id"] == "v2"
+
+    base = tmp_path / "memory_store"
+    store.save(base)
+    vs = VectorSearch.from_path(base, mmap=True, lazy=True)
+    assert vs.search_batch([[0, 0, 1], [1, 0, 0]], k=1)[1][0]["metadata"]["id"] == "v1"
+    assert isinstance(vs.store, EmbeddingsStore)
+
+
+def test_result_cache_hits_and_invalidation(tmp_path: Path):
+    store = _make_store()
+    vs = VectorSearch(store=store, cache_size=2)
+    first = vs.search([1, 0, 0], k=2)
+    # a scaled copy of the same query normalizes to the same key
+    assert vs.search([2, 0, 0], k=2) == first
+    assert vs.cache_info() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+    # results are copies: mutating one does not leak into the cache
+    first[0]["metadata"]["id"] = "changed"
+    assert vs.search([1, 0, 0], k=2)[0]["metadata"]["id"] == "v1"
+
+    # k and filters are part of the key; the LRU keeps the 2 most recent queries
+    assert len(vs.search([1, 0, 0], k=1)) == 1
+    assert vs.search([1, 0, 0], k=2, filters={"id": "v3"})[0]["metadata"]["id"] == "v3"
+    assert vs.cache_info()["size"] == 2
+
+    # adding to the store invalidates every cached result
+    store.add([0.9, 0.1, 0], {"id": "v4"})
+    assert [r["metadata"]["id"] for r in vs.search([1, 0.2, 0], k=1)] == ["v4"]
+    assert [r["metadata"]["id"] for r in vs.search([1, 0, 0], k=2)] == ["v1", "v4"]
+    assert vs.cache_info()["size"] == 2
+
+    # batches mix hits and misses and are searched once for the misses
+    hits_before = vs.cache_hits
+    batch = vs.search_batch([[1, 0, 0], [0, 1, 0]], k=[2, 1])
+    assert vs.cache_hits == hits_before + 1
+    assert batch == [vs.search([1, 0, 0], k=2), [r for r in store.query([0, 1, 0], k=1)]]
+
+    # loading a store starts with an empty cache
+    base = tmp_path / "cached"
+    store.save(base)
+    vs.load_from_path(base)
+    assert vs.cache_info()["size"] == 0
+
+
+def _docs_store(store_cls, **kwargs):
+    store = store_cls(dim=3, **kwargs)
+    store.add_many([[1, 0, 0], [0, 1, 0], [0, 0, 1], [0.7, 0.7, 0]], [
+        {"id": "FM-04", "title": "Compressor stall", "text": "sensor_4 above 45 psi"},
+        {"id": "FM-05", "title": "Bearing wear", "text": "vibration on sensor_9"},
+        {"id": "FM-40", "title": "Seal leak", "text": "oil pressure drop"},
+        {"id": "M-1", "title": "Torque table", "text": "bearing bolts torque 45 Nm"},
+    ])
+    return store
+
+
+@pytest.mark.parametrize("store_kind", ["faiss", "numpy"])
+def test_keyword_and_hybrid_search(tmp_path: Path, store_kind):
+    from vector_db.embeddings_store.store import EmbeddingsStore
+
+    store = _docs_store(FAISSEmbeddingsStore if store_kind == "faiss" else EmbeddingsStore)
+    vs = VectorSearch(store=store)
+    assert [r["metadata"]["id"] for r in vs.keyword_search("FM-04")] == ["FM-04"]
+
+    calls = []
+
+    def embed(text):
+        calls.append(text)
+        return [0, 1, 0]
+
+    # pure code queries never reach the embedding function
+    fast = vs.hybrid_search("FM-40", k=2, embed_fn=embed)
+    assert [r["metadata"]["id"] for r in fast] == ["FM-40"] and fast[0]["dense_score"] is None
+    assert calls == []
+
+    # prose queries are embedded and both rankings fused: "bearing" matches
+    # FM-05 and M-1 lexically, and the vector points at FM-05
+    fused = vs.hybrid_search("bearing", k=4, embed_fn=embed)
+    assert calls == ["bearing"]
+    assert fused[0]["metadata"]["id"] == "FM-05"
+    assert fused[0]["dense_score"] == pytest.approx(1.0) and fused[0]["lexical_score"] > 0
+    assert all(a["score"] >= b["score"] for a, b in zip(fused, fused[1:]))
+    # a code with no lexical hit falls back to the dense search
+    assert vs.hybrid_search("FM-99", k=1, embed_fn=embed)[0]["metadata"]["id"] == "FM-05"
+    assert vs.hybrid_search("bearing", k=2, query_vector=[0, 0, 1],
+                            filters={"id": ["FM-40", "M-1"]})[0]["metadata"]["id"] in {"FM-40", "M-1"}
+
+    # the inverted index is saved with the store and follows upserts and deletes
+    store.upsert(["a"], [[0, 0, 1]], [{"id": "FM-77", "text": "igniter fault"}])
+    base = tmp_path / "hybrid"
+    store.save(base)
+    loaded = VectorSearch.from_path(base, mmap=True)
+    assert [r["metadata"]["id"] for r in loaded.keyword_search("igniter")] == ["FM-77"]
+    assert loaded.hybrid_search("FM-04 sensor_4")[0]["metadata"]["id"] == "FM-04"
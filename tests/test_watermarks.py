@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from data_pipeline.csv_stream import iter_csv_batches
+from data_pipeline.Load_Engn_Data import make_windows_for_unit
+from data_pipeline.watermarks import Watermarks
+from data_pipeline.windowing import first_window_start
+
+ROOT = Path(__file__).resolve().parents[1]
+CSV = ROOT / "data_sources" / "synthetic_engine_data.csv"
+
+
+@pytest.fixture
+def small_csv(tmp_path):
+    df = pd.read_csv(CSV, parse_dates=["time"]).groupby("unit_id", sort=False).head(400).reset_index(drop=True)
+    path = tmp_path / "small.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+
+def _collect(path, **kwargs):
+    out = {"engines": [], "readings": [], "failures": [], "windows": []}
+    for kind, rows in iter_csv_batches(path, **kwargs):
+        out[kind].extend(rows)
+    return out
+
+
+def test_first_window_start():
+    assert first_window_start(0, 10, 5) == 0
+    assert first_window_start(9, 10, 5) == 0
+    assert first_window_start(10, 10, 5) == 5
+    assert first_window_start(23, 10, 5) == 15
+
+
+@pytest.mark.parametrize("chunk_size", [64, 10_000])
+def test_stream_resumes_after_watermarks(small_csv, chunk_size):
+    path, df = small_csv
+    full = _collect(path, chunk_size=chunk_size, make_windows=True, window_size=30, stride=10)
+
+    # pretend an earlier run committed unit_1 up to row 149 and its windows up to row 120
+    u1 = df[df["unit_id"] == "unit_1"].reset_index(drop=True)
+    marks = Watermarks(readings={"unit_1": u1["time"][149].isoformat()},
+                       windows={"unit_1": u1["time"][120].isoformat()})
+    resumed = _collect(path, chunk_size=chunk_size, make_windows=True, window_size=30, stride=10,
+                       watermarks=marks)
+
+    r1 = [r for r in resumed["readings"] if r["unit_id"] == "unit_1"]
+    assert len(r1) == len(u1) - 150
+    assert r1[0]["ts"] == u1["time"][150].isoformat()
+    # other engines are untouched
+    assert len(resumed["readings"]) == len(full["readings"]) - 150
+
+    cutoff = u1["time"][120].isoformat()
+    expected = [w["window_id"] for w in full["windows"]
+                if w["unit_id"] != "unit_1" or w["end_ts"] > cutoff]
+    assert [w["window_id"] for w in resumed["windows"]] == expected
+    # failures have deterministic ids, so re-sending them is idempotent
+    assert [f["event_id"] for f in resumed["failures"]] == [f["event_id"] for f in full["failures"]]
+
+
+def test_in_memory_windows_start_row_skips_committed_windows(small_csv):
+    _, df = small_csv
+    u1 = df[df["unit_id"] == "unit_1"].reset_index(drop=True)
+    full = make_windows_for_unit(u1, "unit_1", window_size=30, stride=10)
+    cutoff = u1["time"][120]
+    n_done = int((u1["time"] <= cutoff).sum())
+    part = make_windows_for_unit(u1, "unit_1", window_size=30, stride=10,
+                                 start_row=first_window_start(n_done, 30, 10))
+    expected = [w for w in full if w["end_ts"] > cutoff.isoformat()]
+    assert [w["window_id"] for w in part] == [w["window_id"] for w in expected]
+    assert part[0]["features"] == pytest.approx(expected[0]["features"])
+
+
+def test_watermarks_from_records_and_mask(small_csv):
+    _, df = small_csv
+    marks = Watermarks.from_records([
+        {"id": "unit_2", "readings": "2025-01-02T00:09:00", "windows": None},
+        {"id": "unit_3", "readings": None, "windows": None},
+    ])
+    assert marks.window_cutoff("unit_2") is None
+    mask = marks.new_rows_mask(df)
+    assert int((~mask).sum()) == 10
+    assert not Watermarks()
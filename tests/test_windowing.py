@@ -0,0 +1,110 @@
+import json
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from data_pipeline.Load_Engn_Data import make_windows_for_unit
+from data_pipeline.windowing import compute_window_stats, window_starts
+
+
+def _reference_windows(df_unit, unit_id, window_size=200, stride=50, features_cols=None):
+    """The original per-window loop, kept as the parity oracle."""
+    if features_cols is None:
+        features_cols = [c for c in df_unit.columns if c.startswith("sensor_")]
+    windows = []
+    n = len(df_unit)
+    for start in range(0, n - window_size + 1, stride):
+        end = start + window_size
+        win = df_unit.iloc[start:end]
+        feats = {}
+        for c in features_cols:
+            arr = win[c].values.astype(float)
+            feats[f"{c}_mean"] = float(arr.mean()) if arr.size else None
+            feats[f"{c}_std"] = float(arr.std(ddof=0)) if arr.size else None
+            feats[f"{c}_min"] = float(arr.min()) if arr.size else None
+            feats[f"{c}_max"] = float(arr.max()) if arr.size else None
+        feats["failure_count"] = int(win["failure"].sum()) if "failure" in win.columns else 0
+        windows.append({
+            "unit_id": unit_id,
+            "window_id": f"{unit_id}__{start}__{end}",
+            "start_ts": win["time"].iloc[0].isoformat(),
+            "end_ts": win["time"].iloc[-1].isoformat(),
+            "features": json.dumps(feats),
+        })
+    return windows
+
+
+def _unit_frame(unit="unit_1"):
+    root = Path(__file__).resolve().parents[1]
+    df = pd.read_csv(root / "data_sources" / "synthetic_engine_data.csv", parse_dates=["time"])
+    return df[df["unit_id"] == unit].reset_index(drop=True)
+
+
+def _assert_same_windows(got, expected):
+    assert [w["window_id"] for w in got] == [w["window_id"] for w in expected]
+    for g, e in zip(got, expected):
+        assert g["unit_id"] == e["unit_id"]
+        assert g["start_ts"] == e["start_ts"]
+        assert g["end_ts"] == e["end_ts"]
+        gf, ef = g["features"], json.loads(e["features"])
+        assert list(gf) == list(ef)
+        assert gf["failure_count"] == ef["failure_count"]
+        for key, val in ef.items():
+            if val != val:  # NaN
+                assert gf[key] != gf[key]
+            else:
+                assert gf[key] == pytest.approx(val, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("window_size,stride", [(200, 50), (10, 5), (7, 3), (50, 1)])
+def test_make_windows_matches_reference_loop(window_size, stride):
+    df_unit = _unit_frame()
+    got = make_windows_for_unit(df_unit, "unit_1", window_size=window_size, stride=stride)
+    expected = _reference_windows(df_unit, "unit_1", window_size=window_size, stride=stride)
+    assert got
+    _assert_same_windows(got, expected)
+
+
+def test_nan_only_affects_its_own_windows():
+    df_unit = _unit_frame().iloc[:120].copy()
+    df_unit.loc[30, "sensor_2"] = np.nan
+    got = make_windows_for_unit(df_unit, "unit_1", window_size=20, stride=10)
+    expected = _reference_windows(df_unit, "unit_1", window_size=20, stride=10)
+    _assert_same_windows(got, expected)
+    # windows after the NaN row must still have finite statistics
+    assert got[-1]["features"]["sensor_2_mean"] == pytest.approx(
+        json.loads(expected[-1]["features"])["sensor_2_mean"])
+
+
+def test_short_unit_yields_no_windows():
+    df_unit = _unit_frame().iloc[:5]
+    assert make_windows_for_unit(df_unit, "unit_1", window_size=10, stride=5) == []
+    assert window_starts(5, 10, 5).size == 0
+
+
+def test_constant_column_has_zero_std():
+    values = np.full((40, 2), 3.25)
+    _, stats = compute_window_stats(values, window_size=10, stride=10)
+    assert np.all(stats[:, :, 1] == 0.0)
+    assert np.all(stats[:, :, 0] == 3.25)
+
+
+def test_stride_one_does_not_copy_the_windows():
+    values = np.random.default_rng(0).standard_normal((20_000, 6))
+    values[5, 2] = np.nan  # one column on the strided mean/std path
+    tracemalloc.start()
+    try:
+        starts, stats = compute_window_stats(values, window_size=200, stride=1)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # copying the windows out would take len(starts) * 6 * 200 * 8 bytes (~190 MB)
+    assert peak < 64 * 2**20
+    ref = sliding_window_view(values, 200, axis=0)[starts]
+    np.testing.assert_allclose(stats[:, :, 2], ref.min(axis=-1))
+    np.testing.assert_allclose(stats[:, 2, 1], ref[:, 2].std(axis=-1), equal_nan=True)
+    np.testing.assert_allclose(stats[:, 0, 1], ref[:, 0].std(axis=-1))
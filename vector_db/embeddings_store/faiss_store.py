@@ -1,12 +1,16 @@
 """FAISS-backed embeddings store.
 
-Provides a minimal FAISS index wrapper with metadata persistence.
+Provides a minimal FAISS index wrapper with metadata persistence. The index
+type (``INDEX_TYPES``: exact, IVF, HNSW or quantized) is chosen per store,
+and metadata lives in a SQLite sidecar keyed by stable row id (see
+``metadata_store``).
 """
 from __future__ import annotations
 
 import json
+import math
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 try:
     import faiss
@@ -15,62 +19,503 @@ except Exception:  # pragma: no cover - optional dependency
 
 import numpy as np
 
+from vector_db.embeddings_store.lexical import DEFAULT_RRF_K, fuse_hits
+from vector_db.embeddings_store.metadata_store import Filters, SQLiteMetadataStore, load_metadata
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "sq8", "pq")
+# index types whose vectors cannot be removed: their stores can only be appended to
+APPEND_ONLY_INDEX_TYPES = ("hnsw",)
+DEFAULT_INDEX_PARAMS: Dict[str, Dict[str, int]] = {
+    "flat": {},
+    "ivf_flat": {"nlist": 1024},
+    "ivf_pq": {"nlist": 1024, "m": 16, "nbits": 8},
+    "hnsw": {"m": 32, "ef_construction": 200},
+    "sq8": {},
+    "pq": {"m": 16, "nbits": 8},
+}
+DEFAULT_NPROBE = 16
+DEFAULT_EF_SEARCH = 64
+
+
+def mmap_flags(index_type: str) -> int:
+    """``faiss.read_index`` flags that memory-map an index of this type read-only.
+
+    IVF inverted lists are mapped with ``IO_FLAG_MMAP``. Flat and HNSW vector
+    storage needs ``IO_FLAG_MMAP_IFC`` (faiss >= 1.9); the two cannot be combined.
+    """
+    if faiss is None:
+        raise RuntimeError("faiss is not installed. Install 'faiss-cpu' to enable this store.")
+    if index_type.startswith("ivf"):
+        flag = faiss.IO_FLAG_MMAP
+    else:
+        flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+    return flag | faiss.IO_FLAG_READ_ONLY
+
+
+def build_index(dim: int, index_type: str = "flat", **params):
+    """Create an empty inner-product FAISS index of ``index_type`` (see ``DEFAULT_INDEX_PARAMS``).
+
+    - ``flat``: exact inner-product scan (``IndexFlatIP``), the default.
+    - ``ivf_flat``: inverted lists over ``nlist`` k-means cells, full vectors.
+    - ``ivf_pq``: inverted lists with product-quantized codes (``m``
+      sub-vectors of ``nbits`` bits), for corpora that do not fit in RAM.
+    - ``hnsw``: HNSW graph with ``m`` links per node.
+    - ``sq8``: exhaustive scan over 8-bit scalar-quantized codes (4x smaller
+      than float32).
+    - ``pq``: exhaustive scan over product-quantized codes.
+
+    IVF and quantized indexes must be trained before vectors are added.
+    """
+    if faiss is None:
+        raise RuntimeError("faiss is not installed. Install 'faiss-cpu' to enable this store.")
+    if index_type not in DEFAULT_INDEX_PARAMS:
+        raise ValueError(f"Unknown index type: {index_type!r} (expected one of {list(INDEX_TYPES)})")
+    unknown = set(params) - set(DEFAULT_INDEX_PARAMS[index_type])
+    if unknown:
+        raise ValueError(f"Unknown parameters for {index_type}: {sorted(unknown)}")
+    p = {**DEFAULT_INDEX_PARAMS[index_type], **params}
+    ip = faiss.METRIC_INNER_PRODUCT
+    if index_type == "flat":
+        return faiss.IndexFlatIP(dim)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, p["m"], ip)
+        index.hnsw.efConstruction = p["ef_construction"]
+        return index
+    if index_type == "sq8":
+        return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, ip)
+    if "m" in p and dim % p["m"]:
+        raise ValueError(f"{index_type} needs dim ({dim}) divisible by m ({p['m']})")
+    if index_type == "pq":
+        return faiss.IndexPQ(dim, p["m"], p["nbits"], ip)
+    quantizer = faiss.IndexFlatIP(dim)
+    if index_type == "ivf_flat":
+        index = faiss.IndexIVFFlat(quantizer, dim, p["nlist"], ip)
+    else:
+        index = faiss.IndexIVFPQ(quantizer, dim, p["nlist"], p["m"], p["nbits"], ip)
+    return index
+
+
+def _with_ids(index):
+    """Wrap a non-IVF index so vectors keep caller-chosen ids (IVF indexes store ids natively)."""
+    if isinstance(index, faiss.IndexIVF):
+        return index
+    return faiss.IndexIDMap2(index)
+
+
+def min_training_rows(index_type: str, **params) -> int:
+    """Fewest vectors FAISS accepts to train an index of this type (0 when no training)."""
+    p = {**DEFAULT_INDEX_PARAMS.get(index_type, {}), **params}
+    if index_type == "ivf_flat":
+        return p["nlist"]
+    if index_type == "ivf_pq":
+        return max(p["nlist"], 2 ** p["nbits"])
+    if index_type == "pq":
+        return 2 ** p["nbits"]
+    if index_type == "sq8":
+        return 1
+    return 0
+
 
 class FAISSEmbeddingsStore:
     """A simple FAISS-backed embeddings store.
 
-    Stores vectors in a FAISS IndexFlatIP index (cosine-sim via L2 norm
-    normalization) and keeps metadata in a parallel list which is saved
-    alongside the index as JSON.
+    Stores vectors in a FAISS inner-product index (cosine-sim via L2 norm
+    normalization) and keeps metadata in a SQLite sidecar keyed by row id,
+    saved alongside the index. ``index_type`` and its parameters select an
+    approximate or compressed index (see ``build_index``); ``nprobe``,
+    ``ef_search`` and ``rerank`` are the search-time settings, saved with
+    the index in ``.config.json``.
+
+    Compressed types lose some recall. ``keep_full=True`` also keeps the
+    normalized float32 vectors (``.full.npy``) so ``rerank`` can re-score
+    candidates exactly.
+
+    Row ids are stable: non-IVF indexes are wrapped in ``IndexIDMap2``, IVF
+    indexes take explicit ids, and ids of removed rows are never reused.
     """
 
-    def __init__(self, dim: int = 128):
+    def __init__(self, dim: int = 128, index_type: str = "flat", nprobe: int = DEFAULT_NPROBE,
+                 ef_search: int = DEFAULT_EF_SEARCH, keep_full: bool = False, rerank: int = 0,
+                 **index_params):
         if faiss is None:
             raise RuntimeError("faiss is not installed. Install 'faiss-cpu' to enable this store.")
         self.dim = dim
-        self.index = faiss.IndexFlatIP(self.dim)
-        self._metadatas: List[Dict[str, Any]] = []
+        self.index_type = index_type
+        self.index_params = {**DEFAULT_INDEX_PARAMS.get(index_type, {}), **index_params}
+        self.index = _with_ids(build_index(dim, index_type, **index_params))
+        # next row id to hand out; ids of removed rows are never reused
+        self.next_id = 0
+        # bumped by every change that can alter search results (see VectorSearch's cache)
+        self.version = 0
+        self.metadata = SQLiteMetadataStore()
+        self.read_only = False
+        self.keep_full = keep_full
+        self._full: List[np.ndarray] = []
+        self.set_search_params(nprobe=nprobe, ef_search=ef_search, rerank=rerank)
+
+    def __len__(self) -> int:
+        return int(self.index.ntotal)
+
+    @property
+    def is_trained(self) -> bool:
+        return bool(self.index.is_trained)
+
+    def _base_index(self):
+        """The index inside the ``IndexIDMap2`` wrapper (or the index itself)."""
+        if isinstance(self.index, faiss.IndexIDMap2):
+            return faiss.downcast_index(self.index.index)
+        return self.index
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                          rerank: Optional[int] = None) -> None:
+        """Set IVF ``nprobe``, HNSW ``ef_search`` and/or the ``rerank`` candidate factor.
+
+        Higher values mean better recall and slower queries. ``rerank`` > 1
+        needs a store created with ``keep_full=True``.
+        """
+        if nprobe is not None:
+            self.nprobe = int(nprobe)
+        if ef_search is not None:
+            self.ef_search = int(ef_search)
+        if rerank is not None:
+            if rerank > 1 and not self.keep_full:
+                raise ValueError("rerank needs the full-precision copy: create the store with keep_full=True")
+            self.rerank = int(rerank)
+        if self.index_type.startswith("ivf"):
+            faiss.extract_index_ivf(self.index).nprobe = self.nprobe
+        elif self.index_type == "hnsw":
+            self._base_index().hnsw.efSearch = self.ef_search
+        self.version += 1
+
+    def config(self) -> Dict[str, Any]:
+        return {"index_type": self.index_type, "dim": self.dim, "params": self.index_params,
+                "keep_full": self.keep_full, "next_id": self.next_id,
+                "search": {"nprobe": self.nprobe, "ef_search": self.ef_search, "rerank": self.rerank}}
+
+    @property
+    def full_vectors(self) -> Optional[np.ndarray]:
+        """The normalized float32 copy kept for re-ranking (``None`` without ``keep_full``)."""
+        if not self.keep_full:
+            return None
+        if len(self._full) != 1:
+            self._full = [np.concatenate(self._full) if self._full else np.empty((0, self.dim), dtype="float32")]
+        return self._full[0]
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Serialized index size, bytes per vector, and the size of the full-precision copy."""
+        n = self.index.ntotal
+        index_bytes = int(faiss.serialize_index(self.index).size)
+        full = self.full_vectors
+        return {"index_type": self.index_type, "vectors": n, "index_bytes": index_bytes,
+                "bytes_per_vector": round(index_bytes / n, 2) if n else None,
+                "full_copy_bytes": int(full.nbytes) if full is not None else 0}
+
+    def train(self, vectors) -> None:
+        """Train an IVF or quantized index on a representative sample (no-op for flat/HNSW)."""
+        if self.is_trained:
+            return
+        self._check_writable()
+        arr = self._as_rows(vectors, copy=True)
+        self._train_normalized(arr)
+
+    def _train_normalized(self, arr: np.ndarray) -> None:
+        needed = min_training_rows(self.index_type, **self.index_params)
+        if len(arr) < needed:
+            raise ValueError(f"{self.index_type} needs at least {needed} training vectors, got {len(arr)}")
+        faiss.normalize_L2(arr)
+        self.index.train(arr)
+
+    def _check_writable(self) -> None:
+        # faiss aborts the process (not a Python error) when a mapped index is resized
+        if self.read_only:
+            raise RuntimeError("This store was loaded with mmap=True and is read-only; load it without mmap to add vectors.")
+
+    def _as_rows(self, vectors, copy: bool = False) -> np.ndarray:
+        """``vectors`` as a C-contiguous (N, dim) float32 array, copied only if needed (or asked)."""
+        arr = np.array(vectors, dtype="float32", order="C", copy=True) if copy \
+            else np.ascontiguousarray(vectors, dtype="float32")
+        if arr.ndim == 1:
+            arr = arr.reshape(-1, self.dim) if arr.size == 0 else arr.reshape(1, -1)
+        if arr.ndim != 2 or arr.shape[1] != self.dim:
+            raise ValueError(f"Vector dimension {arr.shape[-1]} does not match store dim {self.dim}")
+        return arr
 
     def add(self, vector: List[float], metadata: Dict[str, Any] | None = None) -> None:
-        arr = np.asarray(vector, dtype="float32").reshape(1, -1)
-        if arr.shape[1] != self.dim:
-            raise ValueError(f"Vector dimension {arr.shape[1]} does not match store dim {self.dim}")
-        # Normalize for cosine-style similarity with inner-product index
-        norms = np.linalg.norm(arr, axis=1, keepdims=True)
-        norms[norms == 0] = 1.0
-        arr = arr / norms
-        self.index.add(arr)
-        self._metadatas.append(metadata or {})
-
-    def query(self, vector: List[float], k: int = 5) -> List[Dict[str, Any]]:
-        arr = np.asarray(vector, dtype="float32").reshape(1, -1)
-        norms = np.linalg.norm(arr, axis=1, keepdims=True)
-        norms[norms == 0] = 1.0
-        arr = arr / norms
-        distances, indices = self.index.search(arr, k)
-        results: List[Dict[str, Any]] = []
-        for score, idx in zip(distances[0].tolist(), indices[0].tolist()):
-            if idx < 0 or idx >= len(self._metadatas):
-                continue
-            results.append({"score": float(score), "metadata": self._metadatas[idx]})
+        self.add_many(self._as_rows(vector, copy=True), [metadata or {}])
+
+    def add_many(self, vectors, metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+                 copy: bool = False) -> int:
+        """Add an (N, dim) batch of vectors with one FAISS call; returns N.
+
+        A C-contiguous float32 array is L2-normalized in place (no copy), so
+        the caller's array holds unit vectors afterwards; pass ``copy=True`` to
+        keep it intact. Other inputs (lists, float64) are converted once.
+        ``metadatas`` must have one entry per row. An untrained IVF index is
+        trained on the first batch.
+        """
+        self._check_writable()
+        arr, metadatas = self._rows_and_metadata(vectors, metadatas, copy)
+        return len(self._append(arr, metadatas))
+
+    def _rows_and_metadata(self, vectors, metadatas, copy: bool) -> Tuple[np.ndarray, Sequence[Dict[str, Any]]]:
+        arr = self._as_rows(vectors, copy=copy)
+        if metadatas is None:
+            metadatas = [{} for _ in range(len(arr))]
+        elif len(metadatas) != len(arr):
+            raise ValueError(f"Got {len(metadatas)} metadata entries for {len(arr)} vectors")
+        return arr, metadatas
+
+    def _append(self, arr: np.ndarray, metadatas: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Normalize ``arr`` in place, add it under fresh row ids, and return the ids."""
+        if not len(arr):
+            return np.empty(0, dtype="int64")
+        # Normalize for cosine-style similarity with inner-product index; zero rows stay zero
+        faiss.normalize_L2(arr)
+        if not self.is_trained:
+            self._train_normalized(arr)
+        ids = np.arange(self.next_id, self.next_id + len(arr), dtype="int64")
+        if self._has_ids:
+            self.index.add_with_ids(arr, ids)
+        else:
+            # a store saved before stable ids: positional, and never removed from
+            self.index.add(arr)
+        self.next_id += len(arr)
+        self.version += 1
+        if self.keep_full:
+            # row ids are positions in the full copy, removed rows included
+            self._full.append(arr.copy())
+        self.metadata.add(ids.tolist(), metadatas)
+        return ids
+
+    @property
+    def _has_ids(self) -> bool:
+        return isinstance(self.index, faiss.IndexIDMap2) or self.index_type.startswith("ivf")
+
+    def upsert(self, doc_ids: Sequence[str], vectors, metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+               content_hashes: Optional[Sequence[Optional[str]]] = None, copy: bool = False) -> Dict[str, int]:
+        """Insert or replace documents by stable id; returns ``{"added": n, "replaced": n}``.
+
+        Each document's current vector (if any) is removed and the new one
+        added under a fresh row id. ``content_hashes`` are recorded for
+        ``doc_hashes``. The vectors are normalized in place as in ``add_many``.
+        Removed rows of a ``keep_full`` copy stay in the file until the store
+        is rebuilt. HNSW graphs cannot remove vectors, so HNSW stores can add
+        documents but not replace or delete them.
+        """
+        self._check_writable()
+        doc_ids = [str(d) for d in doc_ids]
+        if len(set(doc_ids)) != len(doc_ids):
+            raise ValueError("doc_ids must be unique")
+        arr, metadatas = self._rows_and_metadata(vectors, metadatas, copy)
+        if len(doc_ids) != len(arr):
+            raise ValueError(f"Got {len(doc_ids)} doc ids for {len(arr)} vectors")
+        if content_hashes is not None and len(content_hashes) != len(doc_ids):
+            raise ValueError(f"Got {len(content_hashes)} content hashes for {len(doc_ids)} doc ids")
+        old = self.metadata.doc_rows(doc_ids)
+        self._remove_rows(list(old.values()))
+        ids = self._append(arr, metadatas)
+        self.metadata.set_docs(doc_ids, ids.tolist(), content_hashes)
+        return {"added": len(doc_ids) - len(old), "replaced": len(old)}
+
+    def delete(self, doc_ids: Iterable[str]) -> int:
+        """Remove documents by id; returns how many existed."""
+        self._check_writable()
+        rows = self.metadata.doc_rows(doc_ids)
+        self._remove_rows(list(rows.values()))
+        return len(rows)
+
+    def doc_hashes(self, prefix: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """``{doc_id: content_hash}`` of the stored documents (optionally only ids starting with ``prefix``)."""
+        return self.metadata.doc_hashes(prefix)
+
+    def _remove_rows(self, row_ids: List[int]) -> None:
+        if not row_ids:
+            return
+        if self.index_type in APPEND_ONLY_INDEX_TYPES:
+            raise ValueError("HNSW indexes cannot remove vectors; rebuild the store to replace or delete documents")
+        if not self._has_ids:
+            raise ValueError("This store was saved without stable row ids; rebuild it to replace or delete documents")
+        self.index.remove_ids(np.asarray(row_ids, dtype="int64"))
+        self.metadata.delete(row_ids)
+        self.version += 1
+
+    def add_chunks(self, chunks: Iterable[Tuple[Any, Sequence[Dict[str, Any]]]]) -> int:
+        """Add ``(vectors, metadatas)`` chunks from an iterator; returns the total rows added.
+
+        Only one chunk is materialized at a time, so corpora larger than
+        memory can be indexed from a generator.
+        """
+        return sum(self.add_many(vectors, metadatas) for vectors, metadatas in chunks)
+
+    def query(self, vector: List[float], k: int = 5, filters: Optional[Filters] = None) -> List[Dict[str, Any]]:
+        return self.query_batch(self._as_rows(vector), k=k, filters=filters)[0]
+
+    def query_batch(self, vectors, k: Union[int, Sequence[int]] = 5,
+                    filters: Optional[Filters] = None) -> List[List[Dict[str, Any]]]:
+        """Search an (N, dim) matrix of queries with one FAISS call.
+
+        ``k`` is one value for all queries or one per query. The index is
+        searched once at ``max(k)`` and each row is cut to its own ``k``.
+        ``filters`` (``{field: value or [values]}``) restricts every query to
+        vectors whose metadata matches; the matching row ids become a FAISS ID
+        selector, so the index only scores allowed vectors. Only the hits'
+        metadata is read from the sidecar. Returns one ``[{"score",
+        "metadata"}, ...]`` list per query, in order.
+        """
+        arr = self._as_rows(vectors, copy=True)
+        ks = [int(k)] * len(arr) if isinstance(k, (int, np.integer)) else [int(x) for x in k]
+        if len(ks) != len(arr):
+            raise ValueError(f"Got {len(ks)} k values for {len(arr)} queries")
+        k_max = max(ks, default=0)
+        if k_max <= 0 or not len(arr):
+            return [[] for _ in ks]
+        found = self._search_ids(arr, k_max, filters)
+        if found is None:
+            return [[] for _ in ks]
+        distances, indices = found
+        hits = self.metadata.get(int(i) for i in indices.ravel() if i >= 0)
+        results: List[List[Dict[str, Any]]] = []
+        for row_k, scores, ids in zip(ks, distances.tolist(), indices.tolist()):
+            results.append([{"score": float(score), "metadata": hits[idx]}
+                            for score, idx in zip(scores[:row_k], ids[:row_k]) if idx in hits])
         return results
 
+    def _search_ids(self, arr: np.ndarray, k: int,
+                    filters: Optional[Filters]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """``(scores, row ids)`` of the top ``k`` per query; ``None`` if no row passes ``filters``.
+
+        ``arr`` is normalized in place.
+        """
+        params = allowed = None
+        if filters:
+            allowed = self.metadata.ids_matching(filters)
+            if not len(allowed):
+                return None
+            params = self._filtered_search_params(faiss.IDSelectorBatch(allowed), len(allowed), k)
+        faiss.normalize_L2(arr)
+        if allowed is not None and self.index_type == "pq":
+            return self._search_post_filtered(arr, k, allowed)
+        return self._search(arr, k, params)
+
+    def query_text(self, text: str, k: int = 5, filters: Optional[Filters] = None) -> List[Dict[str, Any]]:
+        """BM25 keyword search over the metadata text; no vector needed. ``score`` is the BM25 score."""
+        hits = self.metadata.search_text(text, k, filters)
+        metas = self.metadata.get(row for row, _ in hits)
+        return [{"score": score, "metadata": metas[row]} for row, score in hits if row in metas]
+
+    def query_hybrid(self, vector, text: str, k: int = 5, filters: Optional[Filters] = None,
+                     rrf_k: int = DEFAULT_RRF_K, candidates: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Dense and BM25 results fused by reciprocal rank (see ``lexical.fuse_hits``).
+
+        Each side contributes its top ``candidates`` (default ``max(4k, 20)``).
+        """
+        dense, lexical = self._hybrid_candidates(vector, text, candidates or max(4 * k, 20), filters)
+        return fuse_hits(self.metadata, dense, lexical, k, rrf_k)
+
+    def _hybrid_candidates(self, vector, text: str, n: int,
+                           filters: Optional[Filters]) -> Tuple[List[Tuple[int, float]], List[Tuple[int, float]]]:
+        """The top ``n`` ``(row id, score)`` of the dense and of the BM25 search, best first."""
+        found = self._search_ids(self._as_rows(vector, copy=True), n, filters)
+        dense = [] if found is None else [(int(i), float(d)) for d, i in zip(found[0][0], found[1][0]) if i >= 0]
+        return dense, self.metadata.search_text(text, n, filters)
+
+    def _search(self, arr: np.ndarray, k: int, params) -> Tuple[np.ndarray, np.ndarray]:
+        if self.rerank > 1:
+            return self._search_reranked(arr, k, params)
+        return self.index.search(arr, k, params=params)
+
+    def _search_post_filtered(self, arr: np.ndarray, k: int, allowed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Filtered search for indexes without ID selector support (``IndexPQ``).
+
+        Fetches ``k`` times the inverse of the filter's selectivity and keeps
+        the allowed hits, in score order.
+        """
+        fetch = min(self.index.ntotal, max(k, math.ceil(k * self.index.ntotal / len(allowed))))
+        distances, indices = self._search(arr, fetch, None)
+        keep = np.isin(indices, allowed)
+        order = np.argsort(~keep, axis=1, kind="stable")[:, :k]
+        distances = np.take_along_axis(distances, order, axis=1)
+        indices = np.take_along_axis(indices, order, axis=1)
+        indices[~np.take_along_axis(keep, order, axis=1)] = -1
+        return distances, indices
+
+    def _search_reranked(self, arr: np.ndarray, k: int, params) -> Tuple[np.ndarray, np.ndarray]:
+        """Top ``rerank * k`` from the index, re-scored exactly against the full-precision copy.
+
+        Only the candidate rows of the (memory-mapped) copy are paged in.
+        """
+        _, cand = self.index.search(arr, k * self.rerank, params=params)
+        full = self.full_vectors
+        valid = cand >= 0
+        # one gather of the candidate rows (pages of the memory-mapped copy) for all queries
+        exact = np.einsum("qcd,qd->qc", full[np.where(valid, cand, 0)], arr)
+        exact[~valid] = -np.inf
+        order = np.argsort(-exact, axis=1, kind="stable")[:, :k]
+        distances = np.take_along_axis(exact, order, axis=1)
+        indices = np.take_along_axis(cand, order, axis=1)
+        indices[~np.isfinite(distances)] = -1
+        return distances, indices
+
+    def _filtered_search_params(self, selector, n_allowed: int, k: int):
+        """Search parameters restricting the index to ``selector``.
+
+        HNSW ``efSearch`` and IVF ``nprobe`` are widened by the inverse of the
+        filter's selectivity (capped at the corpus / ``nlist``) so selective
+        filters still return ``k`` hits.
+        """
+        # a filter keeping 1/s of the corpus needs ~s times more candidates for k hits
+        widen = max(1.0, self.index.ntotal / max(n_allowed, 1))
+        if self.index_type.startswith("ivf"):
+            nlist = faiss.extract_index_ivf(self.index).nlist
+            nprobe = min(nlist, max(self.nprobe, math.ceil(self.nprobe * widen)))
+            return faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+        if self.index_type == "hnsw":
+            ef = min(max(self.index.ntotal, k), max(self.ef_search, k, math.ceil(self.ef_search * widen)))
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=ef)
+        return faiss.SearchParameters(sel=selector)
+
     def save(self, base_path: Path) -> None:
         base_path = Path(base_path)
         base_path.parent.mkdir(parents=True, exist_ok=True)
         faiss.write_index(self.index, str(base_path.with_suffix(".index")))
-        with open(base_path.with_suffix(".meta.json"), "w", encoding="utf-8") as fh:
-            json.dump(self._metadatas, fh, indent=2)
+        self.metadata.save(base_path.with_suffix(".meta.sqlite"))
+        if self.keep_full:
+            np.save(base_path.with_suffix(".full.npy"), self.full_vectors)
+        with open(base_path.with_suffix(".config.json"), "w", encoding="utf-8") as fh:
+            json.dump(self.config(), fh, indent=2)
 
     @classmethod
-    def load(cls, base_path: Path) -> "FAISSEmbeddingsStore":
+    def load(cls, base_path: Path, mmap: bool = False) -> "FAISSEmbeddingsStore":
+        """Load a store written by ``save``; ``mmap=True`` maps the index read-only instead of reading it.
+
+        A memory-mapped index loads near-instantly and processes on one host
+        share its pages through the OS page cache; the store is then
+        read-only. The full-precision copy of a ``keep_full`` store is always
+        memory-mapped (copied into memory only for a writable load, which may
+        append to it). Stores saved without a config are flat, and stores
+        with the older ``.meta.json`` metadata list still load.
+        """
         if faiss is None:
             raise RuntimeError("faiss is not installed. Install 'faiss-cpu' to enable this store.")
         base_path = Path(base_path)
-        idx = faiss.read_index(str(base_path.with_suffix(".index")))
+        # stores saved before index types existed have no config and are flat
+        config_path = base_path.with_suffix(".config.json")
+        config: Dict[str, Any] = {"index_type": "flat", "params": {}, "search": {}}
+        if config_path.exists():
+            with open(config_path, "r", encoding="utf-8") as fh:
+                config = json.load(fh)
+        flags = mmap_flags(config["index_type"]) if mmap else 0
+        idx = faiss.read_index(str(base_path.with_suffix(".index")), flags)
         dim = idx.d
-        inst = cls(dim=dim)
+        inst = cls(dim=dim, index_type=config["index_type"], keep_full=config.get("keep_full", False),
+                   **config.get("params", {}))
         inst.index = idx
-        with open(base_path.with_suffix(".meta.json"), "r", encoding="utf-8") as fh:
-            inst._metadatas = json.load(fh)
+        inst.next_id = int(config.get("next_id", idx.ntotal))
+        inst.read_only = mmap
+        if inst.keep_full:
+            full = np.load(base_path.with_suffix(".full.npy"), mmap_mode="r")
+            inst._full = [full if mmap else np.array(full)]
+        inst.set_search_params(**config.get("search", {}))
+        inst.metadata = load_metadata(base_path, read_only=mmap)
         return inst
+
@@ -0,0 +1,88 @@
+"""Lexical (BM25) search helpers shared by the vector stores.
+
+The inverted index itself is an SQLite FTS5 table inside the metadata
+sidecar (see ``metadata_store``). It is filled from the same metadata as the
+vectors, so it always covers the same documents and chunks, and it is saved,
+loaded and memory-mapped with them. FTS5 ranks with BM25.
+
+Tokens keep ``-`` and ``_``, so ``FM-04`` and ``sensor_4`` are single terms
+and an exact code never matches a neighbour's digits.
+
+``reciprocal_rank_fusion`` merges a dense and a lexical ranking. A document
+scores ``sum(1 / (rrf_k + rank))`` over the rankings it appears in, so
+neither side's raw score scale matters.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# metadata fields whose text is indexed, in this order
+LEXICAL_FIELDS = ("id", "fm_id", "title", "heading", "text")
+DEFAULT_RRF_K = 60
+
+FTS_TOKENIZER = "unicode61 tokenchars '-_'"
+
+_WORD = re.compile(r"\w+(?:[-.]\w+)*")
+
+
+def lexical_body(metadata: Mapping[str, Any]) -> str:
+    """The text of a metadata dict that goes into the inverted index ('' if none)."""
+    parts = []
+    for field in LEXICAL_FIELDS:
+        value = metadata.get(field)
+        if isinstance(value, (list, tuple)):
+            parts.extend(str(v) for v in value)
+        elif value is not None:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+def query_terms(text: str) -> List[str]:
+    return _WORD.findall(text)
+
+
+def fts_query(text: str) -> Optional[str]:
+    """An FTS5 ``MATCH`` expression ORing the words of ``text`` (each quoted, so no operators leak in)."""
+    terms = list(dict.fromkeys(t.lower() for t in query_terms(text)))
+    if not terms:
+        return None
+    return " OR ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def is_keyword_query(text: str) -> bool:
+    """True for queries made only of codes and numbers (``FM-04``, ``sensor_4 45``).
+
+    Every word must contain a digit. Such queries are answered from the
+    inverted index alone, without computing an embedding.
+    """
+    terms = query_terms(text)
+    return bool(terms) and all(any(c.isdigit() for c in t) for t in terms)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]],
+                           rrf_k: int = DEFAULT_RRF_K) -> List[Tuple[Hashable, float]]:
+    """``[(id, score)]`` by descending fused score; ties keep first-seen order."""
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            scores[row] = scores.get(row, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def fuse_hits(metadata, dense: Iterable[Tuple[Hashable, float]], lexical: Iterable[Tuple[Hashable, float]],
+              k: int, rrf_k: int = DEFAULT_RRF_K) -> List[Dict[str, Any]]:
+    """Fused results ``{"score", "metadata", "dense_score", "lexical_score"}`` from two ``(row, score)`` rankings.
+
+    ``metadata`` is the store's ``SQLiteMetadataStore``, or anything whose
+    ``get(ids)`` returns ``{id: metadata}`` for the ids of the rankings (a
+    sharded store keys rows by ``(shard, row)``). ``dense_score`` is the
+    cosine similarity and ``lexical_score`` the BM25 score, or ``None`` where
+    the document was not in that ranking.
+    """
+    dense, lexical = dict(dense), dict(lexical)
+    fused = reciprocal_rank_fusion([list(dense), list(lexical)], rrf_k)[:k]
+    metas = metadata.get(row for row, _ in fused)
+    return [{"score": score, "metadata": metas[row], "dense_score": dense.get(row),
+             "lexical_score": lexical.get(row)}
+            for row, score in fused if row in metas]
@@ -0,0 +1,327 @@
+"""SQLite sidecar for vector-store metadata.
+
+Each vector's metadata dict is stored as JSON under its FAISS row id. Every
+scalar top-level field (and every scalar element of a list field) is also
+written to an indexed ``(key, value, row_id)`` table, with numbers written
+as ``scalar_value`` normalizes them. That makes two
+operations cheap at any corpus size:
+
+- ``get(row_ids)``: fetch only the metadata of the hits a search returned;
+- ``ids_matching({"source": "manual.pdf", "doc_type": ["spec", "faq"]})``:
+  the row ids a filter allows, which the FAISS store turns into an ID
+  selector before searching.
+
+A third table maps stable document ids (strings chosen by the loader) to the
+row currently holding the document and the hash of the content it was
+embedded from, so upserts can find the row to replace and loaders can skip
+unchanged documents.
+
+The ``lexical`` FTS5 table is a BM25 inverted index over each row's text
+fields (``lexical.LEXICAL_FIELDS``). ``search_text`` answers keyword queries
+from it, and accepts the same filters. It lives in the same file, so it is
+saved and loaded with the metadata.
+
+Nothing is parsed up front. A file opened read-only serves lookups straight
+from disk pages.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_db.embeddings_store.lexical import FTS_TOKENIZER, fts_query, lexical_body
+
+# stay below SQLite's bound-parameter limit on older builds
+_MAX_PARAMS = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (row_id INTEGER PRIMARY KEY, doc TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta_fields (key TEXT NOT NULL, value TEXT NOT NULL, row_id INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS meta_fields_key_value ON meta_fields (key, value, row_id);
+CREATE TABLE IF NOT EXISTS docs (doc_id TEXT PRIMARY KEY, row_id INTEGER NOT NULL, content_hash TEXT);
+CREATE INDEX IF NOT EXISTS docs_row_id ON docs (row_id);
+"""
+
+_LEXICAL_SCHEMA = f"CREATE VIRTUAL TABLE IF NOT EXISTS lexical USING fts5(body, tokenize=\"{FTS_TOKENIZER}\")"
+
+Filters = Mapping[str, Any]
+
+
+def scalar_value(value: Any) -> Any:
+    """``value`` as the plain Python scalar filters compare: NumPy scalars
+    unwrapped, whole-number floats as ints (so ``2.0`` matches a filter of ``2``)."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _field_value(value: Any) -> Optional[str]:
+    # JSON-encode so 1, "1" and true stay distinct
+    value = scalar_value(value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return json.dumps(value)
+    return None
+
+
+def _field_rows(row_id: int, metadata: Mapping[str, Any]) -> Iterable[tuple]:
+    for key, value in metadata.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for v in values:
+            encoded = _field_value(v)
+            if encoded is not None:
+                yield key, encoded, row_id
+
+
+class SQLiteMetadataStore:
+    """Metadata dicts keyed by FAISS row id, with an indexed field table for filters.
+
+    ``path=None`` keeps the database in memory; ``save`` copies it to a file.
+    ``read_only=True`` opens an existing file without loading it.
+    """
+
+    def __init__(self, path: Optional[Path] = None, read_only: bool = False):
+        if path is None:
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        elif read_only:
+            self._conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True,
+                                         check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        if not read_only:
+            self._conn.executescript(_SCHEMA)
+            self._create_lexical()
+
+    def _create_lexical(self) -> bool:
+        """Create the FTS5 table if missing; True if it was created. No-op where SQLite lacks FTS5."""
+        exists = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'lexical'").fetchone()
+        if exists:
+            return False
+        try:
+            self._conn.execute(_LEXICAL_SCHEMA)
+        except sqlite3.OperationalError:  # pragma: no cover - SQLite built without FTS5
+            return False
+        return True
+
+    @property
+    def has_lexical(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'lexical'").fetchone() is not None
+
+    @classmethod
+    def from_file(cls, path: Path) -> "SQLiteMetadataStore":
+        """An in-memory, writable copy of a saved sidecar."""
+        inst = cls()
+        src = sqlite3.connect(str(path))
+        try:
+            src.backup(inst._conn)
+        finally:
+            src.close()
+        # sidecars saved before the docs and lexical tables existed
+        inst._conn.executescript(_SCHEMA)
+        if inst._create_lexical():
+            inst._reindex_lexical()
+        return inst
+
+    @classmethod
+    def from_list(cls, metadatas: Sequence[Dict[str, Any]]) -> "SQLiteMetadataStore":
+        """Build from a list whose positions are the row ids (the legacy ``.meta.json`` layout)."""
+        inst = cls()
+        inst.add(range(len(metadatas)), metadatas)
+        return inst
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM meta").fetchone()[0]
+
+    def __getitem__(self, row_id: int) -> Dict[str, Any]:
+        found = self.get([row_id])
+        if row_id not in found:
+            raise KeyError(row_id)
+        return found[row_id]
+
+    def add(self, row_ids: Iterable[int], metadatas: Iterable[Optional[Dict[str, Any]]]) -> None:
+        """Insert (or replace) the metadata of the given row ids."""
+        rows, fields, bodies = [], [], []
+        for row_id, metadata in zip(row_ids, metadatas):
+            metadata = metadata or {}
+            rows.append((int(row_id), json.dumps(metadata, default=str)))
+            fields.extend(_field_rows(int(row_id), metadata))
+            body = lexical_body(metadata)
+            if body:
+                bodies.append((int(row_id), body))
+        with self._lock, self._conn:
+            self._delete_fields([r[0] for r in rows])
+            self._conn.executemany("INSERT OR REPLACE INTO meta (row_id, doc) VALUES (?, ?)", rows)
+            self._conn.executemany("INSERT INTO meta_fields (key, value, row_id) VALUES (?, ?, ?)", fields)
+            if bodies:
+                self._conn.executemany("INSERT INTO lexical (rowid, body) VALUES (?, ?)", bodies)
+
+    def _reindex_lexical(self) -> None:
+        with self._lock, self._conn:
+            cur = self._conn.execute("SELECT row_id, doc FROM meta")
+            bodies = [(row_id, lexical_body(json.loads(doc))) for row_id, doc in cur]
+            self._conn.executemany("INSERT INTO lexical (rowid, body) VALUES (?, ?)", [b for b in bodies if b[1]])
+
+    def delete(self, row_ids: Iterable[int]) -> None:
+        """Remove the metadata of the given row ids, and any document ids pointing at them."""
+        ids = [int(i) for i in row_ids]
+        with self._lock, self._conn:
+            self._delete_fields(ids)
+            for chunk in _chunks(ids):
+                self._conn.execute(f"DELETE FROM meta WHERE row_id IN ({_marks(chunk)})", chunk)
+                self._conn.execute(f"DELETE FROM docs WHERE row_id IN ({_marks(chunk)})", chunk)
+
+    def _delete_fields(self, ids: List[int]) -> None:
+        for chunk in _chunks(ids):
+            self._conn.execute(f"DELETE FROM meta_fields WHERE row_id IN ({_marks(chunk)})", chunk)
+            self._conn.execute(f"DELETE FROM lexical WHERE rowid IN ({_marks(chunk)})", chunk)
+
+    def get(self, row_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """``{row_id: metadata}`` for the ids that exist, in one query per 900 ids."""
+        ids = sorted({int(i) for i in row_ids})
+        out: Dict[int, Dict[str, Any]] = {}
+        with self._lock:
+            for chunk in _chunks(ids):
+                cur = self._conn.execute(f"SELECT row_id, doc FROM meta WHERE row_id IN ({_marks(chunk)})", chunk)
+                out.update((row_id, json.loads(doc)) for row_id, doc in cur)
+        return out
+
+    def row_ids(self) -> np.ndarray:
+        """Sorted int64 ids of every row that has metadata."""
+        with self._lock:
+            rows = self._conn.execute("SELECT row_id FROM meta ORDER BY row_id").fetchall()
+        return np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+
+    def set_docs(self, doc_ids: Sequence[str], row_ids: Iterable[int],
+                 content_hashes: Optional[Iterable[Optional[str]]] = None) -> None:
+        """Point each document id at its row (and record its content hash)."""
+        hashes = content_hashes if content_hashes is not None else [None] * len(doc_ids)
+        rows = [(str(d), int(r), h) for d, r, h in zip(doc_ids, row_ids, hashes)]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO docs (doc_id, row_id, content_hash) VALUES (?, ?, ?)", rows)
+
+    def doc_rows(self, doc_ids: Iterable[str]) -> Dict[str, int]:
+        """``{doc_id: row_id}`` for the document ids that exist."""
+        ids = sorted({str(d) for d in doc_ids})
+        out: Dict[str, int] = {}
+        with self._lock:
+            for chunk in _chunks(ids):
+                cur = self._conn.execute(f"SELECT doc_id, row_id FROM docs WHERE doc_id IN ({_marks(chunk)})", chunk)
+                out.update(cur)
+        return out
+
+    def doc_hashes(self, prefix: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """``{doc_id: content_hash}`` of every stored document, or of those whose id starts with ``prefix``."""
+        sql, params = "SELECT doc_id, content_hash FROM docs", []
+        if prefix:
+            # range scan on the primary key instead of LIKE (which would treat % and _ as wildcards)
+            sql += " WHERE doc_id >= ? AND doc_id < ?"
+            params = [prefix, prefix + "\U0010ffff"]
+        with self._lock:
+            try:
+                return dict(self._conn.execute(sql, params))
+            except sqlite3.OperationalError:
+                # a read-only sidecar saved before the docs table existed
+                return {}
+
+    def ids_matching(self, filters: Filters) -> np.ndarray:
+        """Sorted int64 row ids whose metadata matches every filter.
+
+        A filter value matches a field equal to it. A list of values matches
+        any of them, and a list field matches if one of its elements matches.
+        """
+        sql, params = _filter_sql(filters)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return np.sort(np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows)))
+
+    def search_text(self, query: str, k: int = 5, filters: Optional[Filters] = None) -> List[Tuple[int, float]]:
+        """Top-``k`` ``(row_id, bm25 score)`` for a keyword query, best first (higher is better).
+
+        Any word of ``query`` may match. Returns ``[]`` for an empty query or
+        a sidecar without the lexical index.
+        """
+        match = fts_query(query)
+        if match is None or k <= 0:
+            return []
+        sql = "SELECT rowid, -bm25(lexical) AS score FROM lexical WHERE lexical MATCH ?"
+        params: List[Any] = [match]
+        if filters:
+            filter_sql, filter_params = _filter_sql(filters)
+            sql += f" AND rowid IN ({filter_sql})"
+            params.extend(filter_params)
+        sql += " ORDER BY score DESC, rowid LIMIT ?"
+        params.append(int(k))
+        with self._lock:
+            try:
+                return [(int(r), float(s)) for r, s in self._conn.execute(sql, params)]
+            except sqlite3.OperationalError:
+                if self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'lexical'").fetchone():
+                    raise
+                # a read-only sidecar saved before the lexical index existed
+                return []
+
+    def save(self, path: Path) -> None:
+        """Write the whole database to ``path`` (replacing it) with SQLite's backup API."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.unlink(missing_ok=True)
+        dst = sqlite3.connect(str(tmp))
+        try:
+            with self._lock:
+                self._conn.backup(dst)
+        finally:
+            dst.close()
+        tmp.replace(path)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def load_metadata(base_path: Path, read_only: bool = False) -> SQLiteMetadataStore:
+    """The metadata saved next to ``base_path``: the SQLite sidecar, or a legacy ``.meta.json`` list.
+
+    ``read_only`` opens the sidecar in place (no copy, lookups read disk
+    pages); otherwise it is copied into a writable in-memory database.
+    """
+    sidecar = base_path.with_suffix(".meta.sqlite")
+    if sidecar.exists():
+        return SQLiteMetadataStore(sidecar, read_only=True) if read_only else SQLiteMetadataStore.from_file(sidecar)
+    with open(base_path.with_suffix(".meta.json"), "r", encoding="utf-8") as fh:
+        return SQLiteMetadataStore.from_list(json.load(fh))
+
+
+def _filter_sql(filters: Filters) -> Tuple[str, List[Any]]:
+    """A ``SELECT row_id`` query for the rows matching every filter, and its parameters."""
+    clauses, params = [], []
+    for key, value in filters.items():
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        encoded = [_field_value(v) for v in values]
+        if any(e is None for e in encoded):
+            raise ValueError(f"Filter values for {key!r} must be scalars")
+        # sidecars written before whole-number floats were stored as ints hold e.g. "2.0"
+        encoded += [json.dumps(float(v)) for v in map(scalar_value, values)
+                    if isinstance(v, int) and not isinstance(v, bool)]
+        clauses.append(f"SELECT DISTINCT row_id FROM meta_fields WHERE key = ? AND value IN ({_marks(encoded)})")
+        params.extend([key, *encoded])
+    if not clauses:
+        raise ValueError("filters must not be empty")
+    return " INTERSECT ".join(clauses), params
+
+
+def _marks(values: Sequence[Any]) -> str:
+    return ",".join("?" * len(values))
+
+
+def _chunks(values: List[Any]) -> Iterable[List[Any]]:
+    for start in range(0, len(values), _MAX_PARAMS):
+        yield values[start:start + _MAX_PARAMS]
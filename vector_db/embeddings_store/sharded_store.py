@@ -0,0 +1,426 @@
+"""Sharded FAISS embeddings store with parallel fan-out search.
+
+Vectors are split across several ``FAISSEmbeddingsStore`` shards. Each shard
+has its own index file, metadata sidecar and config, so it is built, saved
+and loaded on its own. Shards are assigned in one of two ways:
+
+- by hash (``shard_by=None``, the default): ``shards`` shards named ``"0"``
+  to ``"<shards - 1>"``. A document goes to ``blake2b(doc_id) % shards``, so
+  its upserts and deletes touch one shard. Rows added without a document
+  id are spread round-robin;
+- by collection (``shard_by="site"``, ``"doc_type"``, ... any scalar
+  metadata field): one shard per distinct value, created on first use.
+  Rows without the field go to the ``"_default"`` shard. A filter on that
+  field only searches the shards it names. A document whose field changes
+  moves to its new shard.
+
+Every search runs on all (matching) shards at once on a thread pool of
+``workers`` threads. FAISS and SQLite release the GIL while they search.
+Each shard returns its own top-k, sorted, and the lists are merged with a
+heap (``heapq.merge``) into the global top k. A flat (exact) sharded store
+returns the same hits as a single store holding all the vectors. BM25
+scores in ``query_text`` use each shard's own term statistics.
+``query_hybrid`` merges the dense and the BM25 candidates of all shards
+before fusing them.
+
+``save(base)`` writes ``<base>.shards.json`` (routing, store settings and the
+shard names) and each shard as ``<base>.shards/shard-<nnn>.*``. Shards that
+have not changed since they were last saved to that location are not
+rewritten. ``load(base, mmap=True)`` loads the shards concurrently, and
+``shards=[...]`` loads only some of them. Searches then cover the loaded
+shards only. Writing to a saved shard that was not loaded raises, and so
+does any upsert or delete while a ``shard_by`` store is partially loaded,
+since the document's old copy may sit in a shard that is not loaded.
+``load_shard`` loads one more shard later.
+"""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
+
+import numpy as np
+
+from vector_db.embeddings_store.faiss_store import FAISSEmbeddingsStore, faiss
+from vector_db.embeddings_store.lexical import DEFAULT_RRF_K, fuse_hits
+from vector_db.embeddings_store.metadata_store import Filters, scalar_value
+
+DEFAULT_SHARDS = 4
+DEFAULT_SHARD = "_default"
+
+T = TypeVar("T")
+
+
+def _by_score(hit: Dict[str, Any]) -> float:
+    return -hit["score"]
+
+
+def _merge_top(lists: Iterable[Sequence[T]], k: int, key: Callable[[T], float]) -> List[T]:
+    """The ``k`` best items of several lists that are each sorted best first (``key`` ascending)."""
+    return list(itertools.islice(heapq.merge(*lists, key=key), k))
+
+
+def hash_shard(doc_id: str, n_shards: int) -> str:
+    """The hash shard of a document id; stable across processes and Python versions."""
+    digest = hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest()
+    return str(int.from_bytes(digest, "little") % n_shards)
+
+
+class _ShardedMetadata:
+    """``get`` over ``(shard index, row id)`` keys, as ``fuse_hits`` expects of a metadata store."""
+
+    def __init__(self, shards: Sequence[FAISSEmbeddingsStore]):
+        self.shards = shards
+
+    def get(self, keys: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        rows: Dict[int, List[int]] = {}
+        for i, row in keys:
+            rows.setdefault(i, []).append(row)
+        out: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        for i, ids in rows.items():
+            out.update(((i, row), meta) for row, meta in self.shards[i].metadata.get(ids).items())
+        return out
+
+
+class ShardedEmbeddingsStore:
+    """Several ``FAISSEmbeddingsStore`` shards behind the single-store API.
+
+    ``shards`` is the number of hash shards; with ``shard_by`` it is
+    ignored and there is one shard per value of that metadata field.
+    ``workers`` caps the search threads (default: one per shard, at most
+    the CPU count). The other keyword arguments (``index_type``,
+    ``nprobe``, ``keep_full``, index parameters, ...) configure every shard.
+    """
+
+    def __init__(self, dim: int = 128, shards: int = DEFAULT_SHARDS, shard_by: Optional[str] = None,
+                 workers: Optional[int] = None, **store_kwargs):
+        if faiss is None:
+            raise RuntimeError("faiss is not installed. Install 'faiss-cpu' to enable this store.")
+        if shard_by is None and shards < 1:
+            raise ValueError("shards must be >= 1")
+        self.dim = dim
+        self.n_shards = int(shards)
+        self.shard_by = shard_by
+        self.workers = workers
+        self.store_kwargs = store_kwargs
+        self.index_type = store_kwargs.get("index_type", "flat")
+        self.read_only = False
+        self._shards: Dict[str, FAISSEmbeddingsStore] = {}
+        # shard name -> file name under <base>.shards/, for every shard ever saved or loaded
+        self._files: Dict[str, str] = {}
+        # shard name -> (saved base path, shard version at that save)
+        self._saved: Dict[str, Tuple[Path, int]] = {}
+        self._base: Optional[Path] = None
+        self._next_rr = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards.values())
+
+    @property
+    def version(self) -> int:
+        """Changes whenever any shard's contents or search settings change (see VectorSearch's cache)."""
+        return sum(shard.version for shard in self._shards.values())
+
+    @property
+    def shard_names(self) -> List[str]:
+        """The loaded shards, in creation order."""
+        return list(self._shards)
+
+    def shard(self, name: str) -> FAISSEmbeddingsStore:
+        """One loaded shard, e.g. to tune or inspect it."""
+        return self._shards[name]
+
+    def shard_sizes(self) -> Dict[str, int]:
+        return {name: len(shard) for name, shard in self._shards.items()}
+
+    def close(self) -> None:
+        """Stop the search threads (a later search starts new ones)."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    # -- routing ----------------------------------------------------------
+
+    def _shard_name(self, value: Any) -> str:
+        if value is None:
+            return DEFAULT_SHARD
+        if isinstance(value, (list, tuple, dict)):
+            raise ValueError(f"Cannot shard by {self.shard_by!r}: value {value!r} is not a scalar")
+        return str(scalar_value(value))
+
+    def _route(self, doc_id: Optional[str], metadata: Optional[Dict[str, Any]]) -> str:
+        if self.shard_by is not None:
+            return self._shard_name((metadata or {}).get(self.shard_by))
+        if doc_id is not None:
+            return hash_shard(doc_id, self.n_shards)
+        name = str(self._next_rr % self.n_shards)
+        self._next_rr += 1
+        return name
+
+    def _loaded_shard(self, name: str) -> Optional[FAISSEmbeddingsStore]:
+        """The shard, or ``None`` if it does not exist yet; raises if it exists but was not loaded."""
+        if name not in self._shards and name in self._files:
+            raise RuntimeError(f"Shard {name!r} was saved but not loaded; load it with load_shard first")
+        return self._shards.get(name)
+
+    def _check_all_loaded(self, action: str) -> None:
+        """With ``shard_by``, a document may sit in any shard, so ``action`` needs every saved shard loaded."""
+        missing = sorted(set(self._files) - set(self._shards))
+        if self.shard_by is not None and missing:
+            raise RuntimeError(f"Cannot {action} by document id in a partially loaded store sharded by "
+                               f"{self.shard_by!r} (not loaded: {missing}); load those shards with load_shard first")
+
+    def _writable_shard(self, name: str) -> FAISSEmbeddingsStore:
+        shard = self._loaded_shard(name)
+        if shard is None:
+            shard = self._shards[name] = FAISSEmbeddingsStore(dim=self.dim, **self.store_kwargs)
+        return shard
+
+    def _search_shards(self, filters: Optional[Filters]) -> List[FAISSEmbeddingsStore]:
+        """The loaded shards a search with ``filters`` has to visit."""
+        if self.shard_by is None or not filters or self.shard_by not in filters:
+            return list(self._shards.values())
+        values = filters[self.shard_by]
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        names = {self._shard_name(v) for v in values}
+        return [shard for name, shard in self._shards.items() if name in names]
+
+    def _map(self, fn: Callable[[Any], T], items: Sequence[Any]) -> List[T]:
+        """``fn`` over ``items`` on the thread pool (inline for a single item)."""
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers or min(max(len(items), 1), os.cpu_count() or 1),
+                                                thread_name_prefix="shard-search")
+            pool = self._pool
+        return list(pool.map(fn, items))
+
+    # -- writes -----------------------------------------------------------
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError("This store was loaded with mmap=True and is read-only; load it without mmap to add vectors.")
+
+    def _as_rows(self, vectors) -> np.ndarray:
+        arr = np.asarray(vectors, dtype="float32")
+        if arr.ndim == 1:
+            arr = arr.reshape(-1, self.dim) if arr.size == 0 else arr.reshape(1, -1)
+        if arr.ndim != 2 or arr.shape[1] != self.dim:
+            raise ValueError(f"Vector dimension {arr.shape[-1]} does not match store dim {self.dim}")
+        return arr
+
+    def train(self, vectors) -> None:
+        """Train every loaded shard (and, with hash sharding, every hash shard) on one sample."""
+        self._check_writable()
+        if self.shard_by is None:
+            for i in range(self.n_shards):
+                self._writable_shard(str(i))
+        for shard in self._shards.values():
+            shard.train(vectors)
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                          rerank: Optional[int] = None) -> None:
+        """Apply the search settings to every shard, including shards created later."""
+        settings = {"nprobe": nprobe, "ef_search": ef_search, "rerank": rerank}
+        for shard in self._shards.values():
+            shard.set_search_params(**settings)
+        self.store_kwargs.update((key, value) for key, value in settings.items() if value is not None)
+
+    def add(self, vector: List[float], metadata: Dict[str, Any] | None = None) -> None:
+        self.add_many(self._as_rows(vector), [metadata or {}])
+
+    def add_many(self, vectors, metadatas: Optional[Sequence[Dict[str, Any]]] = None, copy: bool = False) -> int:
+        """Add an (N, dim) batch, one ``add_many`` per shard it spreads over; returns N.
+
+        Each shard gets a copy of its rows, so ``vectors`` is never modified
+        (``copy`` is accepted for compatibility with the single store).
+        """
+        self._check_writable()
+        arr = self._as_rows(vectors)
+        if metadatas is None:
+            metadatas = [{} for _ in range(len(arr))]
+        elif len(metadatas) != len(arr):
+            raise ValueError(f"Got {len(metadatas)} metadata entries for {len(arr)} vectors")
+        groups: Dict[str, List[int]] = {}
+        for i, meta in enumerate(metadatas):
+            groups.setdefault(self._route(None, meta), []).append(i)
+        for name, rows in groups.items():
+            self._writable_shard(name).add_many(arr[rows], [metadatas[i] for i in rows])
+        return len(arr)
+
+    def upsert(self, doc_ids: Sequence[str], vectors, metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+               content_hashes: Optional[Sequence[Optional[str]]] = None, copy: bool = False) -> Dict[str, int]:
+        """Insert or replace documents by id in their shards; returns ``{"added", "replaced"}`` counts."""
+        self._check_writable()
+        self._check_all_loaded("upsert")
+        doc_ids = list(doc_ids)
+        if len(set(doc_ids)) != len(doc_ids):
+            raise ValueError("doc_ids must be unique")
+        arr = self._as_rows(vectors)
+        if len(doc_ids) != len(arr):
+            raise ValueError(f"Got {len(doc_ids)} doc ids for {len(arr)} vectors")
+        if metadatas is not None and len(metadatas) != len(doc_ids):
+            raise ValueError(f"Got {len(metadatas)} metadata entries for {len(doc_ids)} vectors")
+        if content_hashes is not None and len(content_hashes) != len(doc_ids):
+            raise ValueError(f"Got {len(content_hashes)} content hashes for {len(doc_ids)} doc ids")
+        groups: Dict[str, List[int]] = {}
+        for i, doc_id in enumerate(doc_ids):
+            groups.setdefault(self._route(doc_id, metadatas[i] if metadatas is not None else None), []).append(i)
+        counts = {"added": 0, "replaced": 0}
+        for name, rows in groups.items():
+            shard = self._writable_shard(name)
+            moved = 0
+            if self.shard_by is not None:
+                # a document whose collection changed leaves its old shard
+                ids = [doc_ids[i] for i in rows]
+                moved = sum(other.delete(ids) for other_name, other in self._shards.items() if other_name != name)
+            result = shard.upsert([doc_ids[i] for i in rows], arr[rows],
+                                  [metadatas[i] for i in rows] if metadatas is not None else None,
+                                  [content_hashes[i] for i in rows] if content_hashes is not None else None)
+            counts["added"] += result["added"] - moved
+            counts["replaced"] += result["replaced"] + moved
+        return counts
+
+    def delete(self, doc_ids: Iterable[str]) -> int:
+        """Remove documents by id from the loaded shards; returns how many existed."""
+        self._check_writable()
+        self._check_all_loaded("delete")
+        doc_ids = list(doc_ids)
+        if self.shard_by is not None:
+            return sum(shard.delete(doc_ids) for shard in self._shards.values())
+        groups: Dict[str, List[str]] = {}
+        for doc_id in doc_ids:
+            groups.setdefault(hash_shard(doc_id, self.n_shards), []).append(doc_id)
+        return sum(shard.delete(ids) for shard, ids in ((self._loaded_shard(name), ids) for name, ids in groups.items())
+                   if shard is not None)
+
+    def doc_hashes(self, prefix: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """``{doc_id: content_hash}`` over the loaded shards (optionally only ids starting with ``prefix``)."""
+        out: Dict[str, Optional[str]] = {}
+        for shard in self._shards.values():
+            out.update(shard.doc_hashes(prefix))
+        return out
+
+    # -- search -----------------------------------------------------------
+
+    def query(self, vector: List[float], k: int = 5, filters: Optional[Filters] = None) -> List[Dict[str, Any]]:
+        return self.query_batch(self._as_rows(vector), k=k, filters=filters)[0]
+
+    def query_batch(self, vectors, k: Union[int, Sequence[int]] = 5,
+                    filters: Optional[Filters] = None) -> List[List[Dict[str, Any]]]:
+        """Search every shard concurrently and merge the per-shard top-k of each query.
+
+        Same arguments and results as ``FAISSEmbeddingsStore.query_batch``.
+        """
+        arr = self._as_rows(vectors)
+        ks = [int(k)] * len(arr) if isinstance(k, (int, np.integer)) else [int(x) for x in k]
+        if len(ks) != len(arr):
+            raise ValueError(f"Got {len(ks)} k values for {len(arr)} queries")
+        shards = self._search_shards(filters)
+        if not shards or max(ks, default=0) <= 0:
+            return [[] for _ in ks]
+        per_shard = self._map(lambda shard: shard.query_batch(arr, k=ks, filters=filters), shards)
+        return [_merge_top((hits[q] for hits in per_shard), row_k, _by_score) for q, row_k in enumerate(ks)]
+
+    def query_text(self, text: str, k: int = 5, filters: Optional[Filters] = None) -> List[Dict[str, Any]]:
+        """BM25 keyword search on every shard, merged by score."""
+        per_shard = self._map(lambda shard: shard.query_text(text, k=k, filters=filters), self._search_shards(filters))
+        return _merge_top(per_shard, k, _by_score)
+
+    def query_hybrid(self, vector, text: str, k: int = 5, filters: Optional[Filters] = None,
+                     rrf_k: int = DEFAULT_RRF_K, candidates: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Dense and BM25 candidates of all shards, fused by reciprocal rank (see ``lexical.fuse_hits``)."""
+        n = candidates or max(4 * k, 20)
+        shards = self._search_shards(filters)
+        per_shard = self._map(lambda shard: shard._hybrid_candidates(vector, text, n, filters), shards)
+
+        def keyed(side: int) -> List[List[Tuple[Hashable, float]]]:
+            return [[((i, row), score) for row, score in found[side]] for i, found in enumerate(per_shard)]
+
+        def by_score(hit: Tuple[Hashable, float]) -> float:
+            return -hit[1]
+
+        dense = _merge_top(keyed(0), n, by_score)
+        lexical = _merge_top(keyed(1), n, by_score)
+        return fuse_hits(_ShardedMetadata(shards), dense, lexical, k, rrf_k)
+
+    # -- persistence ------------------------------------------------------
+
+    def config(self) -> Dict[str, Any]:
+        return {"dim": self.dim, "shards": self.n_shards, "shard_by": self.shard_by, "store": self.store_kwargs,
+                "next_rr": self._next_rr, "files": self._files}
+
+    @staticmethod
+    def shard_path(base_path: Path, file_name: str) -> Path:
+        """The base path ``FAISSEmbeddingsStore.save``/``load`` use for one shard."""
+        return Path(base_path).with_suffix(".shards") / file_name
+
+    def save(self, base_path: Path) -> None:
+        """Write the manifest and every shard changed since it was last saved to ``base_path``."""
+        base_path = Path(base_path)
+        for name in self._shards:
+            self._files.setdefault(name, f"shard-{len(self._files):03d}")
+        if self._base is not None and base_path != self._base:
+            # shards that were not loaded cannot be copied to a new location
+            missing = sorted(set(self._files) - set(self._shards))
+            if missing:
+                raise RuntimeError(f"Cannot save a partially loaded store to a new path (not loaded: {missing})")
+        targets = {name: self.shard_path(base_path, self._files[name]) for name in self._shards}
+        dirty = [name for name, shard in self._shards.items()
+                 if self._saved.get(name) != (targets[name], shard.version)]
+        self._map(lambda name: self._shards[name].save(targets[name]), dirty)
+        self._saved.update((name, (targets[name], self._shards[name].version)) for name in dirty)
+        with open(base_path.with_suffix(".shards.json"), "w", encoding="utf-8") as fh:
+            json.dump(self.config(), fh, indent=2)
+        self._base = base_path
+
+    @classmethod
+    def load(cls, base_path: Path, mmap: bool = False, shards: Optional[Iterable[str]] = None,
+             workers: Optional[int] = None) -> "ShardedEmbeddingsStore":
+        """Load a store written by ``save``, its shards concurrently.
+
+        ``mmap`` maps every shard read-only (see ``FAISSEmbeddingsStore.load``);
+        ``shards`` names the shards to load (default: all).
+        """
+        if faiss is None:
+            raise RuntimeError("faiss is not installed. Install 'faiss-cpu' to enable this store.")
+        base_path = Path(base_path)
+        with open(base_path.with_suffix(".shards.json"), "r", encoding="utf-8") as fh:
+            config = json.load(fh)
+        inst = cls(dim=config["dim"], shards=config["shards"], shard_by=config.get("shard_by"), workers=workers,
+                   **config.get("store", {}))
+        inst._files = dict(config.get("files", {}))
+        inst._next_rr = int(config.get("next_rr", 0))
+        inst._base = base_path
+        inst.read_only = mmap
+        names = list(inst._files) if shards is None else list(shards)
+        unknown = sorted(set(names) - set(inst._files))
+        if unknown:
+            raise KeyError(f"No saved shards named {unknown} (saved: {sorted(inst._files)})")
+        loaded = inst._map(lambda name: FAISSEmbeddingsStore.load(cls.shard_path(base_path, inst._files[name]),
+                                                                   mmap=mmap), names)
+        for name, shard in zip(names, loaded):
+            inst._shards[name] = shard
+            inst._saved[name] = (cls.shard_path(base_path, inst._files[name]), shard.version)
+        return inst
+
+    def load_shard(self, name: str) -> FAISSEmbeddingsStore:
+        """Load one more saved shard of this store (a no-op if it is loaded)."""
+        if name in self._shards:
+            return self._shards[name]
+        if self._base is None or name not in self._files:
+            raise KeyError(f"No saved shard named {name!r}")
+        path = self.shard_path(self._base, self._files[name])
+        shard = self._shards[name] = FAISSEmbeddingsStore.load(path, mmap=self.read_only)
+        self._saved[name] = (path, shard.version)
+        return shard
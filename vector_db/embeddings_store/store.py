@@ -1,11 +1,280 @@
+"""In-memory NumPy embeddings store.
+
+A dependency-light counterpart of ``FAISSEmbeddingsStore`` with the same
+``add``/``add_many``/``query``/``query_batch``/``save``/``load`` interface,
+for environments without faiss. Search is exact cosine top-k.
+
+Vectors are L2-normalized on insert into a preallocated row-major matrix.
+The matrix doubles in capacity when full, so appends are amortized O(1) with
+no per-row reallocation. ``dtype="float16"`` halves memory; scores are then
+computed block by block in float32. Top-k uses ``argpartition`` and sorts
+only the k winners. Metadata uses the same SQLite sidecar as the FAISS store,
+so ``filters`` work the same way. ``save`` writes ``<base>.npy`` plus
+``.meta.sqlite`` and ``.config.json``.
+
+``upsert``/``delete`` by document id work as in the FAISS store. Row ids are
+matrix positions and stay stable. A removed row stays in the matrix but is
+masked out of every search; a replaced document is appended as a new row.
+``query_text`` and ``query_hybrid`` add BM25 keyword search, as in the FAISS
+store.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from vector_db.embeddings_store.lexical import DEFAULT_RRF_K, fuse_hits
+from vector_db.embeddings_store.metadata_store import Filters, SQLiteMetadataStore, load_metadata
+
+DTYPES = ("float32", "float16")
+# rows scored per matmul when the matrix has to be up-cast (float16)
+_SCORE_BLOCK = 65536
+
+
 class EmbeddingsStore:
-    """Minimal embeddings store abstraction."""
+    """Exact cosine-similarity store on a growable NumPy matrix.
+
+    ``dim`` is taken from the first vector added when not given.
+    """
 
-    def __init__(self):
-        self._store = []
+    def __init__(self, dim: Optional[int] = None, dtype: str = "float32", capacity: int = 1024):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown dtype: {dtype!r} (expected one of {list(DTYPES)})")
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self._capacity = max(1, int(capacity))
+        self._vectors: Optional[np.ndarray] = None
+        self._size = 0
+        # sorted positions of removed rows, excluded from search
+        self._removed = np.empty(0, dtype=np.int64)
+        self.metadata = SQLiteMetadataStore()
+        self.read_only = False
+        # bumped by every change that can alter search results (see VectorSearch's cache)
+        self.version = 0
+
+    def __len__(self) -> int:
+        return self._size - len(self._removed)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The stored (normalized) vectors by row id, without the unused capacity (removed rows included)."""
+        if self._vectors is None:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        return self._vectors[:self._size]
+
+    @property
+    def memory_bytes(self) -> int:
+        return 0 if self._vectors is None else self._vectors.nbytes
+
+    def _as_rows(self, vectors) -> np.ndarray:
+        arr = np.array(vectors, dtype=np.float32, copy=True, ndmin=2)
+        if self.dim is None and arr.size:
+            self.dim = arr.shape[1]
+        if arr.size == 0:
+            return arr.reshape(0, self.dim or 0)
+        if arr.ndim != 2 or arr.shape[1] != self.dim:
+            raise ValueError(f"Vector dimension {arr.shape[-1]} does not match store dim {self.dim}")
+        return arr
+
+    @staticmethod
+    def _normalize(arr: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(arr, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        arr /= norms
+        return arr
+
+    def _reserve(self, rows: int) -> None:
+        needed = self._size + rows
+        if self._vectors is not None and needed <= len(self._vectors):
+            return
+        capacity = max(self._capacity, len(self._vectors) if self._vectors is not None else 0)
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty((capacity, self.dim), dtype=self.dtype)
+        if self._size:
+            grown[:self._size] = self._vectors[:self._size]
+        self._vectors = grown
 
     def add(self, vector, metadata=None):
-        self._store.append((vector, metadata))
+        self.add_many([vector], [metadata])
+
+    def add_many(self, vectors, metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None) -> int:
+        """Append an (N, dim) batch of vectors (one metadata entry per row); returns N."""
+        self._check_writable()
+        arr, metadatas = self._rows_and_metadata(vectors, metadatas)
+        return len(self._append(arr, metadatas))
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError("This store was loaded with mmap=True and is read-only; load it without mmap to add vectors.")
+
+    def _rows_and_metadata(self, vectors, metadatas) -> Tuple[np.ndarray, Sequence[Optional[Dict[str, Any]]]]:
+        arr = self._as_rows(vectors)
+        if metadatas is None:
+            metadatas = [None] * len(arr)
+        elif len(metadatas) != len(arr):
+            raise ValueError(f"Got {len(metadatas)} metadata entries for {len(arr)} vectors")
+        return arr, metadatas
+
+    def _append(self, arr: np.ndarray, metadatas: Sequence[Optional[Dict[str, Any]]]) -> range:
+        if not len(arr):
+            return range(0)
+        self._reserve(len(arr))
+        start = self._size
+        self._vectors[start:start + len(arr)] = self._normalize(arr)
+        self._size += len(arr)
+        self.metadata.add(range(start, self._size), metadatas)
+        self.version += 1
+        return range(start, self._size)
+
+    def upsert(self, doc_ids: Sequence[str], vectors, metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+               content_hashes: Optional[Sequence[Optional[str]]] = None) -> Dict[str, int]:
+        """Insert or replace documents by stable id; returns ``{"added": n, "replaced": n}``."""
+        self._check_writable()
+        doc_ids = [str(d) for d in doc_ids]
+        if len(set(doc_ids)) != len(doc_ids):
+            raise ValueError("doc_ids must be unique")
+        arr, metadatas = self._rows_and_metadata(vectors, metadatas)
+        if len(doc_ids) != len(arr):
+            raise ValueError(f"Got {len(doc_ids)} doc ids for {len(arr)} vectors")
+        if content_hashes is not None and len(content_hashes) != len(doc_ids):
+            raise ValueError(f"Got {len(content_hashes)} content hashes for {len(doc_ids)} doc ids")
+        old = self.metadata.doc_rows(doc_ids)
+        self._remove_rows(list(old.values()))
+        rows = self._append(arr, metadatas)
+        self.metadata.set_docs(doc_ids, rows, content_hashes)
+        return {"added": len(doc_ids) - len(old), "replaced": len(old)}
+
+    def delete(self, doc_ids: Iterable[str]) -> int:
+        """Remove documents by id; returns how many existed."""
+        self._check_writable()
+        rows = self.metadata.doc_rows(doc_ids)
+        self._remove_rows(list(rows.values()))
+        return len(rows)
+
+    def doc_hashes(self, prefix: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """``{doc_id: content_hash}`` of the stored documents (optionally only ids starting with ``prefix``)."""
+        return self.metadata.doc_hashes(prefix)
+
+    def _remove_rows(self, row_ids: List[int]) -> None:
+        if not row_ids:
+            return
+        self._removed = np.union1d(self._removed, np.asarray(row_ids, dtype=np.int64))
+        self.metadata.delete(row_ids)
+        self.version += 1
+
+    def add_chunks(self, chunks: Iterable[Tuple[Any, Sequence[Dict[str, Any]]]]) -> int:
+        """Add ``(vectors, metadatas)`` chunks from an iterator; returns the total rows added."""
+        return sum(self.add_many(vectors, metadatas) for vectors, metadatas in chunks)
+
+    def query(self, vector, k=5, filters: Optional[Filters] = None):
+        return self.query_batch([vector], k=k, filters=filters)[0]
+
+    def query_batch(self, vectors, k: Union[int, Sequence[int]] = 5,
+                    filters: Optional[Filters] = None) -> List[List[Dict[str, Any]]]:
+        """Exact top-k by cosine similarity for each row of ``vectors``.
+
+        ``k`` is one value or one per query; ``filters`` restricts the scored
+        rows to those whose metadata matches.
+        """
+        queries = np.asarray(vectors, dtype=np.float32)
+        n_queries = len(queries) if queries.ndim > 1 else (1 if queries.size else 0)
+        ks = [int(k)] * n_queries if isinstance(k, (int, np.integer)) else [int(x) for x in k]
+        if len(ks) != n_queries:
+            raise ValueError(f"Got {len(ks)} k values for {n_queries} queries")
+        found = self._search_ids(queries, max(ks, default=0), filters)
+        if found is None:
+            return [[] for _ in ks]
+        top_scores, ids = found
+
+        hits = self.metadata.get(ids[:, :max(ks)].ravel().tolist())
+        return [[{"score": float(s), "metadata": hits[i]}
+                 for s, i in zip(row_scores[:row_k], row_ids[:row_k]) if i in hits]
+                for row_k, row_scores, row_ids in zip(ks, top_scores.tolist(), ids.tolist())]
+
+    def _search_ids(self, queries, k: int, filters: Optional[Filters]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """``(scores, row ids)`` of the top ``k`` per query, best first; ``None`` if nothing can match."""
+        k_max = min(k, len(self))
+        if k_max <= 0:
+            return None
+        q = self._normalize(self._as_rows(queries))
+
+        rows: Optional[np.ndarray] = None
+        if filters:
+            rows = self.metadata.ids_matching(filters)
+            rows = rows[rows < self._size]
+            if not len(rows):
+                return None
+            k_max = min(k_max, len(rows))
+        scores = self._scores(q, rows)
+        if rows is None and len(self._removed):
+            scores[:, self._removed] = -np.inf
+
+        top = np.argpartition(-scores, k_max - 1, axis=1)[:, :k_max]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        return top_scores, (rows[top] if rows is not None else top)
+
+    def query_text(self, text: str, k: int = 5, filters: Optional[Filters] = None) -> List[Dict[str, Any]]:
+        """BM25 keyword search over the metadata text; no vector needed. ``score`` is the BM25 score."""
+        hits = self.metadata.search_text(text, k, filters)
+        metas = self.metadata.get(row for row, _ in hits)
+        return [{"score": score, "metadata": metas[row]} for row, score in hits if row in metas]
+
+    def query_hybrid(self, vector, text: str, k: int = 5, filters: Optional[Filters] = None,
+                     rrf_k: int = DEFAULT_RRF_K, candidates: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Dense and BM25 results fused by reciprocal rank, as in ``FAISSEmbeddingsStore.query_hybrid``."""
+        n = candidates or max(4 * k, 20)
+        found = self._search_ids(np.asarray(vector, dtype=np.float32).reshape(1, -1), n, filters)
+        dense = [] if found is None else [(int(i), float(s)) for s, i in zip(found[0][0], found[1][0])]
+        return fuse_hits(self.metadata, dense, self.metadata.search_text(text, n, filters), k, rrf_k)
+
+    def _scores(self, q: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """(n_queries, n_rows) cosine scores against all rows, or only ``rows``."""
+        mat = self.vectors if rows is None else self._vectors[rows]
+        if mat.dtype == np.float32:
+            return q @ mat.T
+        out = np.empty((len(q), len(mat)), dtype=np.float32)
+        for start in range(0, len(mat), _SCORE_BLOCK):
+            block = mat[start:start + _SCORE_BLOCK].astype(np.float32)
+            out[:, start:start + len(block)] = q @ block.T
+        return out
+
+    def config(self) -> Dict[str, Any]:
+        return {"index_type": "numpy", "dim": self.dim, "dtype": self.dtype.name, "removed": len(self._removed)}
+
+    def save(self, base_path: Path) -> None:
+        base_path = Path(base_path)
+        base_path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(base_path.with_suffix(".npy"), self.vectors)
+        self.metadata.save(base_path.with_suffix(".meta.sqlite"))
+        with open(base_path.with_suffix(".config.json"), "w", encoding="utf-8") as fh:
+            json.dump(self.config(), fh, indent=2)
 
-    def query(self, vector, k=5):
-        return []
+    @classmethod
+    def load(cls, base_path: Path, mmap: bool = False) -> "EmbeddingsStore":
+        """Load a store written by ``save``; ``mmap=True`` maps the ``.npy`` read-only instead of reading it."""
+        base_path = Path(base_path)
+        vectors = np.load(base_path.with_suffix(".npy"), mmap_mode="r" if mmap else None)
+        inst = cls(dim=vectors.shape[1], dtype=vectors.dtype.name)
+        if mmap:
+            inst._vectors = vectors
+            inst.read_only = True
+        else:
+            inst._reserve(len(vectors))
+            inst._vectors[:len(vectors)] = vectors
+        inst._size = len(vectors)
+        inst.metadata = load_metadata(base_path, read_only=mmap)
+        config_path = base_path.with_suffix(".config.json")
+        if config_path.exists():
+            with open(config_path, "r", encoding="utf-8") as fh:
+                removed = json.load(fh).get("removed", 0)
+            if removed:
+                # removed rows are the ones without metadata
+                inst._removed = np.setdiff1d(np.arange(inst._size, dtype=np.int64), inst.metadata.row_ids())
+        return inst